@@ -0,0 +1,69 @@
+"""Suite de benchmarks de Skoob. Escribe un JSON comparable entre versiones.
+
+    python -m benchmarks --out results/current.json
+    python -m benchmarks --out results/current.json --url http://127.0.0.1:3030
+    python -m benchmarks --out results/current.json --books-all 500  # usa el Postgres del .env
+    python -m benchmarks.compare results/baseline.json results/current.json
+"""
+import argparse
+import datetime
+import json
+import platform
+import subprocess
+import sys
+from pathlib import Path
+
+from benchmarks.epub_generator import EpubConfig
+from benchmarks.ingest_benchmark import bench_ingest
+
+# Libros sintéticos: uno típico, uno con muchos capítulos y uno con capítulos gigantes.
+INGEST_PROFILES = {
+    'typical': EpubConfig(chapters=30, chapter_kb=20, images=10, ncx_depth=2),
+    'many_chapters': EpubConfig(chapters=300, chapter_kb=5, images=20, ncx_depth=3),
+    'huge_chapters': EpubConfig(chapters=4, chapter_kb=1024, images=2, ncx_depth=1),
+}
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--out', type=Path, default=None, help='Archivo JSON de salida (por defecto stdout).')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--url', default=None, help='API corriendo para la prueba de carga HTTP.')
+    parser.add_argument('--requests', type=int, default=500)
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--books-all', type=int, default=0, help='Libros para el benchmark de /books/all (0 lo omite).')
+    args = parser.parse_args()
+
+    results = {
+        'meta': {
+            'revision': git_revision(),
+            'python': platform.python_version(),
+            'machine': platform.machine(),
+            'date': datetime.datetime.now(datetime.UTC).isoformat(),
+        },
+        'results': {
+            'ingest': {name: bench_ingest(config, args.repeat) for name, config in INGEST_PROFILES.items()},
+        },
+    }
+    if args.books_all:
+        from benchmarks.books_all_benchmark import bench_books_all
+        results['results']['books_all'] = bench_books_all(args.books_all, args.repeat * 6, toc_entries=40)
+    if args.url:
+        from benchmarks.load_benchmark import run_load
+        import asyncio
+        results['results']['http'] = asyncio.run(run_load(args.url, args.requests, args.concurrency, INGEST_PROFILES['typical']))
+
+    output = json.dumps(results, indent=2)
+    if args.out:
+        args.out.parent.mkdir(parents=True, exist_ok=True)
+        args.out.write_text(output)
+    else:
+        sys.stdout.write(output + '\n')
+
+if __name__ == '__main__':
+    main()
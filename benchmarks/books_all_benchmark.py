@@ -0,0 +1,94 @@
+"""Benchmark de ``GET /books/all`` con una biblioteca grande, contra el Postgres local.
+
+Crea un usuario temporal con N libros (sólo filas, sin archivos) con TOCs realistas, mide
+la ruta completa con TestClient (sin y con compresión) y borra todo al terminar.
+
+    python -m benchmarks.books_all_benchmark --books 500 --repeat 30
+"""
+import argparse
+import json
+import random
+import statistics
+import time
+import uuid
+from typing import Optional
+
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from src.api.api import FastApi
+from src.db.db_connection import DbConnection
+from src.models.books_model import BooksModel
+from src.services.core_services import CoreServices
+from src.storage.book_layout import book_prefix
+
+def make_books(owner_id: int, count: int, toc_entries: int, seed: int = 1234) -> list[BooksModel]:
+    rnd = random.Random(seed)
+    books = []
+    for i in range(count):
+        folder = str(book_prefix(str(uuid.UUID(int=rnd.getrandbits(128)))))
+        opf_dir = f'{folder}/extracted/OEBPS'
+        books.append(BooksModel(
+            title=f'Benchmark book {i}',
+            description=' '.join(rnd.choice(('libro', 'lectura', 'historia', 'noche', 'river')) for _ in range(60)),
+            author='Skoob', contributor='Skoob', category='Fiction', publish_date='2024-01-01',
+            publisher='Skoob', language='es', cover_path=f'{opf_dir}/Images/cover.jpg',
+            main_folder_path=folder, original_file_path=f'{folder}/book_content_epub.zip',
+            opf_path=f'{opf_dir}/content.opf', metadata_path=opf_dir, toc_path=f'{opf_dir}/toc.ncx',
+            book_type='epub', chapters_count=toc_entries,
+            toc_content={f'Chapter {c + 1}': f'{opf_dir}/Text/chapter_{c:04d}.xhtml#c{c}' for c in range(toc_entries)},
+            owner_id=owner_id,
+        ))
+    return books
+
+def timed_requests(client: TestClient, repeat: int, headers: dict) -> dict:
+    samples, size = [], 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        response = client.get('/books/all', headers=headers)
+        samples.append(time.perf_counter() - start)
+        response.raise_for_status()
+        size = int(response.headers.get('content-length', len(response.content)))
+    samples.sort()
+    return {
+        'median_ms': round(statistics.median(samples) * 1000, 3),
+        'p95_ms': round(samples[min(len(samples) - 1, int(len(samples) * 0.95))] * 1000, 3),
+        'wire_bytes': size,
+        'content_encoding': response.headers.get('content-encoding', 'identity'),
+    }
+
+def bench_books_all(books: int, repeat: int, toc_entries: int) -> dict:
+    db = DbConnection()
+    services = CoreServices(db.engine)
+    email = f'bench-{uuid.uuid4().hex[:12]}@skoob.local'
+    password = uuid.uuid4().hex
+    user = services.create_user(name='Benchmark', email=email, password=password, user_type='email')
+    try:
+        with Session(db.engine) as session:
+            session.add_all(make_books(user.id, books, toc_entries))
+            session.commit()
+
+        api = FastApi(services)
+        with TestClient(api.app) as client:
+            client.post('/users/auth', data={'username': email, 'password': password}).raise_for_status()
+            client.get('/books/all').raise_for_status() # calentamiento
+            return {
+                'books': books,
+                'toc_entries': toc_entries,
+                'identity': timed_requests(client, repeat, {'Accept-Encoding': 'identity'}),
+                'gzip': timed_requests(client, repeat, {'Accept-Encoding': 'gzip'}),
+                'br': timed_requests(client, repeat, {'Accept-Encoding': 'br, gzip'}),
+            }
+    finally:
+        services.delete_user(email)
+
+def main(argv: Optional[list] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--books', type=int, default=500)
+    parser.add_argument('--toc-entries', type=int, default=40)
+    parser.add_argument('--repeat', type=int, default=30)
+    args = parser.parse_args(argv)
+    print(json.dumps(bench_books_all(args.books, args.repeat, args.toc_entries), indent=2))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,53 @@
+"""Compara dos resultados de ``python -m benchmarks`` y marca las regresiones.
+
+Las métricas terminadas en ``_ms`` son mejores cuanto más bajas y las terminadas en
+``_per_second`` cuanto más altas. Sale con código 1 si alguna empeora más del umbral.
+
+    python -m benchmarks.compare baseline.json current.json --threshold 10
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Iterator, Optional
+
+def flatten(data: dict, prefix: str = '') -> Iterator[tuple[str, float]]:
+    for key, value in data.items():
+        path = f'{prefix}.{key}' if prefix else key
+        if isinstance(value, dict):
+            yield from flatten(value, path)
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            yield path, value
+
+def compare(baseline: dict, current: dict, threshold: float) -> list[dict]:
+    old = dict(flatten(baseline.get('results', {})))
+    rows = []
+    for metric, new_value in flatten(current.get('results', {})):
+        lower_is_better = metric.endswith('_ms')
+        if not (lower_is_better or metric.endswith('_per_second')) or metric not in old or not old[metric]:
+            continue
+        change = (new_value - old[metric]) / old[metric] * 100
+        worse = change if lower_is_better else -change
+        rows.append({
+            'metric': metric,
+            'baseline': old[metric],
+            'current': new_value,
+            'change_pct': round(change, 2),
+            'regression': worse > threshold,
+        })
+    return rows
+
+def main(argv: Optional[list] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('baseline', type=Path)
+    parser.add_argument('current', type=Path)
+    parser.add_argument('--threshold', type=float, default=10.0, help='Porcentaje de empeoramiento tolerado.')
+    args = parser.parse_args(argv)
+
+    rows = compare(json.loads(args.baseline.read_text()), json.loads(args.current.read_text()), args.threshold)
+    regressions = [row for row in rows if row['regression']]
+    print(json.dumps({'threshold_pct': args.threshold, 'regressions': regressions, 'compared': len(rows)}, indent=2))
+    return 1 if regressions else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,158 @@
+"""Generador determinista de EPUBs sintéticos para los benchmarks.
+
+Con la misma configuración y la misma semilla genera siempre el mismo archivo, así los
+resultados de distintas versiones son comparables.
+
+    python -m benchmarks.epub_generator book.epub --chapters 50 --chapter-kb 40 --images 10 --ncx-depth 3
+"""
+import argparse
+import random
+import struct
+import zipfile
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+WORDS = (
+    'libro', 'lectura', 'capítulo', 'historia', 'melancholy', 'reader', 'página', 'palabra',
+    'tiempo', 'memoria', 'silencio', 'camino', 'ciudad', 'noche', 'river', 'window', 'light',
+    'the', 'of', 'and', 'de', 'la', 'que', 'el', 'en', 'y', 'los', 'se', 'del', 'las',
+)
+
+@dataclass(frozen=True)
+class EpubConfig:
+    chapters: int = 20
+    chapter_kb: int = 20
+    images: int = 5
+    ncx_depth: int = 2
+    seed: int = 1234
+
+def _png(width: int, height: int, seed: int) -> bytes:
+    """PNG válido (y pequeño) de un color, para que los lectores puedan leer su tamaño."""
+    def chunk(tag: bytes, data: bytes) -> bytes:
+        return struct.pack('>I', len(data)) + tag + data + struct.pack('>I', zlib.crc32(tag + data) & 0xffffffff)
+    color = bytes([seed % 256, (seed * 7) % 256, (seed * 13) % 256])
+    raw = b''.join(b'\x00' + color * width for _ in range(height))
+    return (
+        b'\x89PNG\r\n\x1a\n'
+        + chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0))
+        + chunk(b'IDAT', zlib.compress(raw))
+        + chunk(b'IEND', b'')
+    )
+
+def _paragraph(rnd: random.Random, words: int) -> str:
+    return ' '.join(rnd.choice(WORDS) for _ in range(words))
+
+def _chapter(rnd: random.Random, index: int, config: EpubConfig) -> str:
+    target = config.chapter_kb * 1024
+    parts, size, p = [], 0, 0
+    if config.images:
+        parts.append(f'<p><img src="../Images/image_{index % config.images:03d}.png" alt="Image {index}"/></p>')
+    while size < target:
+        if p % 8 == 0:
+            parts.append(f'<h2 id="section_{index}_{p // 8}">Section {p // 8}</h2>')
+        paragraph = f'<p id="p_{index}_{p}">{_paragraph(rnd, rnd.randint(40, 120))}</p>'
+        parts.append(paragraph)
+        size += len(paragraph.encode('utf-8'))
+        p += 1
+    body = '\n'.join(parts)
+    return (
+        '<?xml version="1.0" encoding="utf-8"?>\n'
+        '<!DOCTYPE html>\n'
+        '<html xmlns="http://www.w3.org/1999/xhtml" xmlns:epub="http://www.idpf.org/2007/ops">\n'
+        f'<head><title>Chapter {index + 1}</title>'
+        '<link rel="stylesheet" type="text/css" href="../Styles/style.css"/></head>\n'
+        f'<body>\n<!-- chapter {index + 1} -->\n<h1 id="chapter_{index}">Chapter {index + 1}</h1>\n{body}\n</body>\n</html>\n'
+    )
+
+def _nav_points(index: int, depth: int, max_depth: int, play_order: list) -> str:
+    """navPoint del capítulo con ``max_depth`` niveles de secciones anidadas."""
+    play_order[0] += 1
+    order = play_order[0]
+    anchor = f'chapter_{index}' if depth == 0 else f'section_{index}_{depth - 1}'
+    label = f'Chapter {index + 1}' if depth == 0 else f'Chapter {index + 1} - {depth}'
+    children = _nav_points(index, depth + 1, max_depth, play_order) if depth + 1 < max_depth else ''
+    return (
+        f'<navPoint id="nav_{index}_{depth}" playOrder="{order}">'
+        f'<navLabel><text>{label}</text></navLabel>'
+        f'<content src="Text/chapter_{index:04d}.xhtml#{anchor}"/>{children}</navPoint>'
+    )
+
+def generate_epub(path: Path, config: EpubConfig = EpubConfig()) -> Path:
+    """Genera un EPUB sintético.
+
+    Args:
+        path (Path): Path del archivo a generar.
+        config (EpubConfig, optional): Configuración del libro. Defaults to EpubConfig().
+
+    Returns:
+        Path: Devuelve el path del archivo generado.
+    """
+    rnd = random.Random(config.seed)
+    path = Path(path)
+    manifest, spine = [], []
+    play_order = [0]
+
+    # Fijamos la fecha de las entradas para que el zip sea idéntico byte a byte.
+    def write(z: zipfile.ZipFile, name: str, data, compress: int = zipfile.ZIP_DEFLATED) -> None:
+        info = zipfile.ZipInfo(name, date_time=(2024, 1, 1, 0, 0, 0))
+        info.compress_type = compress
+        z.writestr(info, data)
+
+    with zipfile.ZipFile(path, 'w') as z:
+        write(z, 'mimetype', 'application/epub+zip', zipfile.ZIP_STORED)
+        write(z, 'META-INF/container.xml',
+              '<?xml version="1.0"?>\n'
+              '<container version="1.0" xmlns="urn:oasis:names:tc:opendocument:xmlns:container">'
+              '<rootfiles><rootfile full-path="OEBPS/content.opf" media-type="application/oebps-package+xml"/></rootfiles>'
+              '</container>')
+        write(z, 'OEBPS/Styles/style.css',
+              '/* estilos del libro */\nbody {\n  margin: 0 5%;\n  line-height: 1.4;\n}\n\nh1, h2 {\n  text-align: center;\n}\n')
+        manifest.append('<item id="css" href="Styles/style.css" media-type="text/css"/>')
+
+        for i in range(config.images):
+            write(z, f'OEBPS/Images/image_{i:03d}.png', _png(64 + i % 64, 48 + i % 32, i))
+            manifest.append(f'<item id="image_{i:03d}" href="Images/image_{i:03d}.png" media-type="image/png"/>')
+
+        nav_points = []
+        for i in range(config.chapters):
+            write(z, f'OEBPS/Text/chapter_{i:04d}.xhtml', _chapter(rnd, i, config))
+            manifest.append(f'<item id="chapter_{i:04d}" href="Text/chapter_{i:04d}.xhtml" media-type="application/xhtml+xml"/>')
+            spine.append(f'<itemref idref="chapter_{i:04d}"/>')
+            nav_points.append(_nav_points(i, 0, max(1, config.ncx_depth), play_order))
+
+        manifest.append('<item id="ncx" href="toc.ncx" media-type="application/x-dtbncx+xml"/>')
+        write(z, 'OEBPS/toc.ncx',
+              '<?xml version="1.0" encoding="utf-8"?>\n'
+              '<ncx xmlns="http://www.daisy.org/z3986/2005/ncx/" version="2005-1">'
+              '<head><meta name="dtb:uid" content="skoob-benchmark"/></head>'
+              '<docTitle><text>Skoob Benchmark Book</text></docTitle>'
+              f'<navMap>{"".join(nav_points)}</navMap></ncx>')
+
+        cover = '<meta name="cover" content="image_000"/>' if config.images else ''
+        write(z, 'OEBPS/content.opf',
+              '<?xml version="1.0" encoding="utf-8"?>\n'
+              '<package xmlns="http://www.idpf.org/2007/opf" version="2.0" unique-identifier="uid">'
+              '<metadata xmlns:dc="http://purl.org/dc/elements/1.1/">'
+              '<dc:title>Skoob Benchmark Book</dc:title><dc:creator>Skoob</dc:creator>'
+              '<dc:language>es</dc:language><dc:identifier id="uid">skoob-benchmark</dc:identifier>'
+              f'{cover}</metadata>'
+              f'<manifest>{"".join(manifest)}</manifest>'
+              f'<spine toc="ncx">{"".join(spine)}</spine></package>')
+    return path
+
+def main(argv: Optional[list] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('path', type=Path)
+    parser.add_argument('--chapters', type=int, default=EpubConfig.chapters)
+    parser.add_argument('--chapter-kb', type=int, default=EpubConfig.chapter_kb)
+    parser.add_argument('--images', type=int, default=EpubConfig.images)
+    parser.add_argument('--ncx-depth', type=int, default=EpubConfig.ncx_depth)
+    parser.add_argument('--seed', type=int, default=EpubConfig.seed)
+    args = parser.parse_args(argv)
+    config = EpubConfig(args.chapters, args.chapter_kb, args.images, args.ncx_depth, args.seed)
+    print(generate_epub(args.path, config))
+
+if __name__ == '__main__':
+    main()
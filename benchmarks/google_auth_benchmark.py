@@ -0,0 +1,207 @@
+"""Benchmark del login con Google contra un endpoint de tokens y un servidor de certificados
+locales (no usa la red ni la base de datos).
+
+Compara el flujo anterior (un httpx.AsyncClient por login y verify_oauth2_token, que descarga
+los certificados en cada login y bloquea el event loop) con GoogleAuthServices (cliente
+compartido, certificados cacheados según Cache-Control y verificación fuera del loop). Los
+tests de la caché (tests/test_google_auth_services.py) usan el mismo servidor local.
+
+    python -m benchmarks.google_auth_benchmark --logins 300 --concurrency 32  # requiere cryptography
+"""
+import argparse
+import asyncio
+import datetime
+import json
+import os
+import threading
+import time
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+CLIENT_ID = 'benchmark-client.apps.googleusercontent.com'
+
+def make_key(key_id: str) -> tuple[object, str]:
+    """Clave RSA y certificado autofirmado (PEM), como los que publica Google."""
+    from cryptography import x509
+    from cryptography.hazmat.primitives import hashes, serialization
+    from cryptography.hazmat.primitives.asymmetric import rsa
+    from cryptography.x509.oid import NameOID
+    from google.auth import crypt
+
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, key_id)])
+    now = datetime.datetime.now(datetime.UTC)
+    cert = (
+        x509.CertificateBuilder().subject_name(name).issuer_name(name).public_key(key.public_key())
+        .serial_number(x509.random_serial_number()).not_valid_before(now - datetime.timedelta(days=1))
+        .not_valid_after(now + datetime.timedelta(days=1)).sign(key, hashes.SHA256())
+    )
+    private_pem = key.private_bytes(serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption())
+    return crypt.RSASigner.from_string(private_pem, key_id=key_id), cert.public_bytes(serialization.Encoding.PEM).decode()
+
+class StandInServer(ThreadingHTTPServer):
+    # El backlog por defecto (5) rechaza conexiones cuando llegan muchos logins a la vez.
+    request_queue_size = 256
+    daemon_threads = True
+
+class StandInGoogle:
+    def __init__(self, max_age: Optional[int] = 3600) -> None:
+        """Endpoint de tokens (/token) y de certificados (/certs) en un hilo, con contadores."""
+        self.max_age = max_age
+        self.fail_certs = False
+        self.token_requests = 0
+        self.cert_requests = 0
+        self.connections: set[tuple[str, int]] = set()  # (host, puerto) de cada conexión de cliente.
+        self._lock = threading.Lock()
+        self.keys: dict[str, tuple[object, str]] = {}
+        self.active_kid = self.rotate()
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, *args) -> None:
+                pass
+
+            def send_json(self, status: int, payload: dict, headers: dict = {}) -> None:
+                body = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self) -> None:
+                stand_in.count(self, 'cert_requests')
+                if stand_in.fail_certs:
+                    self.send_json(503, {'error': 'unavailable'})
+                    return
+                headers = {'Cache-Control': f'public, max-age={stand_in.max_age}, must-revalidate, no-transform'} if stand_in.max_age is not None else {}
+                self.send_json(200, {kid: cert for kid, (_, cert) in stand_in.keys.items()}, headers)
+
+            def do_POST(self) -> None:
+                stand_in.count(self, 'token_requests')
+                form = urllib.parse.parse_qs(self.rfile.read(int(self.headers['Content-Length'])).decode())
+                self.send_json(200, {'id_token': stand_in.id_token(form['code'][0]), 'access_token': 'x', 'token_type': 'Bearer'})
+
+        self.server = StandInServer(('127.0.0.1', 0), Handler)
+        self.url = f'http://127.0.0.1:{self.server.server_address[1]}'
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def count(self, handler: BaseHTTPRequestHandler, counter: str) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+            self.connections.add(handler.client_address)
+
+    def rotate(self) -> str:
+        kid = f'key-{len(self.keys) + 1}'
+        self.keys[kid] = make_key(kid)
+        self.active_kid = kid
+        return kid
+
+    def id_token(self, email: str) -> str:
+        from google.auth import jwt
+
+        now = int(time.time())
+        payload = {
+            'iss': 'https://accounts.google.com', 'aud': CLIENT_ID, 'sub': email, 'email': email,
+            'email_verified': True, 'name': 'Benchmark', 'iat': now, 'exp': now + 3600,
+        }
+        return jwt.encode(self.keys[self.active_kid][0], payload).decode()
+
+    def close(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+def make_services(stand_in: StandInGoogle, **env: str):
+    from src.services.microservices.google_auth_services import GoogleAuthServices
+
+    os.environ.update({
+        'GOOGLE_CLIENT_ID': CLIENT_ID, 'GOOGLE_SECRET_KEY': 'secret',
+        'GOOGLE_TOKEN_URL': f'{stand_in.url}/token', 'GOOGLE_CERTS_URL': f'{stand_in.url}/certs', **env,
+    })
+    return GoogleAuthServices()
+
+async def legacy_login(stand_in: StandInGoogle, code: str) -> dict:
+    """El callback anterior: cliente nuevo por login y certificados descargados al verificar."""
+    import httpx
+    from google.auth.transport import requests
+    from google.oauth2 import id_token
+
+    async with httpx.AsyncClient() as client:
+        response = await client.post(f'{stand_in.url}/token', data={'code': code, 'client_id': CLIENT_ID})
+        response.raise_for_status()
+        token = response.json()['id_token']
+    return id_token.verify_token(token, requests.Request(), CLIENT_ID, certs_url=f'{stand_in.url}/certs')
+
+async def pooled_login(services, code: str) -> dict:
+    token = (await services.exchange_google_code(code))['id_token']
+    return await services.verify_google_id_token(token)
+
+async def run_logins(login, logins: int, concurrency: int) -> dict:
+    """Corre los logins y mide, además, cuánto se atrasa un ticker del event loop."""
+    latencies, lags = [], []
+    semaphore = asyncio.Semaphore(concurrency)
+    done = asyncio.Event()
+
+    async def ticker() -> None:
+        while not done.is_set():
+            started = time.perf_counter()
+            await asyncio.sleep(0.005)
+            lags.append(time.perf_counter() - started - 0.005)
+
+    async def one(i: int) -> None:
+        async with semaphore:
+            started = time.perf_counter()
+            info = await login(f'user{i}@example.com')
+            assert info['email'] == f'user{i}@example.com'
+            latencies.append(time.perf_counter() - started)
+
+    tick = asyncio.create_task(ticker())
+    started = time.perf_counter()
+    await asyncio.gather(*[one(i) for i in range(logins)])
+    elapsed = time.perf_counter() - started
+    done.set()
+    await tick
+    latencies.sort()
+    return {
+        'logins': logins,
+        'seconds': round(elapsed, 4),
+        'logins_per_second': round(logins / elapsed, 2),
+        'p50_ms': round(latencies[len(latencies) // 2] * 1000, 2),
+        'p99_ms': round(latencies[max(0, int(len(latencies) * 0.99) - 1)] * 1000, 2),
+        'max_loop_lag_ms': round(max(lags, default=0) * 1000, 2),
+    }
+
+def bench_google_auth(logins: int, concurrency: int) -> dict:
+    async def run() -> dict:
+        stand_in = StandInGoogle()
+        services = make_services(stand_in)
+        try:
+            legacy = await run_logins(lambda code: legacy_login(stand_in, code), logins, concurrency)
+            legacy['cert_requests'] = stand_in.cert_requests
+            stand_in.cert_requests = 0
+            legacy['connections'] = len(stand_in.connections)
+            stand_in.connections.clear()
+            pooled = await run_logins(lambda code: pooled_login(services, code), logins, concurrency)
+            pooled['cert_requests'] = stand_in.cert_requests
+            pooled['connections'] = len(stand_in.connections)
+        finally:
+            await services.close_google_http_client()
+            stand_in.close()
+        return {'legacy': legacy, 'pooled': pooled}
+
+    return asyncio.run(run())
+
+def main(argv: Optional[list] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--logins', type=int, default=200)
+    parser.add_argument('--concurrency', type=int, default=32)
+    args = parser.parse_args(argv)
+    print(json.dumps(bench_google_auth(args.logins, args.concurrency), indent=2))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+"""Presupuesto de tiempo de arranque (import) de la API.
+
+Importa ``src.api.api`` en un intérprete limpio con ``python -X importtime`` y falla
+(exit code 1) si el tiempo de import supera el presupuesto o si se importa de forma
+ansiosa alguno de los subsistemas que deben cargarse bajo demanda.
+
+    python -m benchmarks.import_time_benchmark --budget-ms 1200
+"""
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+from typing import Optional
+
+# Subsistemas pesados que sólo deben importarse en el primer uso.
+LAZY_MODULES = ('google.genai', 'google.oauth2', 'google.auth', 'googleapiclient', 'httpx', 'pymupdf')
+LINE_RE = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s+)(\S+)$')
+
+def measure(module: str) -> dict:
+    """Importa el módulo en un subproceso y parsea la salida de -X importtime.
+
+    Returns:
+        dict: Tiempo total (ms), módulos más costosos y módulos importados.
+    """
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        capture_output=True, text=True, check=True,
+    )
+    entries = []
+    for line in result.stderr.splitlines():
+        match = LINE_RE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            entries.append({'module': name, 'self_us': int(self_us), 'cumulative_us': int(cumulative_us), 'depth': (len(indent) - 1) // 2})
+
+    total_us = next(e['cumulative_us'] for e in entries if e['module'] == module and e['depth'] == 0)
+    heaviest = sorted(entries, key=lambda e: e['self_us'], reverse=True)[:15]
+    return {
+        'total_ms': round(total_us / 1000, 2),
+        'heaviest': [{'module': e['module'], 'self_ms': round(e['self_us'] / 1000, 2)} for e in heaviest],
+        'modules': {e['module'] for e in entries},
+    }
+
+def main(argv: Optional[list] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--module', default='src.api.api')
+    parser.add_argument('--budget-ms', type=float, default=float(os.getenv('IMPORT_TIME_BUDGET_MS', '1200')))
+    parser.add_argument('--runs', type=int, default=3, help='Se toma el mejor de N imports.')
+    args = parser.parse_args(argv)
+
+    runs = [measure(args.module) for _ in range(args.runs)]
+    best = min(runs, key=lambda r: r['total_ms'])
+    eager = sorted(m for m in best['modules'] if m.startswith(LAZY_MODULES))
+
+    report = {
+        'module': args.module,
+        'import_ms': best['total_ms'],
+        'budget_ms': args.budget_ms,
+        'eager_lazy_modules': eager,
+        'heaviest': best['heaviest'],
+        'ok': best['total_ms'] <= args.budget_ms and not eager,
+    }
+    print(json.dumps(report, indent=2))
+    return 0 if report['ok'] else 1
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,95 @@
+"""Benchmark de las etapas de ingesta de EPUBs, sin base de datos.
+
+Mide por separado ``process_epub_book`` (unzip + OPF + NCX), ``read_opf``,
+``edit_book_urls`` y la generación de la variante lector sobre libros sintéticos.
+
+    python -m benchmarks.ingest_benchmark --chapters 100 --chapter-kb 30 --repeat 5
+"""
+import argparse
+import json
+import shutil
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Optional
+
+from benchmarks.epub_generator import EpubConfig, generate_epub
+from src.models.books_model import BooksModel
+from src.services.microservices.books_services import BooksServices
+from src.storage.local_storage import LocalStorage
+
+class IngestOnlyServices(BooksServices):
+    def __init__(self) -> None:
+        # Sólo usamos las etapas que no tocan la base de datos.
+        self.engine = None
+        self.storage = LocalStorage()
+        super().__init__()
+
+def summarize(samples: list[float]) -> dict:
+    samples = sorted(samples)
+    return {
+        'runs': len(samples),
+        'median_ms': round(statistics.median(samples) * 1000, 3),
+        'min_ms': round(samples[0] * 1000, 3),
+        'p95_ms': round(samples[min(len(samples) - 1, int(len(samples) * 0.95))] * 1000, 3),
+    }
+
+def timed(fn: Callable) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+def bench_ingest(config: EpubConfig, repeat: int = 5) -> dict:
+    """Mide las etapas de ingesta para una configuración de libro.
+
+    Args:
+        config (EpubConfig): Configuración del libro sintético.
+        repeat (int, optional): Repeticiones por etapa. Defaults to 5.
+
+    Returns:
+        dict: Devuelve las estadísticas por etapa.
+    """
+    services = IngestOnlyServices()
+    samples = {'process_epub_book': [], 'read_opf': [], 'edit_book_urls': [], 'reader_variants': []}
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        epub = generate_epub(tmp / 'book.epub', config)
+        epub_bytes = epub.stat().st_size
+        for run in range(repeat):
+            folder = tmp / f'run_{run}'
+            folder.mkdir()
+            original = folder / 'book_content_epub.zip'
+            shutil.copyfile(epub, original)
+
+            result = {}
+            samples['process_epub_book'].append(timed(lambda: result.update(services.process_epub_book(original, folder))))
+            opf_path = Path(result['metadata']['opf_path'])
+            samples['read_opf'].append(timed(lambda: services.read_opf(opf_path, folder)))
+            book = BooksModel(id=1)
+            samples['edit_book_urls'].append(timed(lambda: services.edit_book_urls(book, result['book_content'])))
+            samples['reader_variants'].append(timed(lambda: services.build_reader_variants(
+                book.id, result['book_content'], opf_path.parent, lambda p: Path(p).read_bytes(), lambda p, data: Path(p).write_bytes(data),
+                services.minify_book_css(book.id, opf_path.parent),
+            )))
+            shutil.rmtree(folder)
+
+    return {
+        'config': config.__dict__,
+        'epub_bytes': epub_bytes,
+        'stages': {stage: summarize(values) for stage, values in samples.items()},
+    }
+
+def main(argv: Optional[list] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--chapters', type=int, default=EpubConfig.chapters)
+    parser.add_argument('--chapter-kb', type=int, default=EpubConfig.chapter_kb)
+    parser.add_argument('--images', type=int, default=EpubConfig.images)
+    parser.add_argument('--ncx-depth', type=int, default=EpubConfig.ncx_depth)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args(argv)
+    config = EpubConfig(args.chapters, args.chapter_kb, args.images, args.ncx_depth)
+    print(json.dumps(bench_ingest(config, args.repeat), indent=2))
+
+if __name__ == '__main__':
+    main()
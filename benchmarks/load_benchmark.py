@@ -0,0 +1,92 @@
+"""Prueba de carga HTTP contra una API corriendo (con su Postgres local).
+
+Registra un usuario de prueba, sube un libro sintético y mide latencias y throughput de
+las rutas más usadas por el lector.
+
+    python main.py &  # la API debe estar corriendo
+    python -m benchmarks.load_benchmark --url http://127.0.0.1:3030 --requests 500 --concurrency 32
+"""
+import argparse
+import asyncio
+import json
+import tempfile
+import time
+import uuid
+from pathlib import Path
+from typing import Optional
+
+import httpx
+
+from benchmarks.epub_generator import EpubConfig, generate_epub
+
+def latency_stats(latencies: list[float], errors: int, elapsed: float) -> dict:
+    latencies = sorted(latencies)
+    def pct(p: float) -> float:
+        return round(latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000, 3) if latencies else None
+    return {
+        'requests': len(latencies) + errors,
+        'errors': errors,
+        'requests_per_second': round((len(latencies) + errors) / elapsed, 2) if elapsed else None,
+        'p50_ms': pct(0.50),
+        'p95_ms': pct(0.95),
+        'p99_ms': pct(0.99),
+    }
+
+async def hammer(client: httpx.AsyncClient, method: str, url: str, requests: int, concurrency: int, **kwargs) -> dict:
+    latencies, errors = [], 0
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one() -> None:
+        nonlocal errors
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                response = await client.request(method, url, **kwargs)
+                response.raise_for_status()
+                latencies.append(time.perf_counter() - start)
+            except httpx.HTTPError:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*[one() for _ in range(requests)])
+    return latency_stats(latencies, errors, time.perf_counter() - start)
+
+async def run_load(url: str, requests: int, concurrency: int, config: EpubConfig) -> dict:
+    email = f'bench-{uuid.uuid4().hex[:12]}@skoob.local'
+    password = uuid.uuid4().hex
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=url, timeout=60, limits=limits) as client:
+        (await client.post('/users/register', params={'email': email, 'password': password, 'name': 'Benchmark'})).raise_for_status()
+        (await client.post('/users/auth', data={'username': email, 'password': password})).raise_for_status()
+
+        with tempfile.TemporaryDirectory() as tmp:
+            epub = generate_epub(Path(tmp) / 'book.epub', config)
+            with open(epub, 'rb') as file:
+                upload = await client.post('/books/upload', files={'file': ('benchmark.epub', file, 'application/epub+zip')})
+        upload.raise_for_status()
+        book_id = upload.json()['content']['content']['id']
+
+        results = {
+            'books_read': await hammer(client, 'GET', '/books/read', requests, concurrency,
+                                       params={'book_id': book_id, 'chapter_number': 1}),
+            'books_content': await hammer(client, 'GET', f'/books/content/{book_id}/Styles/style.css', requests, concurrency),
+            'books_all': await hammer(client, 'GET', '/books/all', requests, concurrency),
+            # Los logins son mucho más caros: medimos menos.
+            'users_auth': await hammer(client, 'POST', '/users/auth', max(1, requests // 10), concurrency,
+                                       data={'username': email, 'password': password}),
+        }
+        await client.delete('/books/delete', params={'id': book_id})
+    return {'url': url, 'concurrency': concurrency, 'endpoints': results}
+
+def main(argv: Optional[list] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', default='http://127.0.0.1:3030')
+    parser.add_argument('--requests', type=int, default=500)
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--chapters', type=int, default=EpubConfig.chapters)
+    args = parser.parse_args(argv)
+    result = asyncio.run(run_load(args.url, args.requests, args.concurrency, EpubConfig(chapters=args.chapters)))
+    print(json.dumps(result, indent=2))
+
+if __name__ == '__main__':
+    main()
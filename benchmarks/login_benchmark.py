@@ -0,0 +1,85 @@
+"""Benchmark de logins por segundo.
+
+Mide la verificación de passwords en el pool de hashing (logins/s totales y por core)
+y, opcionalmente, el endpoint /users/auth de una API corriendo.
+
+    python -m benchmarks.login_benchmark --logins 400
+    python -m benchmarks.login_benchmark --url http://127.0.0.1:3030 --email a@b.com --password x
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+from typing import Optional
+
+from src.services.microservices.security_services import SecurityServices
+
+def bench_pool(logins: int, password: str = 'benchmark-password') -> dict:
+    os.environ.setdefault('PASSWORD_HASH_MAX_PENDING', str(logins + 1))
+    hashed = SecurityServices.hash_password(password)
+    workers = int(os.getenv('PASSWORD_HASH_WORKERS', str(max(1, min(4, (os.cpu_count() or 2) // 2)))))
+
+    async def run() -> float:
+        start = time.perf_counter()
+        results = await asyncio.gather(*[SecurityServices.verify_and_update_password(password, hashed) for _ in range(logins)])
+        elapsed = time.perf_counter() - start
+        assert all(valid for valid, _ in results)
+        return elapsed
+
+    elapsed = asyncio.run(run())
+    SecurityServices.shutdown_password_pool()
+    return {
+        'logins': logins,
+        'workers': workers,
+        'rounds': int(os.getenv('PASSWORD_HASH_ROUNDS', '29000')),
+        'seconds': round(elapsed, 4),
+        'logins_per_second': round(logins / elapsed, 2),
+        'logins_per_second_per_core': round(logins / elapsed / workers, 2),
+    }
+
+def bench_http(url: str, email: str, password: str, logins: int, concurrency: int) -> dict:
+    import httpx
+
+    async def run() -> dict:
+        latencies = []
+        semaphore = asyncio.Semaphore(concurrency)
+        async with httpx.AsyncClient(base_url=url, timeout=30) as client:
+            async def login() -> None:
+                async with semaphore:
+                    start = time.perf_counter()
+                    r = await client.post('/users/auth', data={'username': email, 'password': password})
+                    r.raise_for_status()
+                    latencies.append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            await asyncio.gather(*[login() for _ in range(logins)])
+            elapsed = time.perf_counter() - start
+        latencies.sort()
+        return {
+            'logins': logins,
+            'concurrency': concurrency,
+            'seconds': round(elapsed, 4),
+            'logins_per_second': round(logins / elapsed, 2),
+            'p50_ms': round(latencies[len(latencies) // 2] * 1000, 2),
+            'p99_ms': round(latencies[int(len(latencies) * 0.99) - 1] * 1000, 2),
+        }
+
+    return asyncio.run(run())
+
+def main(argv: Optional[list] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--logins', type=int, default=200)
+    parser.add_argument('--url', default=None, help='URL de una API corriendo para medir /users/auth.')
+    parser.add_argument('--email', default=None)
+    parser.add_argument('--password', default=None)
+    parser.add_argument('--concurrency', type=int, default=32)
+    args = parser.parse_args(argv)
+
+    result = {'pool': bench_pool(args.logins)}
+    if args.url:
+        result['http'] = bench_http(args.url, args.email, args.password, args.logins, args.concurrency)
+    print(json.dumps(result, indent=2))
+
+if __name__ == '__main__':
+    main()
@@ -1,10 +1,42 @@
-import pprint
-from src.api.api import FastApi
+import sys
 from src.db.db_connection import DbConnection
-from src.services.core_services import CoreServices
 
-db = DbConnection()
-services = CoreServices(db.engine)
+# Con varios workers uvicorn importa de nuevo este módulo en cada proceso hijo:
+# sólo el proceso principal arranca la API.
+if __name__ == '__main__':
+    db = DbConnection()
 
-api = FastApi(services)
-api.run()
+    if len(sys.argv) > 1 and sys.argv[1] == 'migrate':
+        from src.db.migrate import migrate
+        migrate(db)
+    elif len(sys.argv) > 1 and sys.argv[1] == 'migrate-storage':
+        # python main.py migrate-storage [--workers 4] [--batch-size 100] [--grace-seconds 5] [--limit N]
+        import argparse
+        from src.services.core_services import CoreServices
+        parser = argparse.ArgumentParser(prog='main.py migrate-storage')
+        parser.add_argument('--workers', type=int, default=4)
+        parser.add_argument('--batch-size', type=int, default=100)
+        parser.add_argument('--grace-seconds', type=float, default=5.0)
+        parser.add_argument('--limit', type=int, default=None)
+        args = parser.parse_args(sys.argv[2:])
+        stats = CoreServices(db.engine).migrate_storage_layout(args.workers, args.batch_size, args.grace_seconds, args.limit)
+        print('[MIGRATE-STORAGE] done:', stats)
+    elif len(sys.argv) > 1 and sys.argv[1] == 'dictionary':
+        # python main.py dictionary <idioma> <dump de Wiktextract .jsonl[.gz]>
+        import os
+        from pathlib import Path
+        from src.dictionary.dictionary_index import build_index, read_wiktextract
+        language, dump = sys.argv[2], sys.argv[3]
+        out_path = Path(os.getenv('DICTIONARY_DIR', './content/dictionaries')) / f'{language}.idx'
+        print('[DICTIONARY]', build_index(read_wiktextract(dump, language), out_path), 'lemmas written to', out_path)
+    else:
+        # Antes de importar la API: las métricas abren sus archivos al importarse.
+        from src.utils.metrics.metrics_dir import reset_metrics_dir
+        reset_metrics_dir()
+
+        from src.api.api import FastApi
+        from src.services.core_services import CoreServices
+
+        services = CoreServices(db.engine)
+        api = FastApi(services)
+        api.run()
@@ -1,60 +1,137 @@
-from fastapi import FastAPI
+import asyncio
+import anyio.to_thread
+from fastapi import FastAPI, Request
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from src.api.routers.general_router import GeneralRouter
 from src.api.routers.users_router import UsersRouter
 from src.api.routers.books_router import BooksRouter
 from src.api.routers.utils_router import UtilsRouter
 from src.api.routers.admin_router import AdminRouter
+from src.api.routers.metrics_router import MetricsRouter
+from src.api.routers.annotations_router import AnnotationsRouter
+from src.api.routers.summaries_router import SummariesRouter
+from src.api.routers.uploads_router import UploadsRouter
+from src.api.middlewares.metrics_middleware import MetricsMiddleware
+from src.api.middlewares.query_accounting_middleware import QueryAccountingMiddleware
+from src.api.middlewares.admission_middleware import AdmissionControlMiddleware
+from src.api.middlewares.compression_middleware import CompressionMiddleware
+from src.utils.metrics.prometheus_metrics import mark_worker_dead
+from src.api.server_settings import ServerSettings, get_server_settings
 import uvicorn
 import os
 from src.services.core_services import CoreServices
+from src.services.microservices.security_services import PasswordPoolBusy
 from dotenv import load_dotenv
 from src.db.security.admin_seeds import default_admins_from_env
 from contextlib import asynccontextmanager
 
 class FastApi:
     def __init__(self, services: CoreServices) -> None:
-        self.origins = [
-            "http://localhost",
-            "http://localhost:3000",
-            'http://127.0.0.1',
-            "http://127.0.0.1:3000",
-            'http://192.168.10.209',
-            'http://192.168.10.209:3000',
-            "https://tests.evasoft.app"
-        ]
         load_dotenv()
-        self.app: FastAPI = FastAPI(debug=True, lifespan=self._lifespan)
+        self.settings: ServerSettings = get_server_settings()
+        self.origins = self.settings.cors_origins
+        self.app: FastAPI = FastAPI(
+            debug=not self.settings.production,
+            lifespan=self._lifespan,
+            default_response_class=ORJSONResponse,
+        )
+        # La compresión va por dentro de las métricas, que cuentan los bytes enviados.
+        self.app.add_middleware(CompressionMiddleware)
+        self.app.add_middleware(AdmissionControlMiddleware)
+        self.app.add_middleware(QueryAccountingMiddleware)
+        self.app.add_middleware(MetricsMiddleware, engine=services.engine)
+        # CORS va por fuera de todo (se registra último): las respuestas que corta el control
+        # de admisión (429) también llevan sus headers, si no el navegador no puede leerlas.
         self.app.add_middleware(
             CORSMiddleware,
             allow_origins=self.origins,
             allow_credentials=True,
             allow_methods=["*"],
             allow_headers=["*"],
+            # Retry-After de los 429, y los headers que leen los clientes de subidas reanudables.
+            expose_headers=["Retry-After", "Location", "Upload-Offset", "Upload-Length", "Upload-Expires", "Tus-Resumable"],
         )
+        self.app.add_exception_handler(PasswordPoolBusy, self._password_pool_busy)
         #self.app.add_middleware(SessionMiddleware, os.environ.get('GOOGLE_SECRET_KEY', 'KI'))
         self.services = services
         self.add_routers()
 
     @asynccontextmanager
     async def _lifespan(self, app: FastAPI):
-        # seed de admins por defecto jeje
-        admins = default_admins_from_env()
-        if admins:
-            result = self.services.sync_admins(admins, update_passwords=False)
-            print("[ADMIN SEED]", result)
+        # Hilos para las rutas síncronas de este worker.
+        anyio.to_thread.current_default_thread_limiter().total_tokens = self.settings.THREADPOOL_SIZE
+        # seed de admins por defecto jeje. Corre en segundo plano para no
+        # bloquear el arranque del worker con el hashing.
+        seed_task = asyncio.create_task(asyncio.to_thread(self._seed_admins))
         yield
+        await seed_task
+        # uvicorn ya dejó de aceptar conexiones; una ingesta que sigue en su hilo termina
+        # de publicarse antes de cerrar el pool de conexiones.
+        drained = await asyncio.to_thread(self.services.wait_for_ingests, self.settings.GRACEFUL_SHUTDOWN_TIMEOUT)
+        if not drained:
+            print(f'[SHUTDOWN] {self.services.ingests_in_flight} ingest(s) still running')
+        self.services.shutdown_password_pool()
+        self.services.shutdown_health_pool()
+        self.services.shutdown_summary_pools()
+        self.services.shutdown_upload_pool()
+        await self.services.close_google_http_client()
+        self.services.engine.dispose()
+        mark_worker_dead()
+
+    @staticmethod
+    async def _password_pool_busy(request: Request, error: PasswordPoolBusy) -> ORJSONResponse:
+        return ORJSONResponse(
+            status_code=503,
+            content={'detail': 'Too many password operations in progress, try again later.'},
+            headers={'Retry-After': str(error.retry_after)},
+        )
+
+    def _seed_admins(self) -> None:
+        try:
+            admins = default_admins_from_env()
+            if admins:
+                result = self.services.sync_admins(admins, update_passwords=False)
+                print("[ADMIN SEED]", result)
+        except Exception as e:
+            print("[ADMIN SEED] failed:", e)
 
     def run(self) -> None:
         print(f'{"=" * 34}\n{"=" * 10} Starting API {"=" * 10}\n{"=" * 34}')
         self.start()
 
     def add_routers(self) -> None:
-        routers = [GeneralRouter, UsersRouter, BooksRouter, UtilsRouter, AdminRouter]
+        routers = [GeneralRouter, UsersRouter, BooksRouter, UtilsRouter, AnnotationsRouter, SummariesRouter, UploadsRouter, AdminRouter, MetricsRouter]
         
         for router in routers:
             router = router(self.services)
             self.app.include_router(router.router, prefix=router.prefix)
 
     def start(self) -> None:
-        uvicorn.run(self.app, host='0.0.0.0', port=3030)
+        settings = self.settings
+        options = dict(
+            host=settings.HOST,
+            port=settings.PORT,
+            loop=settings.UVICORN_LOOP,
+            http=settings.UVICORN_HTTP,
+            backlog=settings.BACKLOG,
+            timeout_keep_alive=settings.KEEP_ALIVE_TIMEOUT,
+            timeout_graceful_shutdown=settings.GRACEFUL_SHUTDOWN_TIMEOUT,
+            limit_concurrency=settings.LIMIT_CONCURRENCY,
+            limit_max_requests=settings.MAX_REQUESTS,
+            proxy_headers=settings.PROXY_HEADERS,
+            forwarded_allow_ips=settings.FORWARDED_ALLOW_IPS,
+            access_log=settings.ACCESS_LOG,
+            log_level=settings.LOG_LEVEL,
+        )
+        if settings.WORKERS > 1:
+            # Cada worker crea su propia app (y su pool de conexiones) con create_app.
+            uvicorn.run('src.api.api:create_app', factory=True, workers=settings.WORKERS, **options)
+        else:
+            uvicorn.run(self.app, **options)
+
+def create_app() -> FastAPI:
+    """Factory de la app para los workers de uvicorn (WORKERS > 1)."""
+    from src.db.db_connection import DbConnection
+    db = DbConnection()
+    return FastApi(CoreServices(db.engine)).app
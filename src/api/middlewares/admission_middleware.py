@@ -0,0 +1,156 @@
+import json
+import math
+import os
+import re
+from http.cookies import SimpleCookie
+from typing import Optional
+
+import jwt
+from dotenv import load_dotenv
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from src.rate_limit.rate_limit_backend import RateLimit, RateLimitBackend
+from src.rate_limit.memory_rate_limit import MemoryRateLimit
+from src.utils.metrics.prometheus_metrics import RATE_LIMITED
+
+# Límites por defecto de las rutas caras: ingesta (unzip + reescritura XML) y búsqueda (LLM).
+DEFAULT_RATE_LIMITS = (
+    'POST /books/upload=user:20/hour:5,global:300/hour:20;'
+    'POST /books/uploads=user:20/hour:5,global:300/hour:20;'
+    'POST /admin/admin/books/upload=user:60/hour:10,global:300/hour:20;'
+    'GET /utils/search=user:30/minute:10,global:600/minute:60;'
+    'GET /summaries/book/{book_id}/chapter/{chapter_number}=user:30/minute:10,global:300/minute:60'
+)
+# Rutas que cuentan para el límite de ingestas en curso.
+INGEST_ROUTES = ('POST /books/upload', 'POST /admin/admin/books/upload')
+
+class AdmissionControlMiddleware:
+    def __init__(self, app: ASGIApp) -> None:
+        """Control de admisión de las rutas caras: token buckets por usuario y globales,
+        y un tope de ingestas en curso. Corre antes de leer el cuerpo de la petición, así un
+        upload rechazado no se llega a recibir.
+
+        - RATE_LIMITS: 'MÉTODO /ruta=user:10/minute:5,global:100/minute;...'
+          (N/periodo con ráfaga opcional; periodo en segundos o second/minute/hour/day).
+          La ruta puede tener parámetros ('/summaries/book/{book_id}'): el límite es de la
+          plantilla, no de cada URL.
+        - INGEST_MAX_CONCURRENT: ingestas simultáneas (0 desactiva el tope).
+        - RATE_LIMIT_BACKEND: 'memory' (por worker) o 'redis' (compartido, RATE_LIMIT_REDIS_URL).
+        """
+        load_dotenv()
+        self.app = app
+        self.backend: RateLimitBackend = self.create_backend()
+        self.rules: dict[str, dict[str, RateLimit]] = self.parse_rules(os.getenv('RATE_LIMITS', DEFAULT_RATE_LIMITS))
+        # Reglas con parámetros: (regex, plantilla), se prueban si no hay una regla exacta.
+        self.template_rules: list[tuple[re.Pattern, str]] = [
+            (self.template_pattern(route), route) for route in self.rules if '{' in route
+        ]
+        self.ingest_max_concurrent: int = int(os.getenv('INGEST_MAX_CONCURRENT', '4'))
+        self.ingest_retry_after: int = int(os.getenv('INGEST_RETRY_AFTER', '5'))
+        self.jwt_secret: str = os.getenv('JWT_SECRET_KEY', 'supersecretkey')
+
+    @staticmethod
+    def create_backend() -> RateLimitBackend:
+        backend = os.getenv('RATE_LIMIT_BACKEND', 'memory').strip().lower()
+        if backend == 'memory':
+            return MemoryRateLimit()
+        if backend == 'redis':
+            from src.rate_limit.redis_rate_limit import RedisRateLimit
+            return RedisRateLimit(os.getenv('RATE_LIMIT_REDIS_URL', 'redis://localhost:6379/0'))
+        raise ValueError(f"Unknown RATE_LIMIT_BACKEND '{backend}'")
+
+    @staticmethod
+    def parse_rules(raw: str) -> dict[str, dict[str, RateLimit]]:
+        """Parsea RATE_LIMITS en {'MÉTODO /ruta': {'user' | 'global': RateLimit}}."""
+        rules = {}
+        for rule in filter(None, (item.strip() for item in raw.split(';'))):
+            route, limits = rule.split('=', 1)
+            rules[' '.join(route.split())] = {
+                scope.strip(): RateLimit.parse(spec)
+                for scope, spec in (limit.split(':', 1) for limit in limits.split(','))
+            }
+        return rules
+
+    @staticmethod
+    def template_pattern(route: str) -> re.Pattern:
+        """Regex de una regla con parámetros: 'GET /books/{id}' -> ^GET /books/[^/]+$."""
+        parts = re.split(r'\{[^}]+\}', route)
+        return re.compile('^' + '[^/]+'.join(re.escape(part) for part in parts) + '$')
+
+    def match_rule(self, route: str) -> tuple[str, Optional[dict[str, RateLimit]]]:
+        """Regla de una petición. Devuelve la ruta (o la plantilla que coincidió) y sus límites."""
+        limits = self.rules.get(route)
+        if limits is None:
+            for pattern, template in self.template_rules:
+                if pattern.match(route):
+                    return template, self.rules[template]
+        return route, limits
+
+    def client_key(self, scope: Scope) -> str:
+        """Identifica al cliente por el usuario del token (sin consultar la base de datos)
+        o, si no hay un token válido, por su IP.
+        """
+        for name, value in scope.get('headers', []):
+            if name == b'cookie':
+                morsel = SimpleCookie(value.decode('latin-1')).get('access_token')
+                if morsel is None:
+                    continue
+                try:
+                    return 'user:' + str(jwt.decode(morsel.value, self.jwt_secret, algorithms=['HS256'])['sub'])
+                except (jwt.InvalidTokenError, KeyError):
+                    break
+        client = scope.get('client')
+        return f'ip:{client[0] if client else "unknown"}'
+
+    async def reject(self, send: Send, retry_after: float, detail: str) -> None:
+        body = json.dumps({'detail': detail}).encode()
+        await send({
+            'type': 'http.response.start',
+            'status': 429,
+            'headers': [
+                (b'content-type', b'application/json'),
+                (b'content-length', str(len(body)).encode()),
+                (b'retry-after', str(max(1, math.ceil(retry_after))).encode()),
+            ],
+        })
+        await send({'type': 'http.response.body', 'body': body})
+
+    async def check_limits(self, route: str, limits: dict[str, RateLimit], scope: Scope) -> Optional[float]:
+        # Todos los buckets se consultan juntos: si el global rechaza, no se gasta la ficha del usuario.
+        buckets = [
+            (f'{route}:{self.client_key(scope)}' if limit_scope == 'user' else f'{route}:global', limit)
+            for limit_scope, limit in limits.items()
+        ]
+        waits = await self.backend.take_all(buckets)
+        if not any(waits):
+            return None
+        for limit_scope, wait in zip(limits, waits):
+            if wait:
+                RATE_LIMITED.labels(route, limit_scope).inc()
+        return max(waits)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        route = f"{scope['method']} {scope['path'].rstrip('/') or '/'}"
+        rule, limits = self.match_rule(route)
+        if limits:
+            retry_after = await self.check_limits(rule, limits, scope)
+            if retry_after is not None:
+                await self.reject(send, retry_after, 'Too many requests')
+                return
+
+        if route not in INGEST_ROUTES or self.ingest_max_concurrent <= 0:
+            await self.app(scope, receive, send)
+            return
+
+        if not await self.backend.acquire_slot('ingest', self.ingest_max_concurrent):
+            RATE_LIMITED.labels(route, 'concurrency').inc()
+            await self.reject(send, self.ingest_retry_after, 'Too many uploads in progress')
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            await self.backend.release_slot('ingest')
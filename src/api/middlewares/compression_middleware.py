@@ -0,0 +1,98 @@
+import gzip
+import os
+from typing import Optional
+
+import anyio.to_thread
+from dotenv import load_dotenv
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError: # brotli es opcional: sin él sólo se ofrece gzip.
+    brotli = None
+
+class CompressionMiddleware:
+    def __init__(self, app: ASGIApp) -> None:
+        """Comprime (brotli o gzip, según Accept-Encoding) las respuestas JSON que superan
+        COMPRESSION_MIN_BYTES. Los archivos de los libros no pasan por acá: se sirven tal
+        cual (o desde el proxy inverso). Los cuerpos grandes se comprimen en el threadpool
+        para no bloquear el event loop.
+        """
+        load_dotenv()
+        self.app = app
+        self.min_bytes: int = int(os.getenv('COMPRESSION_MIN_BYTES', '1024'))
+        self.gzip_level: int = int(os.getenv('COMPRESSION_GZIP_LEVEL', '5'))
+        self.brotli_quality: int = int(os.getenv('COMPRESSION_BROTLI_QUALITY', '4'))
+        self.thread_min_bytes: int = int(os.getenv('COMPRESSION_THREAD_MIN_BYTES', str(64 * 1024)))
+        self.media_types: tuple[str, ...] = ('application/json',)
+
+    def choose_encoding(self, accept_encoding: str) -> Optional[str]:
+        """Elige la codificación según Accept-Encoding (respetando q=0)."""
+        accepted = {}
+        for item in accept_encoding.lower().split(','):
+            name, _, params = item.strip().partition(';')
+            quality = 1.0
+            if params.strip().startswith('q='):
+                try:
+                    quality = float(params.strip()[2:])
+                except ValueError:
+                    quality = 0.0
+            accepted[name.strip()] = quality
+        for encoding in (('br', 'gzip') if brotli is not None else ('gzip',)):
+            if accepted.get(encoding, accepted.get('*', 0.0)) > 0:
+                return encoding
+        return None
+
+    def compress(self, encoding: str, body: bytes) -> bytes:
+        if encoding == 'br':
+            return brotli.compress(body, quality=self.brotli_quality)
+        return gzip.compress(body, compresslevel=self.gzip_level)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+        encoding = self.choose_encoding(Headers(scope=scope).get('accept-encoding', ''))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message: Optional[Message] = None
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal start_message
+            if message['type'] == 'http.response.start':
+                headers = Headers(raw=message['headers'])
+                media_type = headers.get('content-type', '').split(';')[0].strip()
+                if media_type in self.media_types and 'content-encoding' not in headers:
+                    # Esperamos al cuerpo para decidir si vale la pena comprimir.
+                    start_message = message
+                    return
+                await send(message)
+                return
+
+            if start_message is None or message['type'] != 'http.response.body':
+                await send(message)
+                return
+
+            body = message.get('body', b'')
+            start, start_message = start_message, None
+            if message.get('more_body', False) or len(body) < self.min_bytes:
+                # Respuestas en streaming o pequeñas se envían tal cual.
+                await send(start)
+                await send(message)
+                return
+
+            if len(body) >= self.thread_min_bytes:
+                body = await anyio.to_thread.run_sync(self.compress, encoding, body)
+            else:
+                body = self.compress(encoding, body)
+            headers = MutableHeaders(scope=start)
+            headers['Content-Encoding'] = encoding
+            headers['Content-Length'] = str(len(body))
+            headers.add_vary_header('Accept-Encoding')
+            await send(start)
+            await send({'type': 'http.response.body', 'body': body})
+
+        await self.app(scope, receive, send_wrapper)
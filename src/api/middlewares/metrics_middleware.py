@@ -0,0 +1,61 @@
+import time
+from typing import Optional
+
+import anyio.to_thread
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.api.middlewares.route_templates import RouteTemplates
+from src.utils.metrics.prometheus_metrics import (
+    REQUEST_LATENCY, REQUESTS_IN_FLIGHT, RESPONSE_BYTES, THREADPOOL_IN_USE, THREADPOOL_SIZE, observe_db_pool,
+)
+from sqlalchemy import Engine
+
+class MetricsMiddleware:
+    def __init__(self, app: ASGIApp, engine: Optional[Engine] = None) -> None:
+        """Middleware ASGI que mide latencia, peticiones en curso y bytes enviados por ruta.
+        La ruta se etiqueta con su plantilla (/books/content/{book_id}/...) y no con la URL,
+        para no disparar la cardinalidad de las series.
+
+        Args:
+            app (ASGIApp): Aplicación envuelta.
+            engine (Optional[Engine], optional): Engine cuyo pool se reporta. Defaults to None.
+        """
+        self.app = app
+        self.engine = engine
+        self.route_template = RouteTemplates()
+
+    def _observe_resources(self) -> None:
+        limiter = anyio.to_thread.current_default_thread_limiter()
+        THREADPOOL_IN_USE.set(limiter.borrowed_tokens)
+        THREADPOOL_SIZE.set(limiter.total_tokens)
+        observe_db_pool(self.engine)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        method = scope['method']
+        status_code = 500
+        body_bytes = 0
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code, body_bytes
+            if message['type'] == 'http.response.start':
+                status_code = message['status']
+            elif message['type'] == 'http.response.body':
+                body_bytes += len(message.get('body', b''))
+            await send(message)
+
+        start = time.perf_counter()
+        REQUESTS_IN_FLIGHT.labels(method).inc()
+        self._observe_resources()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            REQUESTS_IN_FLIGHT.labels(method).dec()
+            self._observe_resources()
+            route = self.route_template(scope)
+            REQUEST_LATENCY.labels(method, route, str(status_code)).observe(time.perf_counter() - start)
+            if body_bytes:
+                RESPONSE_BYTES.labels(route).inc(body_bytes)
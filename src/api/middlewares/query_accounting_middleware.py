@@ -0,0 +1,77 @@
+import logging
+import os
+from typing import Optional
+
+from dotenv import load_dotenv
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.api.middlewares.route_templates import RouteTemplates
+from src.db.query_accounting import QueryStats, track_queries
+
+logger = logging.getLogger(__name__)
+
+class QueryBudgetExceeded(AssertionError):
+    """Una ruta superó su presupuesto de queries (sólo en modo estricto)."""
+
+class QueryAccountingMiddleware:
+    def __init__(self, app: ASGIApp) -> None:
+        """Cuenta las queries SQL y el tiempo de base de datos de cada petición.
+
+        - Fuera de producción agrega la cabecera ``Server-Timing`` (``db;dur=...;desc="N queries"``).
+        - Avisa en el log si una ruta supera su presupuesto de queries (SQL_QUERY_BUDGET, o
+          SQL_QUERY_BUDGETS por ruta) o repite la misma forma de statement (N+1).
+        - Con SQL_QUERY_BUDGET_STRICT=1 (tests) el aviso pasa a ser una excepción.
+        """
+        load_dotenv()
+        self.app = app
+        self.route_template = RouteTemplates()
+        self.server_timing: bool = os.getenv('APP_ENV', 'development').strip().lower() != 'production'
+        self.default_budget: int = int(os.getenv('SQL_QUERY_BUDGET', '10'))
+        self.repeat_threshold: int = int(os.getenv('SQL_REPEATED_QUERY_THRESHOLD', '3'))
+        self.strict: bool = os.getenv('SQL_QUERY_BUDGET_STRICT', '0').strip().lower() in ('1', 'true', 'yes')
+        self.route_budgets: dict[str, int] = self.parse_budgets(os.getenv('SQL_QUERY_BUDGETS', ''))
+
+    @staticmethod
+    def parse_budgets(raw: str) -> dict[str, int]:
+        """Parsea 'GET /books/read=3,/books/all=2' ({ruta (con método opcional): presupuesto})."""
+        budgets = {}
+        for item in raw.split(','):
+            if '=' in item:
+                route, budget = item.rsplit('=', 1)
+                budgets[route.strip()] = int(budget)
+        return budgets
+
+    def budget_for(self, method: str, route: str) -> int:
+        return self.route_budgets.get(f'{method} {route}', self.route_budgets.get(route, self.default_budget))
+
+    def check(self, method: str, route: str, stats: QueryStats) -> None:
+        problems = []
+        budget = self.budget_for(method, route)
+        if stats.count > budget:
+            problems.append(f'{stats.count} queries (budget {budget})')
+        for shape, times in stats.repeated(self.repeat_threshold):
+            shape = shape if len(shape) <= 240 else f'{shape[:120]} ... {shape[-120:]}'
+            problems.append(f'statement repeated {times} times: {shape}')
+        if not problems:
+            return
+        message = f'{method} {route}: ' + '; '.join(problems)
+        if self.strict:
+            raise QueryBudgetExceeded(message)
+        logger.warning('[SQL] %s', message)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        with track_queries() as stats:
+            async def send_wrapper(message: Message) -> None:
+                if message['type'] == 'http.response.start' and self.server_timing:
+                    headers = MutableHeaders(scope=message)
+                    headers.append('Server-Timing', f'db;dur={stats.duration * 1000:.1f};desc="{stats.count} queries"')
+                await send(message)
+
+            await self.app(scope, receive, send_wrapper)
+        if stats.count:
+            self.check(scope['method'], self.route_template(scope), stats)
@@ -0,0 +1,19 @@
+from typing import Callable, Optional
+from starlette.types import Scope
+
+class RouteTemplates:
+    def __init__(self) -> None:
+        """Resuelve la plantilla de la ruta de una petición (/books/content/{book_id:int}/...)
+        a partir del endpoint que el router deja en el scope. Se usa como etiqueta en
+        métricas y logs para no generar una serie por URL.
+        """
+        self._templates: Optional[dict[Callable, str]] = None
+
+    def __call__(self, scope: Scope) -> str:
+        endpoint = scope.get('endpoint')
+        if endpoint is None:
+            return 'unmatched'
+        if self._templates is None:
+            routes = getattr(scope.get('app'), 'routes', [])
+            self._templates = {route.endpoint: route.path for route in routes if hasattr(route, 'endpoint')}
+        return self._templates.get(endpoint, 'unmatched')
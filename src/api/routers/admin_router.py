@@ -1,15 +1,23 @@
 # src/api/routers/admin_router.py
-from fastapi import APIRouter, Depends, status, UploadFile, File, HTTPException
-from fastapi.responses import Response, FileResponse
-from typing import Annotated, Optional
+import asyncio
+from datetime import datetime, date
+from fastapi import APIRouter, Depends, Query, status, UploadFile, File, HTTPException
+from fastapi.responses import Response, FileResponse, PlainTextResponse, StreamingResponse
+from typing import Annotated, Literal, Optional
 from src.services.core_services import CoreServices
+from src.services.microservices.export_services import EXPORT_MEDIA_TYPES
 from src.utils.http.response_utils import HttpResponses
 from src.models.users_model import UsersModel
+from src.api.schemas.response_schemas import StandardResponse
+from src.api.schemas.books_schemas import BookSchema
+from src.api.schemas.users_schemas import UserSchema
+from src.utils.profiling.sampling_profiler import SamplingProfiler, ProfilerBusy
+from src.utils.profiling.request_profiler import ProfiledAPIRoute, PROFILE_HEADER, sign_profile_request, profile_path
 
 class AdminRouter:
     def __init__(self, services: CoreServices) -> None:
         self.prefix: str = "/admin"
-        self.router: APIRouter = APIRouter(prefix=self.prefix, tags=["Admin"])
+        self.router: APIRouter = APIRouter(prefix=self.prefix, tags=["Admin"], route_class=ProfiledAPIRoute)
         self.services = services
 
         def admin_required(user = Depends(services.get_current_user),) -> UsersModel:
@@ -17,7 +25,7 @@ class AdminRouter:
                 raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Forbidden")
             return user
 
-        @self.router.get("/users", tags=["Admin"])
+        @self.router.get("/users", tags=["Admin"], response_model=StandardResponse[list[UserSchema]])
         def list_users(response: Response, _: Annotated[UsersModel, Depends(admin_required)]) -> dict[str, object]:
             users = services.get_all_users()
             return HttpResponses.standard_response(
@@ -27,6 +35,31 @@ class AdminRouter:
                 content_response={"content": [u.serialize() for u in users]},
             )
 
+        def export_response(chunks, name: str, export_format: str) -> StreamingResponse:
+            filename = f"{name}-{date.today().isoformat()}.{export_format}"
+            return StreamingResponse(
+                chunks,
+                media_type=EXPORT_MEDIA_TYPES[export_format],
+                headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+            )
+
+        @self.router.get("/users/export", tags=["Admin"])
+        def export_users(
+            _: Annotated[UsersModel, Depends(admin_required)],
+            format: Literal["ndjson", "csv"] = "ndjson",
+            role: Optional[str] = None,
+            user_type: Optional[str] = None,
+            created_from: Optional[datetime] = None,
+            created_to: Optional[datetime] = None,
+        ) -> StreamingResponse:
+            """Exporta todos los usuarios en NDJSON o CSV, en streaming.
+
+            ``created_from`` es inclusivo y ``created_to`` exclusivo; los usuarios anteriores a
+            la columna created_at quedan fuera de cualquier filtro por fecha.
+            """
+            chunks = services.export_users(format, role, user_type, created_from, created_to)
+            return export_response(chunks, "users", format)
+
         @self.router.delete("/users/{user_id:int}", tags=["Admin"])
         def delete_user(response: Response, user_id: int, _: Annotated[UsersModel, Depends(admin_required)]) -> dict[str, object]:
             user_to_delete = services.get_user_by_id(user_id)
@@ -56,8 +89,8 @@ class AdminRouter:
                 return HttpResponses.standard_response(response, status.HTTP_400_BAD_REQUEST, "Forbidden")
             # Implementación simple: usar role='banned' para ban permanente.
             # Para ban temporal,  podriamos agregar una columna banned_until en UsersModel y lógica en get_current_user idk?
-            updated = services.edit_user(email=email, name=None, password=None, image=None)
-            updated.role = "banned" if permanent  else "banned"
+            # Banear revoca todos los tokens del usuario.
+            updated = services.set_user_role(email, "banned" if permanent  else "banned")
             return HttpResponses.standard_response(
                 response=response,
                 status_code=status.HTTP_200_OK,
@@ -77,8 +110,7 @@ class AdminRouter:
                 return HttpResponses.standard_response(response, status.HTTP_404_NOT_FOUND, "NotFound")
             if new_role not in ("user", "admin"):
                 return HttpResponses.standard_response(response, status.HTTP_400_BAD_REQUEST, "BadRole")
-            updated = services.edit_user(email=email, name=None, password=None, image=None)
-            updated.role = new_role
+            updated = services.set_user_role(email, new_role)
             return HttpResponses.standard_response(
                 response=response,
                 status_code=status.HTTP_200_OK,
@@ -86,7 +118,7 @@ class AdminRouter:
                 content_response={"content": {"email": email, "role": updated.role}},
             )
 
-        @self.router.get("/books", tags=["Admin"])
+        @self.router.get("/books", tags=["Admin"], response_model=StandardResponse[list[BookSchema]])
         def list_books(response: Response, _: Annotated[UsersModel, Depends(admin_required)]) -> dict[str, object]:
             books = services.get_all_books()
             return HttpResponses.standard_response(
@@ -96,6 +128,20 @@ class AdminRouter:
                 content_response={"content": [b.serialize() for b in books]},
             )
 
+        @self.router.get("/books/export", tags=["Admin"])
+        def export_books(
+            _: Annotated[UsersModel, Depends(admin_required)],
+            format: Literal["ndjson", "csv"] = "ndjson",
+            owner_id: Optional[int] = None,
+            book_type: Optional[str] = None,
+            language: Optional[str] = None,
+            created_from: Optional[datetime] = None,
+            created_to: Optional[datetime] = None,
+        ) -> StreamingResponse:
+            """Exporta todos los libros en NDJSON o CSV, en streaming (mismos filtros de fecha que /users/export)."""
+            chunks = services.export_books(format, owner_id, book_type, language, created_from, created_to)
+            return export_response(chunks, "books", format)
+
         @self.router.get("/books/{book_id:int}", tags=["Admin"])
         def get_book(
             response: Response,
@@ -141,3 +187,55 @@ class AdminRouter:
                 status_title="Ok",
                 content_response={"content": book.serialize()},
             )
+
+        @self.router.post("/profile/sample", tags=["Admin"])
+        async def sample_profile(
+            _: Annotated[UsersModel, Depends(admin_required)],
+            seconds: Annotated[float, Query(gt=0, le=60)] = 10,
+            interval_ms: Annotated[float, Query(ge=1, le=1000)] = 10,
+        ) -> PlainTextResponse:
+            """Muestrea las pilas de todos los hilos de este worker durante ``seconds``
+            segundos y devuelve un archivo collapsed para flamegraph/speedscope.
+            """
+            profiler = SamplingProfiler(interval=interval_ms / 1000)
+            try:
+                collapsed = await asyncio.to_thread(profiler.run, seconds)
+            except ProfilerBusy:
+                raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="A profile is already running")
+            return PlainTextResponse(
+                collapsed,
+                headers={
+                    "Content-Disposition": 'attachment; filename="profile.collapsed"',
+                    "X-Profile-Samples": str(profiler.samples),
+                },
+            )
+
+        @self.router.post("/profile/request", tags=["Admin"])
+        def sign_request_profile(
+            response: Response,
+            path: str,
+            _: Annotated[UsersModel, Depends(admin_required)],
+            ttl_seconds: Annotated[int, Query(gt=0, le=3600)] = 300,
+        ) -> dict[str, object]:
+            """Firma un permiso para profilear con cProfile las peticiones a ``path``."""
+            return HttpResponses.standard_response(
+                response=response,
+                status_code=status.HTTP_200_OK,
+                status_title="Ok",
+                content_response={"content": {"header": PROFILE_HEADER, "value": sign_profile_request(path, ttl_seconds), "path": path}},
+            )
+
+        @self.router.get("/profile/{profile_id}", tags=["Admin"])
+        def get_request_profile(
+            response: Response,
+            profile_id: str,
+            _: Annotated[UsersModel, Depends(admin_required)],
+            raw: bool = False,
+        ) -> FileResponse:
+            """Devuelve el resultado de un profile de petición (texto, o el .prof con ``raw``)."""
+            path = profile_path(profile_id, "prof" if raw else "txt")
+            if path is None or not path.exists():
+                return HttpResponses.standard_response(response, status.HTTP_404_NOT_FOUND, "ProfileNotFound")
+            if raw:
+                return FileResponse(path, media_type="application/octet-stream", filename=f"{profile_id}.prof")
+            return FileResponse(path, media_type="text/plain")
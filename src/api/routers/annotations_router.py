@@ -0,0 +1,56 @@
+from fastapi import APIRouter, status, Depends
+from fastapi.responses import Response
+from src.services.core_services import CoreServices
+from src.utils.http.response_utils import HttpResponses
+from src.utils.profiling.request_profiler import ProfiledAPIRoute
+from src.api.schemas.response_schemas import StandardResponse
+from src.api.schemas.annotations_schemas import AnnotationSchema, AnnotationsSyncSchema
+
+class AnnotationsRouter:
+    def __init__(self, services: CoreServices) -> None:
+        self.prefix: str = '/annotations'
+        self.router: APIRouter = APIRouter(route_class=ProfiledAPIRoute)
+
+        @self.router.post('/sync', tags=['Annotations'])
+        def sync_annotations(
+            response: Response,
+            body: AnnotationsSyncSchema,
+            user = Depends(services.get_current_user),
+        ) -> dict[str, object]:
+            """Sube los cambios hechos offline y devuelve los cambios del servidor desde ``since``.
+
+            Args:
+                body (AnnotationsSyncSchema): Última versión vista por el cliente y cambios pendientes.
+
+            Returns:
+                dict[str, object]: Nueva versión, cambios (incluye tombstones), conflictos y rechazos.
+            """
+            if len(body.changes) > services.annotations_sync_max_changes:
+                return HttpResponses.standard_response(
+                    response=response,
+                    status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                    status_title='TooManyChanges',
+                    content_response={'content': {'max_changes': services.annotations_sync_max_changes}},
+                )
+            result = services.sync_annotations(user, body.since, [change.model_dump() for change in body.changes])
+            return HttpResponses.standard_response(
+                response=response,
+                status_code=status.HTTP_200_OK,
+                status_title='Ok',
+                content_response={'content': result},
+            )
+
+        @self.router.get('/book/{book_id:int}', tags=['Annotations'], response_model=StandardResponse[list[AnnotationSchema]])
+        def book_annotations(
+            response: Response,
+            book_id: int,
+            user = Depends(services.get_current_user),
+        ) -> dict[str, object]:
+            """Devuelve las anotaciones vigentes del usuario en un libro."""
+            annotations = services.get_book_annotations(user, book_id)
+            return HttpResponses.standard_response(
+                response=response,
+                status_code=status.HTTP_200_OK,
+                status_title='Ok',
+                content_response={'content': [annotation.serialize() for annotation in annotations]},
+            )
@@ -1,16 +1,20 @@
 import mimetypes
-from fastapi import APIRouter, HTTPException, status, Depends, UploadFile, File
+from fastapi import APIRouter, HTTPException, status, Depends, UploadFile, File, Query, Request
 from fastapi.responses import Response, FileResponse
 from src.services.core_services import CoreServices
 from src.utils.http.response_utils import HttpResponses
+from src.utils.profiling.request_profiler import ProfiledAPIRoute
+from src.api.schemas.response_schemas import StandardResponse
+from src.api.schemas.books_schemas import BookSchema
 from pathlib import Path, PurePosixPath
 
-from typing import Annotated
+from typing import Annotated, Literal, Optional, Union
+from sqlalchemy import Row
 
 class BooksRouter:
     def __init__(self, services: CoreServices) -> None:
         self.prefix: str = '/books'
-        self.router: APIRouter = APIRouter() 
+        self.router: APIRouter = APIRouter(route_class=ProfiledAPIRoute) 
         def raise_authorized() -> None:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
@@ -38,6 +42,7 @@ class BooksRouter:
             
             resource_relative_path = PurePosixPath(path_fragments)  # Normaliza la ruta para evitar problemas de seguridad
             resource_path = (Path(book.opf_path).parent.resolve() / resource_relative_path).resolve()
+            resource_key = PurePosixPath(book.opf_path).parent / resource_relative_path
             if resource_relative_path.is_absolute() or any(part == '..' for part in resource_relative_path.parts) or str(Path(book.opf_path).parent) not in str(resource_path):
                 return HttpResponses.standard_response(
                     response=response,
@@ -45,13 +50,13 @@ class BooksRouter:
                     status_title='SuckMyDickBruh',
                 )
 
-            if not resource_path.exists() or not resource_path.is_file():
+            if not services.storage.exists(resource_key):
                 return HttpResponses.standard_response(
                     response=response,
                     status_code=status.HTTP_404_NOT_FOUND,
                     status_title='ResourceNotFound',
                 )
-            return FileResponse(path=resource_path, media_type=mimetypes.guess_type(resource_path)[0])
+            return services.file_response(resource_key, media_type=mimetypes.guess_type(resource_key.name)[0])
 
         @self.router.get('/get/cover', tags=['Books'])
         def get_book_cover(response: Response, book_id: int, user = Depends(services.get_current_user)) -> FileResponse:
@@ -70,7 +75,7 @@ class BooksRouter:
                     status_code=status.HTTP_404_NOT_FOUND,
                     status_title='BookNotFound',
                 )
-            if not book.cover_path or not Path(book.cover_path).exists():
+            if not book.cover_path or not services.storage.exists(book.cover_path):
                 return HttpResponses.standard_response(
                     response=response,
                     status_code=status.HTTP_404_NOT_FOUND,
@@ -81,19 +86,158 @@ class BooksRouter:
                 return raise_authorized()
 
             mediatype, _ = mimetypes.guess_type(book.cover_path)
-            return FileResponse(path=Path(book.cover_path), media_type=mediatype)
+            return services.file_response(book.cover_path, media_type=mediatype)
+
+        def find_chapter(response: Response, book_id: int, chapter_number: int, user) -> Union[Row, dict]:
+            """Busca el capítulo y verifica que pertenezca al usuario."""
+            chapter = services.read_book(book_id, chapter_number)
+            if not chapter:
+                if not services.book_exists(book_id):
+                    return HttpResponses.standard_response(
+                        response=response,
+                        status_code=status.HTTP_404_NOT_FOUND,
+                        status_title='BookNotFound',
+                    )
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="The chapter number is out of range.",
+                )
+            if chapter.owner_id != user.id:
+                return raise_authorized()
+            return chapter
 
         @self.router.get('/read', tags=['Books'])
-        def read_book(response: Response, book_id: int, chapter_number: int, user = Depends(services.get_current_user)) -> FileResponse:
-            """Obtiene el contenido HTML de un capítulo específico de un libro.
+        def read_book(
+            response: Response,
+            book_id: int,
+            chapter_number: int,
+            variant: Literal['reader', 'original'] = 'reader',
+            fragment: Optional[int] = None,
+            zoom: float = Query(1.5, ge=0.25, le=4),
+            user = Depends(services.get_current_user),
+        ) -> FileResponse:
+            """Obtiene el contenido HTML de un capítulo específico de un libro. En los PDF
+            cada capítulo es una página, que se devuelve renderizada como PNG.
 
             Args:
                 book_id (int): Id del libro.
-                chapter_number (int): Número del capítulo a leer.
+                chapter_number (int): Número del capítulo (o página) a leer.
+                variant (str): 'reader' (minificado y saneado, si existe) u 'original' (el archivo del EPUB).
+                fragment (Optional[int]): Fragmento del capítulo a leer (empezando en 0). Sin él se devuelve el capítulo entero.
+                zoom (float): Escala del renderizado de las páginas de PDF (1.0 = 72 dpi), entre 0.25 y 4.
 
             Returns:
                 HTMLResponse: Devuelve el contenido HTML del capítulo solicitado.
             """            
+            chapter = find_chapter(response, book_id, chapter_number, user)
+            if isinstance(chapter, dict):
+                return chapter
+
+            if chapter.book_type == 'pdf':
+                # Redondeamos el zoom para que las páginas cacheadas se reutilicen.
+                zoom = round(zoom * 4) / 4
+                if not services.storage.exists(chapter.original_file_path):
+                    raise HTTPException(
+                        status_code=status.HTTP_404_NOT_FOUND,
+                        detail="The book file does not exist.",
+                    )
+                page = services.render_pdf_page(chapter.original_file_path, chapter_number - 1, zoom)
+                return services.file_response(str(page), media_type='image/png', static=True)
+
+            # Los capítulos ingestados antes de la variante lector se sirven en su versión original.
+            path = chapter.reader_path if variant == 'reader' and chapter.reader_path else chapter.path
+            # Un capítulo sin dividir tiene un único fragmento: el capítulo entero.
+            fragments = chapter.fragments or []
+            if variant == 'original' and chapter.reader_path:
+                # Los fragmentos se generan de la variante lector: la original sólo se sirve entera.
+                if fragment is not None:
+                    raise HTTPException(
+                        status_code=status.HTTP_400_BAD_REQUEST,
+                        detail="Fragments are only available for the reader variant.",
+                    )
+                fragments = []
+            if fragment is not None:
+                if not 0 <= fragment < max(1, len(fragments)):
+                    raise HTTPException(
+                        status_code=status.HTTP_400_BAD_REQUEST,
+                        detail="The fragment number is out of range.",
+                    )
+                if fragments:
+                    path = fragments[fragment]['path']
+            if not services.storage.exists(path):
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="The chapter file does not exist.",
+                )
+            mediatype, _ = mimetypes.guess_type(path)
+            file = services.file_response(path, media_type=mediatype)
+            file.headers['X-Chapter-Fragments'] = str(max(1, len(fragments)))
+            return file
+
+        @self.router.get('/read/fragments', tags=['Books'])
+        def read_book_fragments(response: Response, book_id: int, chapter_number: int, user = Depends(services.get_current_user)) -> dict[str, object]:
+            """Obtiene el índice de fragmentos de un capítulo, para cargarlo de a partes.
+
+            Args:
+                book_id (int): Id del libro.
+                chapter_number (int): Número del capítulo.
+
+            Returns:
+                dict[str, object]: Devuelve los fragmentos (en orden, con su tamaño) y el mapa ancla -> fragmento.
+            """
+            chapter = find_chapter(response, book_id, chapter_number, user)
+            if isinstance(chapter, dict):
+                return chapter
+            fragments = [{'fragment': index, 'byte_size': item['byte_size']} for index, item in enumerate(chapter.fragments or [])]
+            return HttpResponses.standard_response(
+                response=response,
+                status_code=status.HTTP_200_OK,
+                status_title='Ok',
+                content_response={
+                    'content': {
+                        'fragments': fragments or [{'fragment': 0, 'byte_size': None}],
+                        'anchor_map': chapter.anchor_map or {},
+                    }
+                }
+            )
+
+        @self.router.get('/read/text', tags=['Books'])
+        def read_book_text(response: Response, book_id: int, chapter_number: int, user = Depends(services.get_current_user)) -> Response:
+            """Obtiene el texto extraído de una página de un PDF.
+
+            Args:
+                book_id (int): Id del libro.
+                chapter_number (int): Número de la página.
+
+            Returns:
+                Response: Devuelve el texto plano de la página.
+            """
+            chapter = find_chapter(response, book_id, chapter_number, user)
+            if isinstance(chapter, dict):
+                return chapter
+            if chapter.text_offset is None:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Page text is only available for PDF books.",
+                )
+            if not chapter.byte_size:
+                return Response(content=b'', media_type='text/plain; charset=utf-8')
+            # Leemos sólo el rango de la página dentro del texto del libro.
+            end = chapter.text_offset + chapter.byte_size - 1
+            text = b''.join(services.storage.iter_chunks(chapter.path, chapter.text_offset, end))
+            return Response(content=text, media_type='text/plain; charset=utf-8')
+
+        @self.router.get('/original', tags=['Books'])
+        def get_original_file(request: Request, response: Response, book_id: int, user = Depends(services.get_current_user)) -> FileResponse:
+            """Descarga el archivo original del libro (EPUB o PDF). Soporta peticiones con
+            Range, para que el cliente pueda cargarlo de forma incremental.
+
+            Args:
+                book_id (int): Id del libro.
+
+            Returns:
+                FileResponse: Devuelve el archivo original.
+            """
             book = services.get_book(book_id)
             if not book:
                 return HttpResponses.standard_response(
@@ -103,10 +247,13 @@ class BooksRouter:
                 )
             if book.owner_id != user.id:
                 return raise_authorized()
-
-            chapter_path = services.read_book(book_id, chapter_number)
-            mediatype, _ = mimetypes.guess_type(chapter_path)
-            return FileResponse(path=Path(chapter_path), media_type=mediatype)
+            if not services.storage.exists(book.original_file_path):
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="The book file does not exist.",
+                )
+            media_type = 'application/pdf' if book.book_type == 'pdf' else 'application/epub+zip'
+            return services.file_response(book.original_file_path, media_type=media_type, range_header=request.headers.get('range'))
 
         @self.router.get('/get', tags=['Books'])
         def get_book(response: Response, id: int, user = Depends(services.get_current_user)) -> dict[str, object]:
@@ -130,7 +277,7 @@ class BooksRouter:
                 }
             )
         
-        @self.router.get('/all', tags=['Books'])
+        @self.router.get('/all', tags=['Books'], response_model=StandardResponse[list[BookSchema]])
         def get_all_books(response: Response, user = Depends(services.get_current_user)) -> dict[str, object]:
             """Devuelve los libros del usuario autenticado."""
             books = services.get_all_my_books(user)
@@ -2,6 +2,7 @@ from fastapi import APIRouter, status, Depends, Request
 from fastapi.responses import Response, FileResponse
 from src.services.core_services import CoreServices
 from src.utils.http.response_utils import HttpResponses
+from src.utils.profiling.request_profiler import ProfiledAPIRoute
 from pathlib import Path
 
 from typing import Annotated
@@ -10,12 +11,12 @@ from fastapi.security import OAuth2PasswordBearer
 class GeneralRouter:
     def __init__(self, services: CoreServices) -> None:
         self.prefix: str = ''
-        self.router: APIRouter = APIRouter() 
+        self.router: APIRouter = APIRouter(route_class=ProfiledAPIRoute) 
         self.oauth2_scheme = OAuth2PasswordBearer(tokenUrl='token')
 
         @self.router.get('/', tags=['General'])
-        def home(response: Response) -> dict[str, object]:
-            all_users = services.get_all_users()
+        async def home(response: Response) -> dict[str, object]:
+            # Sin I/O: los balanceadores y monitores de uptime suelen apuntar acá.
             return HttpResponses.standard_response(
                 response=response,
                 status_code=status.HTTP_200_OK,
@@ -23,4 +24,37 @@ class GeneralRouter:
                 content_response={
                     'ping': 'pong'
                 }
+            )
+
+        @self.router.get('/healthz', tags=['General'])
+        async def healthz(response: Response) -> dict[str, object]:
+            """Liveness: el proceso responde. No toca la base ni el almacén (y al ser async
+            no depende del threadpool).
+            """
+            return HttpResponses.standard_response(
+                response=response,
+                status_code=status.HTTP_200_OK,
+                status_title='Ok',
+                content_response={
+                    'status': 'alive'
+                }
+            )
+
+        @self.router.get('/readyz', tags=['General'])
+        def readyz(response: Response) -> dict[str, object]:
+            """Readiness: base de datos, almacén de contenido escribible y cola de ingestas.
+            Los resultados se cachean unos segundos (ver HealthServices).
+
+            Returns:
+                dict[str, object]: Devuelve 200 si el worker puede recibir tráfico, 503 si no.
+            """
+            ready, checks = services.readiness()
+            return HttpResponses.standard_response(
+                response=response,
+                status_code=status.HTTP_200_OK if ready else status.HTTP_503_SERVICE_UNAVAILABLE,
+                status_title='Ready' if ready else 'NotReady',
+                content_response={
+                    'status': 'ready' if ready else 'not_ready',
+                    'checks': checks,
+                }
             )
\ No newline at end of file
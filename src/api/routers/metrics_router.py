@@ -0,0 +1,16 @@
+from fastapi import APIRouter
+from fastapi.responses import Response
+from src.services.core_services import CoreServices
+from src.utils.metrics.prometheus_metrics import render_latest, observe_db_pool
+
+class MetricsRouter:
+    def __init__(self, services: CoreServices) -> None:
+        self.prefix: str = ''
+        self.router: APIRouter = APIRouter()
+
+        @self.router.get('/metrics', tags=['General'], include_in_schema=False)
+        def metrics() -> Response:
+            """Exposición de métricas para Prometheus (agrega todos los workers si hay varios)."""
+            observe_db_pool(services.engine)
+            content, content_type = render_latest()
+            return Response(content=content, media_type=content_type)
@@ -0,0 +1,112 @@
+import asyncio
+import logging
+from fastapi import APIRouter, HTTPException, status, Depends
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import Response
+from src.services.core_services import CoreServices
+from src.utils.http.response_utils import HttpResponses
+from src.utils.profiling.request_profiler import ProfiledAPIRoute
+
+logger = logging.getLogger(__name__)
+
+class SummariesRouter:
+    def __init__(self, services: CoreServices) -> None:
+        self.prefix: str = '/summaries'
+        self.router: APIRouter = APIRouter(route_class=ProfiledAPIRoute)
+
+        def own_book(response: Response, book_id: int, user):
+            """Busca el libro y verifica que pertenezca al usuario."""
+            book = services.get_book(book_id)
+            if not book:
+                return HttpResponses.standard_response(response, status.HTTP_404_NOT_FOUND, 'BookNotFound')
+            if book.owner_id != user.id:
+                raise HTTPException(
+                    status_code=status.HTTP_401_UNAUTHORIZED,
+                    detail="You don't have permission to perform this action"
+                )
+            return book
+
+        @self.router.post('/book/{book_id:int}', tags=['Summaries'])
+        def start_book_summary(response: Response, book_id: int, user = Depends(services.get_current_user)) -> dict[str, object]:
+            """Lanza el resumen del libro en segundo plano (o devuelve el trabajo que ya está en curso).
+
+            Returns:
+                dict[str, object]: Devuelve el trabajo; su progreso se consulta en /summaries/jobs/{job_id}.
+            """
+            book = own_book(response, book_id, user)
+            if isinstance(book, dict):
+                return book
+            job = services.start_book_summary(book, user.id)
+            return HttpResponses.standard_response(
+                response=response,
+                status_code=status.HTTP_202_ACCEPTED,
+                status_title='Accepted',
+                content_response={'content': job.serialize()},
+            )
+
+        @self.router.get('/book/{book_id:int}', tags=['Summaries'])
+        def get_book_summary(response: Response, book_id: int, user = Depends(services.get_current_user)) -> dict[str, object]:
+            """Devuelve el resumen del libro, si ya se generó."""
+            book = own_book(response, book_id, user)
+            if isinstance(book, dict):
+                return book
+            summary = services.get_book_summary(book_id)
+            if summary is None:
+                return HttpResponses.standard_response(response, status.HTTP_404_NOT_FOUND, 'SummaryNotFound')
+            return HttpResponses.standard_response(
+                response=response,
+                status_code=status.HTTP_200_OK,
+                status_title='Ok',
+                content_response={'content': summary},
+            )
+
+        @self.router.get('/book/{book_id:int}/chapter/{chapter_number:int}', tags=['Summaries'])
+        async def get_chapter_summary(
+            response: Response,
+            book_id: int,
+            chapter_number: int,
+            user = Depends(services.get_current_user),
+        ) -> dict[str, object]:
+            """Resume un capítulo. Si ya estaba en la caché se responde al instante, desde el
+            threadpool de las peticiones; si no, la llamada al modelo corre en el pool acotado
+            de resúmenes.
+
+            Args:
+                book_id (int): Id del libro.
+                chapter_number (int): Número del capítulo (o de la página, en un PDF; se resume
+                    el grupo de páginas que la incluye).
+            """
+            book = await run_in_threadpool(own_book, response, book_id, user)
+            if isinstance(book, dict):
+                return book
+            unit, summary = await run_in_threadpool(services.cached_chapter_summary, book_id, chapter_number)
+            if unit is None:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="The chapter number is out of range.",
+                )
+            if summary is None:
+                try:
+                    summary = await asyncio.wrap_future(services.submit_chapter_summary(book_id, chapter_number, unit))
+                except Exception:
+                    logger.exception('Chapter summary failed (book %s, chapter %s)', book_id, chapter_number)
+                    return HttpResponses.standard_response(response, status.HTTP_502_BAD_GATEWAY, 'SummaryFailed')
+            return HttpResponses.standard_response(
+                response=response,
+                status_code=status.HTTP_200_OK,
+                status_title='Ok',
+                content_response={'content': summary},
+            )
+
+        @self.router.get('/jobs/{job_id}', tags=['Summaries'])
+        def get_summary_job(response: Response, job_id: str, user = Depends(services.get_current_user)) -> dict[str, object]:
+            """Devuelve el estado y el progreso de un trabajo de resumen."""
+            job = services.get_summary_job(job_id)
+            if job is None or job.user_id != user.id:
+                return HttpResponses.standard_response(response, status.HTTP_404_NOT_FOUND, 'JobNotFound')
+            return HttpResponses.standard_response(
+                response=response,
+                status_code=status.HTTP_200_OK,
+                status_title='Ok',
+                content_response={'content': job.serialize()},
+            )
@@ -0,0 +1,161 @@
+import base64
+import binascii
+import datetime
+from email.utils import format_datetime
+from typing import Annotated, Optional
+
+import anyio.to_thread
+from fastapi import APIRouter, HTTPException, status, Depends, Header, Request
+from fastapi.responses import Response
+from starlette.requests import ClientDisconnect
+from src.services.core_services import CoreServices
+from src.services.microservices.upload_services import UploadConflict, UploadLocked
+from src.utils.http.response_utils import HttpResponses
+from src.utils.profiling.request_profiler import ProfiledAPIRoute
+
+TUS_VERSION = '1.0.0'
+# Los chunks de la petición se juntan hasta este tamaño antes de escribirlos (en un hilo).
+WRITE_BUFFER_BYTES = 1024 * 1024
+
+def parse_upload_metadata(raw: Optional[str]) -> dict[str, str]:
+    """Parsea Upload-Metadata de tus: 'clave valor_base64,clave valor_base64'."""
+    metadata = {}
+    for item in filter(None, (part.strip() for part in (raw or '').split(','))):
+        key, _, value = item.partition(' ')
+        try:
+            metadata[key] = base64.b64decode(value, validate=True).decode('utf-8')
+        except (binascii.Error, UnicodeDecodeError):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail='Invalid Upload-Metadata')
+    return metadata
+
+class UploadsRouter:
+    def __init__(self, services: CoreServices) -> None:
+        self.prefix: str = '/books/uploads'
+        self.router: APIRouter = APIRouter(route_class=ProfiledAPIRoute)
+
+        def own_upload(upload_id: str, user):
+            upload = services.get_upload(upload_id)
+            if upload is None or upload.user_id != user.id:
+                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='UploadNotFound')
+            return upload
+
+        def upload_headers(upload, offset: int) -> dict[str, str]:
+            return {
+                'Tus-Resumable': TUS_VERSION,
+                'Upload-Offset': str(offset),
+                'Upload-Length': str(upload.length),
+                'Upload-Expires': format_datetime(upload.expires_at.astimezone(datetime.UTC), usegmt=True),
+                'Cache-Control': 'no-store',
+            }
+
+        @self.router.post('', tags=['Uploads'])
+        def create_upload(
+            response: Response,
+            request: Request,
+            upload_length: Annotated[int, Header()],
+            upload_metadata: Annotated[Optional[str], Header()] = None,
+            idempotency_key: Annotated[Optional[str], Header(max_length=255)] = None,
+            user = Depends(services.get_current_user),
+        ) -> dict[str, object]:
+            """Crea una subida reanudable. Los chunks se mandan con PATCH a la URL de Location.
+
+            Headers:
+                Upload-Length: Tamaño del archivo en bytes.
+                Upload-Metadata: 'filename <base64>' (obligatorio) y 'sha256 <base64 del hex>' (opcional).
+                Idempotency-Key: Reintentar con la misma clave devuelve la misma subida.
+            """
+            metadata = parse_upload_metadata(upload_metadata)
+            if not metadata.get('filename'):
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail='Upload-Metadata must include a filename')
+            if upload_length <= 0:
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail='Invalid Upload-Length')
+            if upload_length > services.upload_max_bytes:
+                raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail='File too large')
+
+            upload, created = services.create_upload(user.id, metadata['filename'], upload_length, idempotency_key, metadata.get('sha256'))
+            offset = services.upload_offset(upload)
+            response.headers.update(upload_headers(upload, offset))
+            response.headers['Location'] = str(request.url_for('upload_status', upload_id=upload.id))
+            return HttpResponses.standard_response(
+                response=response,
+                status_code=status.HTTP_201_CREATED if created else status.HTTP_200_OK,
+                status_title='Created' if created else 'Ok',
+                content_response={'content': upload.serialize(offset)},
+            )
+
+        @self.router.head('/{upload_id}', tags=['Uploads'])
+        def upload_head(upload_id: str, user = Depends(services.get_current_user)) -> Response:
+            """Devuelve en Upload-Offset cuántos bytes se recibieron (desde dónde reanudar)."""
+            upload = own_upload(upload_id, user)
+            return Response(status_code=status.HTTP_200_OK, headers=upload_headers(upload, services.upload_offset(upload)))
+
+        @self.router.get('/{upload_id}', tags=['Uploads'])
+        def upload_status(response: Response, upload_id: str, user = Depends(services.get_current_user)) -> dict[str, object]:
+            """Estado de la subida; al terminar la ingesta incluye el id del libro."""
+            upload = own_upload(upload_id, user)
+            return HttpResponses.standard_response(
+                response=response,
+                status_code=status.HTTP_200_OK,
+                status_title='Ok',
+                content_response={'content': upload.serialize(services.upload_offset(upload))},
+            )
+
+        @self.router.patch('/{upload_id}', tags=['Uploads'])
+        async def upload_chunk(
+            request: Request,
+            upload_id: str,
+            upload_offset: Annotated[int, Header()],
+            content_type: Annotated[Optional[str], Header()] = None,
+            user = Depends(services.get_current_user),
+        ) -> Response:
+            """Agrega un chunk en Upload-Offset. El cuerpo se escribe a medida que llega, así que
+            un corte deja guardado lo recibido y se reanuda desde el Upload-Offset del HEAD.
+            El chunk que completa el archivo lanza la ingesta (una sola vez aunque se reintente).
+            """
+            if content_type != 'application/offset+octet-stream':
+                raise HTTPException(status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE, detail='Expected application/offset+octet-stream')
+            upload = await anyio.to_thread.run_sync(own_upload, upload_id, user)
+            try:
+                writer = await anyio.to_thread.run_sync(services.open_upload, upload, upload_offset)
+            except UploadLocked:
+                raise HTTPException(status_code=status.HTTP_423_LOCKED, detail='Upload in progress')
+            except UploadConflict as conflict:
+                chunk_end = upload_offset + int(request.headers.get('content-length') or 0)
+                if upload.status != 'uploading' and upload.length in (upload_offset, chunk_end):
+                    # Reintento del chunk que completó la subida: ya está recibida (y no se ingesta de nuevo).
+                    return Response(status_code=status.HTTP_204_NO_CONTENT, headers=upload_headers(upload, upload.length))
+                return Response(status_code=status.HTTP_409_CONFLICT, headers=upload_headers(upload, conflict.offset))
+
+            too_large = int(request.headers.get('content-length') or 0) > writer.remaining
+            buffer = bytearray()
+            try:
+                if not too_large:
+                    async for chunk in request.stream():
+                        buffer += chunk
+                        if len(buffer) > writer.remaining:
+                            too_large = True
+                            break
+                        if len(buffer) >= WRITE_BUFFER_BYTES:
+                            await anyio.to_thread.run_sync(writer.write, bytes(buffer))
+                            buffer.clear()
+                    if buffer and not too_large:
+                        await anyio.to_thread.run_sync(writer.write, bytes(buffer))
+            except ClientDisconnect:
+                # Lo recibido hasta acá queda; el cliente reanuda desde el Upload-Offset del HEAD.
+                if buffer and not too_large:
+                    await anyio.to_thread.run_sync(writer.write, bytes(buffer))
+            finally:
+                await anyio.to_thread.run_sync(services.close_upload, writer)
+
+            headers = upload_headers(upload, writer.offset)
+            if too_large:
+                return Response(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, headers=headers)
+            return Response(status_code=status.HTTP_204_NO_CONTENT, headers=headers)
+
+        @self.router.delete('/{upload_id}', tags=['Uploads'])
+        def abort_upload(upload_id: str, user = Depends(services.get_current_user)) -> Response:
+            """Cancela una subida y borra lo recibido."""
+            upload = own_upload(upload_id, user)
+            if not services.abort_upload(upload):
+                raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail='Upload already completed')
+            return Response(status_code=status.HTTP_204_NO_CONTENT, headers={'Tus-Resumable': TUS_VERSION})
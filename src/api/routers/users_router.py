@@ -1,24 +1,24 @@
-import httpx
+import logging
 import os
 from fastapi import APIRouter, HTTPException, status, Depends, Request
 from fastapi.responses import FileResponse, Response, RedirectResponse
+from fastapi.concurrency import run_in_threadpool
 from src.services.core_services import CoreServices
 from src.utils.http.response_utils import HttpResponses
+from src.utils.profiling.request_profiler import ProfiledAPIRoute
+from src.api.schemas.response_schemas import StandardResponse
+from src.api.schemas.users_schemas import UserSchema
 from src.models.users_model import UsersModel
-from google.oauth2 import id_token
-from google.auth.transport import requests
 from typing import Annotated, Union
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 
+logger = logging.getLogger(__name__)
+
 class UsersRouter:
     def __init__(self, services: CoreServices) -> None:
         self.prefix: str = '/users'
-        self.router: APIRouter = APIRouter() 
-        GOOGLE_CLIENT_ID = os.getenv("GOOGLE_CLIENT_ID")
-        GOOGLE_SECRET_KEY = os.getenv("GOOGLE_SECRET_KEY")
-        GOOGLE_REDIRECT_URI = os.getenv("GOOGLE_REDIRECT_CALLBACK_URI", "http://localhost:3030/users/auth/google/callback")
+        self.router: APIRouter = APIRouter(route_class=ProfiledAPIRoute) 
         GOOGLE_REDIRECT_FRONTEND_URI = os.getenv("GOOGLE_REDIRECT_FRONTEND_URI", "http://localhost:3000")
-        GOOGLE_TOKEN_REQUEST_URL = "https://oauth2.googleapis.com/token"
 
         def raise_authorized() -> None:
             raise HTTPException(
@@ -33,10 +33,10 @@ class UsersRouter:
             Returns:
                 FileResponse: The default avatar image file response.
             """
-            image_path = './content/images/default_user.jpeg'
-            return FileResponse(image_path, media_type='image/jpeg')
+            image_path = 'content/images/default_user.jpeg'
+            return services.file_response(image_path, media_type='image/jpeg', static=True)
 
-        @self.router.get('/me', tags=['Users'])
+        @self.router.get('/me', tags=['Users'], response_model=StandardResponse[UserSchema])
         def get_me(response: Response, user = Depends(services.get_current_user)) -> dict[str, object]:        
             user: UsersModel = user.serialize()
             return HttpResponses.standard_response(
@@ -86,6 +86,16 @@ class UsersRouter:
             password=password,
             image=image
             )
+            # El cambio de password revoca todos los tokens: renovamos el de esta sesión.
+            if password:
+                response.set_cookie(
+                    key="access_token",
+                    value=services.create_token_for_user(edited_user, edited_user.user_type),
+                    httponly=True,
+                    secure=False, # Require HTTP.
+                    samesite='lax', # Accept different site requests.
+                    max_age=180*180
+                )
             return HttpResponses.standard_response(
             response=response,
             status_code=status.HTTP_200_OK,
@@ -96,26 +106,30 @@ class UsersRouter:
             )
         
         @self.router.post('/auth', tags=['Users'])
-        def auth(response: Response, form_data: Annotated[OAuth2PasswordRequestForm, Depends()]) -> dict[str, object]:
+        async def auth(response: Response, form_data: Annotated[OAuth2PasswordRequestForm, Depends()]) -> dict[str, object]:
             username = form_data.username.strip().lower()
             password = form_data.password
 
-            email_like = username
-            if not services.user_exist(email_like):
+            # Una sola consulta; la verificación corre en el pool de hashing, no en el threadpool.
+            user = await run_in_threadpool(services.get_user_for_login, username)
+            if not user:
                 return HttpResponses.standard_response(
                     response=response,
                     status_code=status.HTTP_404_NOT_FOUND,
                     status_title='NotFound',
                 )
 
-            if not services.user_credentials_are_valid(email_like, password):
+            valid, new_hash = await services.verify_and_update_password(password, user.password)
+            if not valid:
                 return HttpResponses.standard_response(
                     response=response,
                     status_code=status.HTTP_401_UNAUTHORIZED,
                     status_title='Unauthorized',
                 )
+            if new_hash:
+                await run_in_threadpool(services.update_password_hash, user.id, new_hash)
             
-            token = services.create_user_token(email_like, 'email')
+            token = services.create_token_for_user(user, 'email')
             response.delete_cookie(
                 key="access_token",
                 httponly=True,
@@ -136,7 +150,7 @@ class UsersRouter:
 
         @self.router.get('/auth/google', tags=['Users'])
         def google_auth(response: Response) -> dict[str, object]:
-            google_auth_url = f"https://accounts.google.com/o/oauth2/auth?client_id={GOOGLE_CLIENT_ID}&redirect_uri={GOOGLE_REDIRECT_URI}&response_type=code&scope=openid email profile"
+            google_auth_url = f"https://accounts.google.com/o/oauth2/auth?client_id={services.google_client_id}&redirect_uri={services.google_redirect_uri}&response_type=code&scope=openid email profile"
             return RedirectResponse(google_auth_url)
 
         @self.router.get('/auth/google/callback', tags=['Users'])
@@ -146,29 +160,23 @@ class UsersRouter:
             Args:
                 code (str): Authorization code from Google
             """
-            data = {
-                'code': code,
-                'client_id': GOOGLE_CLIENT_ID,
-                'client_secret': GOOGLE_SECRET_KEY,
-                'redirect_uri': GOOGLE_REDIRECT_URI,
-                'grant_type': 'authorization_code'
-            }
+            try:
+                token_response = await services.exchange_google_code(code)
+            except Exception as e:
+                logger.warning('Google code exchange failed: %s', e)
+                return RedirectResponse(f'{GOOGLE_REDIRECT_FRONTEND_URI}/login?error=google_auth_failed')
 
-            async with httpx.AsyncClient() as client:
-                response = await client.post(GOOGLE_TOKEN_REQUEST_URL, data=data)
-                response.raise_for_status()
-                token_response = response.json()
-            
             google_token = token_response.get('id_token')
             if not google_token:
                 return RedirectResponse(f'{GOOGLE_REDIRECT_FRONTEND_URI}/login?error=google_auth_failed')
             
             try:
-                id_info = id_token.verify_oauth2_token(google_token, requests.Request(), GOOGLE_CLIENT_ID)
+                id_info = await services.verify_google_id_token(google_token)
 
-                user = services.get_user(id_info['email'])
+                user = await run_in_threadpool(services.get_user, id_info['email'])
                 if not user:
-                    user = services.create_user(
+                    user = await run_in_threadpool(
+                        services.create_user,
                         name=id_info.get('name'),
                         email=id_info.get('email'),
                         google_token=google_token,
@@ -179,7 +187,7 @@ class UsersRouter:
                     if user.user_type != 'google':
                         return RedirectResponse(f'{GOOGLE_REDIRECT_FRONTEND_URI}/login?error=user_registred_with_different_method')
                 
-                local_token = services.create_user_token(user.email, 'google')
+                local_token = services.create_token_for_user(user, 'google')
                 resp = RedirectResponse(f'{GOOGLE_REDIRECT_FRONTEND_URI}/')
                 resp.set_cookie(
                     key="access_token",
@@ -197,7 +205,7 @@ class UsersRouter:
                 return RedirectResponse(f'{GOOGLE_REDIRECT_FRONTEND_URI}/login?error=google_auth_failed')
 
 
-        @self.router.get('/all', tags=['Users'])
+        @self.router.get('/all', tags=['Users'], response_model=StandardResponse[list[UserSchema]])
         def get_all_users(response: Response, user = Depends(services.get_current_user)) -> dict[str, object]:
             users = services.get_all_users()
             if user.role != 'admin':
@@ -236,7 +244,9 @@ class UsersRouter:
             )
         
         @self.router.post('/logout', tags=['Users'])
-        def logout_user(response: Response) -> dict[str, object]:
+        def logout_user(request: Request, response: Response) -> dict[str, object]:
+            # Cerrar sesión revoca todos los tokens del usuario, no sólo borra la cookie.
+            services.revoke_token(request.cookies.get("access_token"))
             response.delete_cookie(
                 key="access_token",
                 httponly=True,
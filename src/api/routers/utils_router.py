@@ -2,25 +2,36 @@ from fastapi import APIRouter, status, Depends, Request
 from fastapi.responses import Response, FileResponse
 from src.services.core_services import CoreServices
 from src.utils.http.response_utils import HttpResponses
+from src.utils.profiling.request_profiler import ProfiledAPIRoute
 from pathlib import Path
 
-from typing import Annotated
+from typing import Annotated, Optional
 from fastapi.security import OAuth2PasswordBearer
 
 class UtilsRouter:
     def __init__(self, services: CoreServices) -> None:
         self.prefix: str = '/utils'
-        self.router: APIRouter = APIRouter()
+        self.router: APIRouter = APIRouter(route_class=ProfiledAPIRoute)
         self.search_types = ['definition', 'free']
 
         @self.router.get('/search', tags=['utils'])
-        def google_search(response: Response, search: str, _type: str = 'definition', user = Depends(services.get_current_user)) -> dict[str, object]:
-            """Hace una búsqueda en Google utilizando Gemini Grounded Search.
+        def google_search(
+            response: Response,
+            search: str,
+            _type: str = 'definition',
+            book_id: Optional[int] = None,
+            language: Optional[str] = None,
+            user = Depends(services.get_current_user),
+        ) -> dict[str, object]:
+            """Hace una búsqueda en Google utilizando Gemini Grounded Search. Las definiciones
+            se buscan primero en el diccionario local, y Gemini sólo se usa si la palabra no está.
 
             Args:
                 response (Response): _description_
                 search (str): Búsqueda a realizar.
                 type (str, optional): Tipo de búsqueda. Puede ser de tipo 'definition' o 'free'. Defaults to 'definition'.
+                book_id (Optional[int], optional): Libro que se está leyendo: define el idioma del diccionario. Defaults to None.
+                language (Optional[str], optional): Idioma del diccionario (tiene prioridad sobre el del libro). Defaults to None.
 
             Returns:
                 dict[str, object]: devuelve el resultado de la búsqueda.
@@ -33,7 +44,21 @@ class UtilsRouter:
                     content_response={}
                 )
 
-            search = services.search_with_gemini(search, search_type=_type)
+            if _type == 'definition':
+                if language is None and book_id is not None:
+                    language = services.book_language(book_id, user)
+                definition = services.define_word(search, language)
+                if definition is not None:
+                    return HttpResponses.standard_response(
+                        response=response,
+                        status_code=status.HTTP_200_OK,
+                        status_title='Search completed',
+                        content_response={
+                            'search_result': definition
+                        }
+                    )
+
+            search = {**services.search_with_gemini(search, search_type=_type), 'source': 'gemini'}
             return HttpResponses.standard_response(
                 response=response,
                 status_code=status.HTTP_200_OK,
@@ -0,0 +1,35 @@
+from datetime import datetime
+from typing import Literal, Optional
+from pydantic import BaseModel, Field
+
+class AnnotationSchema(BaseModel):
+    """Forma de AnnotationsModel.serialize."""
+    uid: str
+    book_id: int
+    chapter_number: int
+    cfi_range: str
+    kind: str
+    color: Optional[str] = None
+    quote: Optional[str] = None
+    note: Optional[str] = None
+    deleted: bool
+    version: int
+    updated_at: Optional[datetime] = None
+
+class AnnotationChangeSchema(BaseModel):
+    """Cambio hecho en el cliente (alta, edición o borrado, con deleted=True)."""
+    uid: str = Field(min_length=1, max_length=64)
+    book_id: int
+    chapter_number: int = Field(ge=1)
+    cfi_range: str = Field(min_length=1, max_length=1024)
+    kind: Literal['highlight', 'note', 'bookmark'] = 'highlight'
+    color: Optional[str] = Field(default=None, max_length=32)
+    quote: Optional[str] = Field(default=None, max_length=10_000)
+    note: Optional[str] = Field(default=None, max_length=50_000)
+    deleted: bool = False
+    # Versión del servidor sobre la que se hizo el cambio (None: pisar siempre).
+    base_version: Optional[int] = None
+
+class AnnotationsSyncSchema(BaseModel):
+    since: int = Field(default=0, ge=0)
+    changes: list[AnnotationChangeSchema] = []
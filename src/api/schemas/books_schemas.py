@@ -0,0 +1,24 @@
+from typing import Optional
+from pydantic import BaseModel
+
+class BookSchema(BaseModel):
+    """Forma de BooksModel.serialize."""
+    id: int
+    title: str
+    description: Optional[str] = None
+    author: Optional[str] = None
+    cover_path: Optional[str] = None
+    contributor: Optional[str] = None
+    category: Optional[str] = None
+    publish_date: Optional[str] = None
+    publisher: Optional[str] = None
+    language: Optional[str] = None
+    opf_path: Optional[str] = None
+    metadata_path: Optional[str] = None
+    toc_path: Optional[str] = None
+    book_type: str
+    book_charapters: int
+    toc_content: Optional[dict[str, str]] = None
+    main_folder_path: str
+    original_file_path: str
+    owner_id: Optional[int] = None
@@ -0,0 +1,12 @@
+from typing import Generic, TypeVar
+from pydantic import BaseModel
+
+T = TypeVar('T')
+
+class Content(BaseModel, Generic[T]):
+    content: T
+
+class StandardResponse(BaseModel, Generic[T]):
+    """Forma de HttpResponses.standard_response: {'status_title': ..., 'content': {'content': ...}}."""
+    status_title: str
+    content: Content[T]
@@ -0,0 +1,13 @@
+from typing import Optional
+from pydantic import BaseModel
+
+class UserSchema(BaseModel):
+    """Forma de UsersModel.serialize."""
+    id: int
+    name: str
+    email: str
+    password: Optional[str] = None
+    image: str
+    type: Optional[str] = None
+    role: Optional[str] = None
+    books: list[int]
@@ -0,0 +1,51 @@
+# src/api/server_settings.py
+from functools import lru_cache
+from typing import Optional
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+DEFAULT_CORS_ORIGINS = (
+    'http://localhost,http://localhost:3000,http://127.0.0.1,http://127.0.0.1:3000,'
+    'http://192.168.10.209,http://192.168.10.209:3000,https://tests.evasoft.app'
+)
+
+class ServerSettings(BaseSettings):
+    """Configuración del servidor (uvicorn) y de la app. Todo se lee del entorno/.env."""
+    APP_ENV: str = 'development'
+    HOST: str = '0.0.0.0'
+    PORT: int = 3030
+
+    # Procesos de uvicorn. Con más de uno la app se crea en cada worker (create_app).
+    WORKERS: int = 1
+    # 'auto' usa uvloop/httptools si están instalados (vienen con fastapi[standard]).
+    UVICORN_LOOP: str = 'auto'
+    UVICORN_HTTP: str = 'auto'
+    KEEP_ALIVE_TIMEOUT: int = 5
+    BACKLOG: int = 2048
+    LIMIT_CONCURRENCY: Optional[int] = None
+    # Reinicia cada worker tras N peticiones (None: nunca).
+    MAX_REQUESTS: Optional[int] = None
+    # Segundos para terminar las peticiones en curso (y las ingestas) al apagar.
+    GRACEFUL_SHUTDOWN_TIMEOUT: int = 60
+    # Hilos para las rutas y dependencias síncronas (anyio usa 40 por defecto).
+    THREADPOOL_SIZE: int = 40
+    PROXY_HEADERS: bool = True
+    FORWARDED_ALLOW_IPS: str = '127.0.0.1'
+    ACCESS_LOG: bool = True
+    LOG_LEVEL: str = 'info'
+
+    # Orígenes permitidos por CORS, separados por comas.
+    CORS_ORIGINS: str = DEFAULT_CORS_ORIGINS
+
+    model_config = SettingsConfigDict(env_file='.env', case_sensitive=False, extra='ignore')
+
+    @property
+    def production(self) -> bool:
+        return self.APP_ENV.strip().lower() == 'production'
+
+    @property
+    def cors_origins(self) -> list[str]:
+        return [origin.strip() for origin in self.CORS_ORIGINS.split(',') if origin.strip()]
+
+@lru_cache(maxsize=1)
+def get_server_settings() -> ServerSettings:
+    return ServerSettings()
@@ -1,7 +1,9 @@
 from dotenv import load_dotenv
 import os
+import orjson
 from sqlalchemy import create_engine, URL
 from src.db.declarative_base import Base
+from src.db.query_accounting import install_query_accounting
 
 class DbConnection:
     def __init__(self) -> None:
@@ -21,5 +23,23 @@ class DbConnection:
             host=self.DB_HOST,
             port=self.DB_PORT,
             database=self.DB_NAME
-        ))
-        Base.metadata.create_all(self.engine)
\ No newline at end of file
+        ),
+            # Las columnas JSONB (toc_content) se (de)codifican con orjson.
+            json_serializer=lambda obj: orjson.dumps(obj).decode(),
+            json_deserializer=orjson.loads,
+        )
+        install_query_accounting(self.engine)
+
+    def create_schema(self) -> None:
+        """Crea las tablas que falten. Ya no se hace al conectar: es un paso explícito
+        de migración (python main.py migrate).
+        """
+        # Importamos los modelos para que queden registrados en el metadata.
+        import src.models.users_model
+        import src.models.books_model
+        import src.models.token_revocations_model
+        import src.models.annotations_model
+        import src.models.summaries_model
+        import src.models.storage_migrations_model
+        import src.models.upload_sessions_model
+        Base.metadata.create_all(self.engine)
@@ -0,0 +1,52 @@
+"""Migraciones del esquema de la base de datos.
+
+Se ejecutan de forma explícita (no al arrancar la API):
+
+    python main.py migrate
+"""
+from sqlalchemy import text
+from src.db.db_connection import DbConnection
+
+# create_all no agrega columnas a tablas existentes: esos cambios van acá.
+# Todas las sentencias deben ser idempotentes.
+SCHEMA_UPGRADES: list[str] = [
+    'ALTER TABLE books ADD COLUMN IF NOT EXISTS chapters_count INTEGER',
+    'ALTER TABLE chapters ADD COLUMN IF NOT EXISTS reader_path VARCHAR',
+    'ALTER TABLE chapters ADD COLUMN IF NOT EXISTS fragments JSONB',
+    'ALTER TABLE chapters ADD COLUMN IF NOT EXISTS anchor_map JSONB',
+    'ALTER TABLE chapters ADD COLUMN IF NOT EXISTS text_offset INTEGER',
+    'ALTER TABLE books ALTER COLUMN opf_path DROP NOT NULL',
+    'ALTER TABLE books ALTER COLUMN metadata_path DROP NOT NULL',
+    # Sin DEFAULT en el ADD COLUMN: las filas existentes quedan en NULL (fecha desconocida)
+    # en vez de recibir la fecha de la migración.
+    'ALTER TABLE users ADD COLUMN IF NOT EXISTS created_at TIMESTAMP WITH TIME ZONE',
+    'ALTER TABLE users ALTER COLUMN created_at SET DEFAULT now()',
+    'CREATE INDEX IF NOT EXISTS ix_users_created_at ON users (created_at)',
+    'ALTER TABLE books ADD COLUMN IF NOT EXISTS created_at TIMESTAMP WITH TIME ZONE',
+    'ALTER TABLE books ALTER COLUMN created_at SET DEFAULT now()',
+    'CREATE INDEX IF NOT EXISTS ix_books_created_at ON books (created_at)',
+    # Un solo trabajo de resumen activo por libro (los duplicados previos quedan como fallidos).
+    "UPDATE summary_jobs SET status = 'failed', error = 'Superseded' WHERE status IN ('queued', 'running') AND id NOT IN "
+    "(SELECT DISTINCT ON (book_id) id FROM summary_jobs WHERE status IN ('queued', 'running') ORDER BY book_id, created_at DESC)",
+    "CREATE UNIQUE INDEX IF NOT EXISTS ux_summary_jobs_active_book ON summary_jobs (book_id) WHERE status IN ('queued', 'running')",
+]
+
+def migrate(db: DbConnection) -> None:
+    """Aplica las migraciones pendientes. Todos los pasos son idempotentes.
+
+    Args:
+        db (DbConnection): Conexión a la base de datos.
+    """
+    db.create_schema()
+    with db.engine.begin() as connection:
+        for statement in SCHEMA_UPGRADES:
+            connection.execute(text(statement))
+    print('[MIGRATE] schema up to date')
+
+    # Backfill de datos que dependen de los archivos de los libros.
+    from src.services.core_services import CoreServices
+    services = CoreServices(db.engine)
+    print('[MIGRATE] chapters backfilled for', services.backfill_chapters(), 'books')
+    print('[MIGRATE] reader chapters generated for', services.backfill_reader_chapters(), 'books')
+    print('[MIGRATE] fragments evaluated for', services.backfill_chapter_fragments(), 'chapters')
+    print('[MIGRATE] expired token revocations deleted:', services.prune_revocations())
@@ -0,0 +1,65 @@
+"""Contabilidad de queries SQL por petición.
+
+Los eventos del engine suman cada query (y su duración) al colector de la petición en
+curso, que vive en un ContextVar: anyio copia el contexto a los hilos del threadpool, así
+que las rutas y dependencias síncronas también quedan contadas.
+"""
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+from sqlalchemy import Engine, event
+
+# Parámetros (%(name)s, listas de IN expandidas) y espacios no cambian la "forma" del statement.
+_PARAM_RE = re.compile(r'%\(\w+\)s|\?|\$\d+')
+_PARAM_LIST_RE = re.compile(r'\?(\s*,\s*\?)+')
+_SPACES_RE = re.compile(r'\s+')
+
+class QueryStats:
+    def __init__(self) -> None:
+        self.count: int = 0
+        self.duration: float = 0.0
+        self.shapes: Counter[str] = Counter()
+
+    def add(self, statement: str, duration: float) -> None:
+        self.count += 1
+        self.duration += duration
+        self.shapes[statement_shape(statement)] += 1
+
+    def repeated(self, threshold: int) -> list[tuple[str, int]]:
+        """Statements con la misma forma ejecutados ``threshold`` veces o más (típico N+1)."""
+        return [(shape, times) for shape, times in self.shapes.most_common() if times >= threshold]
+
+_current_stats: ContextVar[Optional[QueryStats]] = ContextVar('query_stats', default=None)
+
+def statement_shape(statement: str) -> str:
+    shape = _PARAM_RE.sub('?', statement)
+    shape = _PARAM_LIST_RE.sub('?, ...', shape)
+    return _SPACES_RE.sub(' ', shape).strip()
+
+@contextmanager
+def track_queries() -> Iterator[QueryStats]:
+    """Cuenta las queries ejecutadas dentro del bloque (y en los hilos que lance)."""
+    stats = QueryStats()
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    conn.info['query_started'] = time.perf_counter()
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.add(statement, time.perf_counter() - conn.info.pop('query_started', time.perf_counter()))
+
+def install_query_accounting(engine: Engine) -> None:
+    """Registra los eventos de contabilidad en el engine (idempotente)."""
+    if not event.contains(engine, 'before_cursor_execute', _before_cursor_execute):
+        event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
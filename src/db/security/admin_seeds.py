@@ -1,5 +1,6 @@
 # src/db/security/admin_seeds.py
 from __future__ import annotations
+from functools import lru_cache
 from typing import List, Dict, Optional, Tuple
 from pydantic import EmailStr
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -41,7 +42,7 @@ class AdminSeedSettings(BaseSettings):
     ADMIN4_PASSWORD: Optional[str] = None
     ADMIN4_USERNAME: Optional[str] = None
 
-    model_config = SettingsConfigDict(env_file=".env", case_sensitive=False)
+    model_config = SettingsConfigDict(env_file=".env", case_sensitive=False, extra="ignore")
 
 # normalizacion
 def _norm(s: Optional[str]) -> str:
@@ -50,8 +51,17 @@ def _norm(s: Optional[str]) -> str:
 def _norm_lower(s: Optional[str]) -> str:
     return (s or "").strip().lower()
 
+@lru_cache(maxsize=1)
+def get_admin_seed_settings() -> AdminSeedSettings:
+    # Leemos el .env una sola vez por proceso.
+    return AdminSeedSettings()
+
 def default_admins_from_env() -> List[Dict[str, str]]:
-    s = AdminSeedSettings()
+    return [dict(a) for a in _default_admins()]
+
+@lru_cache(maxsize=1)
+def _default_admins() -> Tuple[Dict[str, str], ...]:
+    s = get_admin_seed_settings()
     admins: List[Dict[str, str]] = []
     for i in ADMIN_SLOTS:
         name = getattr(s, f"ADMIN{i}_NAME")
@@ -66,12 +76,16 @@ def default_admins_from_env() -> List[Dict[str, str]]:
                 "password": _norm(password),
                 "username": uname,
             })
-    return admins
+    return tuple(admins)
 
-def admin_env_index() -> Dict[str, Dict[str, str]]:
+@lru_cache(maxsize=1)
+def _admin_env_index() -> Dict[str, Dict[str, str]]:
     idx: Dict[str, Dict[str, str]] = {}
-    for a in default_admins_from_env():
+    for a in _default_admins():
         u = _norm_lower(a.get("username"))
         if u:
             idx[u] = a
     return idx
+
+def admin_env_index() -> Dict[str, Dict[str, str]]:
+    return {u: dict(a) for u, a in _admin_env_index().items()}
@@ -0,0 +1,157 @@
+"""Índice de diccionario en disco, ordenado por lema y leído con mmap.
+
+Formato del archivo (little endian):
+
+    b'SKDICT1\\0' | cantidad de entradas (uint32) | reservado (uint32)
+    offsets de las entradas, ordenadas por lema (uint64 * cantidad)
+    entradas: largo del lema (uint16) | lema (utf-8) | largo del valor (uint32) | valor (JSON utf-8)
+
+La búsqueda es binaria sobre los offsets: no se carga nada en memoria más allá de las
+páginas que toca el sistema operativo, y varios workers comparten la misma caché.
+"""
+import gzip
+import mmap
+import os
+import string
+import struct
+import unicodedata
+from pathlib import Path
+from typing import Iterable, Iterator, Optional, Union
+
+import orjson
+
+MAGIC = b'SKDICT1\0'
+_HEADER = struct.Struct('<8sII')
+_OFFSET = struct.Struct('<Q')
+_KEY_LEN = struct.Struct('<H')
+_VALUE_LEN = struct.Struct('<I')
+_STRIP = string.punctuation + string.whitespace + '¡¿«»“”‘’—–…'
+
+# Acepciones que guardamos por categoría gramatical (el resto no se muestra en el lector).
+MAX_GLOSSES = 5
+
+def normalize_lemma(word: str) -> str:
+    """Normaliza una palabra para buscarla: NFC, sin puntuación en los bordes y en minúsculas."""
+    return unicodedata.normalize('NFC', word).strip(_STRIP).casefold()
+
+class DictionaryIndex:
+    def __init__(self, path: Union[str, Path]) -> None:
+        """Abre un índice generado con build_index.
+
+        Args:
+            path (Union[str, Path]): Path del archivo del índice.
+        """
+        self.path = Path(path)
+        with open(self.path, 'rb') as file:
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.count, _ = _HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            self._map.close()
+            raise ValueError(f'{self.path} is not a dictionary index')
+
+    def _key_at(self, index: int) -> tuple[bytes, int]:
+        (offset,) = _OFFSET.unpack_from(self._map, _HEADER.size + index * _OFFSET.size)
+        (key_len,) = _KEY_LEN.unpack_from(self._map, offset)
+        start = offset + _KEY_LEN.size
+        return self._map[start:start + key_len], start + key_len
+
+    def lookup(self, word: str) -> Optional[list[dict]]:
+        """Busca las acepciones de una palabra.
+
+        Args:
+            word (str): Palabra a buscar (se normaliza).
+
+        Returns:
+            Optional[list[dict]]: Devuelve [{'pos', 'glosses'}], o None si no está en el diccionario.
+        """
+        key = normalize_lemma(word).encode('utf-8')
+        if not key:
+            return None
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            if self._key_at(middle)[0] < key:
+                low = middle + 1
+            else:
+                high = middle
+        if low == self.count:
+            return None
+        found, value_offset = self._key_at(low)
+        if found != key:
+            return None
+        (value_len,) = _VALUE_LEN.unpack_from(self._map, value_offset)
+        start = value_offset + _VALUE_LEN.size
+        return orjson.loads(self._map[start:start + value_len])
+
+    def close(self) -> None:
+        self._map.close()
+
+def read_wiktextract(path: Union[str, Path], language: Optional[str] = None) -> Iterator[tuple[str, str, list[str]]]:
+    """Lee un dump JSONL de Wiktextract (kaikki.org), comprimido con gzip o no.
+
+    Args:
+        path (Union[str, Path]): Path del dump.
+        language (Optional[str], optional): Código de idioma a conservar (lang_code). Defaults to None (todos).
+
+    Returns:
+        Iterator[tuple[str, str, list[str]]]: Devuelve (palabra, categoría gramatical, acepciones).
+    """
+    opener = gzip.open if str(path).endswith('.gz') else open
+    with opener(path, 'rb') as file:
+        for line in file:
+            try:
+                entry = orjson.loads(line)
+            except orjson.JSONDecodeError:
+                continue
+            if not isinstance(entry, dict) or not entry.get('word'):
+                continue
+            if language and entry.get('lang_code') not in (None, language):
+                continue
+            glosses = [gloss for sense in entry.get('senses') or [] for gloss in (sense.get('glosses') or [])[-1:]]
+            if glosses:
+                yield entry['word'], entry.get('pos') or '', glosses
+
+def build_index(entries: Iterable[tuple[str, str, list[str]]], out_path: Union[str, Path]) -> int:
+    """Genera el índice a partir de (palabra, categoría gramatical, acepciones).
+
+    Las entradas con el mismo lema normalizado se combinan. El archivo se escribe en un
+    temporal y se reemplaza de forma atómica, así los procesos que tienen abierto el
+    índice anterior no leen un archivo a medias.
+
+    Args:
+        entries (Iterable[tuple[str, str, list[str]]]): Entradas del diccionario.
+        out_path (Union[str, Path]): Path del índice a generar.
+
+    Returns:
+        int: Devuelve la cantidad de lemas del índice.
+    """
+    lemmas: dict[bytes, list[dict]] = {}
+    for word, pos, glosses in entries:
+        key = normalize_lemma(word).encode('utf-8')
+        if not key or len(key) > 0xFFFF:
+            continue
+        senses = lemmas.setdefault(key, [])
+        for sense in senses:
+            if sense['pos'] == pos:
+                sense['glosses'].extend(g for g in glosses if g not in sense['glosses'])
+                del sense['glosses'][MAX_GLOSSES:]
+                break
+        else:
+            senses.append({'pos': pos, 'glosses': list(dict.fromkeys(glosses))[:MAX_GLOSSES]})
+
+    records = [(key, orjson.dumps(lemmas.pop(key))) for key in sorted(lemmas)]
+    out_path = Path(out_path)
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = out_path.with_name(out_path.name + '.tmp')
+    with open(tmp_path, 'wb') as file:
+        file.write(_HEADER.pack(MAGIC, len(records), 0))
+        offset = _HEADER.size + len(records) * _OFFSET.size
+        offsets = bytearray()
+        for key, value in records:
+            offsets += _OFFSET.pack(offset)
+            offset += _KEY_LEN.size + len(key) + _VALUE_LEN.size + len(value)
+        file.write(offsets)
+        for key, value in records:
+            file.write(_KEY_LEN.pack(len(key)) + key + _VALUE_LEN.pack(len(value)) + value)
+    os.replace(tmp_path, out_path)
+    return len(records)
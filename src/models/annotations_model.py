@@ -0,0 +1,49 @@
+from sqlalchemy import BigInteger, Boolean, Column, DateTime, ForeignKey, Index, Integer, String, func
+from src.db.declarative_base import Base
+
+class AnnotationsModel(Base):
+    __tablename__ = 'annotations'
+    __table_args__ = (
+        # Sync: cambios de un usuario posteriores a una versión, en orden (O(cambios)).
+        Index('ix_annotations_user_id_version', 'user_id', 'version', unique=True),
+        # Las anotaciones se crean offline con un id generado por el cliente.
+        Index('ix_annotations_user_id_uid', 'user_id', 'uid', unique=True),
+        Index('ix_annotations_book_id', 'book_id'),
+    )
+    id = Column(BigInteger, primary_key=True)
+    uid = Column(String(64), nullable=False)  # Id del cliente.
+    user_id = Column(Integer, ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
+    book_id = Column(Integer, ForeignKey('books.id', ondelete='CASCADE'), nullable=False)
+
+    chapter_number = Column(Integer, nullable=False)  # Igual que en /books/read, empezando en 1.
+    cfi_range = Column(String, nullable=False)  # Rango dentro del capítulo (estilo EPUB CFI).
+    kind = Column(String(16), nullable=False, default='highlight')  # highlight, note, bookmark.
+    color = Column(String(32), nullable=True)
+    quote = Column(String, nullable=True)  # Texto resaltado.
+    note = Column(String, nullable=True)
+
+    # Tombstone: las anotaciones borradas se conservan para que los demás dispositivos se enteren.
+    deleted = Column(Boolean, nullable=False, default=False)
+    version = Column(BigInteger, nullable=False)  # Versión del usuario en la que cambió por última vez.
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
+
+    def serialize(self) -> dict:
+        return {
+            'uid': self.uid,
+            'book_id': self.book_id,
+            'chapter_number': self.chapter_number,
+            'cfi_range': self.cfi_range,
+            'kind': self.kind,
+            'color': self.color,
+            'quote': self.quote,
+            'note': self.note,
+            'deleted': self.deleted,
+            'version': self.version,
+            'updated_at': self.updated_at,
+        }
+
+class AnnotationVersionsModel(Base):
+    __tablename__ = 'annotation_versions'
+    # Contador monótono por usuario; su fila hace de lock para los push concurrentes.
+    user_id = Column(Integer, ForeignKey('users.id', ondelete='CASCADE'), primary_key=True)
+    version = Column(BigInteger, nullable=False, default=0)
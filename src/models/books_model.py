@@ -1,7 +1,8 @@
-from sqlalchemy import Column, Integer, String, ARRAY, ForeignKey
+from sqlalchemy import Column, Integer, String, ARRAY, ForeignKey, DateTime, func
 from src.db.declarative_base import Base
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, deferred
 from sqlalchemy.dialects.postgresql import JSONB
+from src.models.chapters_model import ChaptersModel
 class BooksModel(Base):
     __tablename__ = 'books'
     id = Column(Integer, primary_key=True, index=True)
@@ -22,16 +23,27 @@ class BooksModel(Base):
     # Paths
     main_folder_path = Column(String, nullable=False)
     original_file_path = Column(String, nullable=False)
-    opf_path = Column(String, nullable=False)
-    metadata_path = Column(String, nullable=False)
+    opf_path = Column(String, nullable=True)  # Sólo EPUB.
+    metadata_path = Column(String, nullable=True)  # Sólo EPUB.
     toc_path = Column(String, nullable=True)
 
     book_type = Column(String, nullable=False)  # epub, pdf.
-    book_content = Column(ARRAY(String), nullable=True)  # List of paths to the book's content files.
+    # Legacy: paths de los capítulos. Sólo se conserva para el backfill de la tabla
+    # chapters (python main.py migrate); los libros nuevos ya no lo usan.
+    book_content = deferred(Column(ARRAY(String), nullable=True))
+    chapters_count = Column(Integer, nullable=True)
     toc_content = Column(JSONB, nullable=True)  # Table of contents structure.
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=True, index=True)  # NULL en libros previos a la columna.
 
     owner_id = Column(Integer, ForeignKey('users.id'))
     owner = relationship('UsersModel', back_populates='books')
+    chapters = relationship(
+        ChaptersModel,
+        back_populates='book',
+        order_by=ChaptersModel.spine_index,
+        cascade='all, delete-orphan',
+        passive_deletes=True,
+    )
 
 
     def serialize(self) -> dict:
@@ -50,8 +62,7 @@ class BooksModel(Base):
             'metadata_path': self.metadata_path,
             'toc_path': self.toc_path,
             'book_type': self.book_type,
-            'book_content': self.book_content,
-            'book_charapters': len(self.book_content) if self.book_content else 0,
+            'book_charapters': self.chapters_count or 0,
             'toc_content': self.toc_content,
             'main_folder_path': self.main_folder_path,
             'original_file_path': self.original_file_path,
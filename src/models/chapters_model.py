@@ -0,0 +1,40 @@
+from sqlalchemy import Column, Integer, String, ForeignKey, Index
+from src.db.declarative_base import Base
+from sqlalchemy.orm import relationship
+from sqlalchemy.dialects.postgresql import JSONB
+
+class ChaptersModel(Base):
+    __tablename__ = 'chapters'
+    __table_args__ = (
+        # Resolvemos un capítulo por (libro, posición en el spine) sin tocar la fila del libro.
+        Index('ix_chapters_book_id_spine_index', 'book_id', 'spine_index', unique=True),
+    )
+    id = Column(Integer, primary_key=True)
+    book_id = Column(Integer, ForeignKey('books.id', ondelete='CASCADE'), nullable=False)
+    spine_index = Column(Integer, nullable=False)  # Posición en el spine, empezando en 0.
+
+    path = Column(String, nullable=False)  # Key del archivo en el almacén de contenido.
+    byte_size = Column(Integer, nullable=True)
+    word_count = Column(Integer, nullable=True)
+    content_hash = Column(String(64), nullable=True)  # sha256 del archivo.
+    title = Column(String, nullable=True)  # Título según la tabla de contenidos.
+    reader_path = Column(String, nullable=True)  # Variante minificada y saneada para el lector.
+    # Capítulos grandes divididos: [{'path', 'byte_size'}] en orden ([] si no se dividió) y {ancla: índice}.
+    fragments = Column(JSONB, nullable=True)
+    anchor_map = Column(JSONB, nullable=True)
+    # Páginas de PDF: offset (en bytes) del texto de la página en el archivo de texto del libro (path).
+    text_offset = Column(Integer, nullable=True)
+
+    book = relationship('BooksModel', back_populates='chapters')
+
+    def serialize(self) -> dict:
+        return {
+            'id': self.id,
+            'book_id': self.book_id,
+            'chapter_number': self.spine_index + 1,
+            'title': self.title,
+            'byte_size': self.byte_size,
+            'word_count': self.word_count,
+            'content_hash': self.content_hash,
+            'fragments_count': len(self.fragments or []) or 1,
+        }
@@ -0,0 +1,15 @@
+from sqlalchemy import Column, DateTime, Integer, String, func
+from src.db.declarative_base import Base
+
+class StorageMigrationsModel(Base):
+    __tablename__ = 'storage_migrations'
+    # Journal de python main.py migrate-storage: permite retomar una migración cortada.
+    # Sin FK: si el libro se borra, igual hay que limpiar el prefijo viejo.
+    book_id = Column(Integer, primary_key=True)
+    old_prefix = Column(String, nullable=False)
+    new_prefix = Column(String, nullable=False)
+    # copying: copiando al prefijo nuevo (la base todavía apunta al viejo).
+    # copied: la base ya apunta al nuevo; falta borrar el viejo.
+    # done: terminado.
+    state = Column(String(16), nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
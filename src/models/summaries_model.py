@@ -0,0 +1,44 @@
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, String, func, text
+from src.db.declarative_base import Base
+
+class SummariesModel(Base):
+    __tablename__ = 'summaries'
+    # sha256 de (versión del prompt, modelo, tipo, hash del contenido): el mismo capítulo en
+    # dos libros (o en dos usuarios) se resume una sola vez.
+    cache_key = Column(String(64), primary_key=True)
+    kind = Column(String(16), nullable=False)  # chapter, book.
+    model = Column(String, nullable=False)
+    summary = Column(String, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+class SummaryJobsModel(Base):
+    __tablename__ = 'summary_jobs'
+    __table_args__ = (
+        # A lo sumo un trabajo activo por libro: dos POST simultáneos no lanzan dos resúmenes.
+        Index('ux_summary_jobs_active_book', 'book_id', unique=True, postgresql_where=text("status IN ('queued', 'running')")),
+    )
+    id = Column(String(32), primary_key=True)  # uuid4 hex.
+    book_id = Column(Integer, ForeignKey('books.id', ondelete='CASCADE'), nullable=False, index=True)
+    user_id = Column(Integer, ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
+    status = Column(String(16), nullable=False, default='queued')  # queued, running, done, failed.
+    total = Column(Integer, nullable=False, default=0)  # Unidades a resumir (capítulos o grupos de páginas).
+    done = Column(Integer, nullable=False, default=0)
+    cached = Column(Integer, nullable=False, default=0)  # De las hechas, cuántas salieron de la caché.
+    error = Column(String, nullable=True)
+    summary_key = Column(String(64), nullable=True)  # Resumen del libro en la tabla summaries.
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
+
+    def serialize(self) -> dict:
+        return {
+            'id': self.id,
+            'book_id': self.book_id,
+            'status': self.status,
+            'total': self.total,
+            'done': self.done,
+            'cached': self.cached,
+            'progress': round(self.done / self.total, 4) if self.total else (1.0 if self.status == 'done' else 0.0),
+            'error': self.error,
+            'created_at': self.created_at,
+            'updated_at': self.updated_at,
+        }
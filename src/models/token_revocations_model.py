@@ -0,0 +1,12 @@
+from sqlalchemy import BigInteger, Column, DateTime, Float, String, func
+from src.db.declarative_base import Base
+
+class TokenRevocationsModel(Base):
+    __tablename__ = 'token_revocations'
+    # Monótono: cada worker lee sólo las filas nuevas desde el último id visto.
+    id = Column(BigInteger, primary_key=True)
+    subject = Column(String, nullable=False)  # sub del token (email del usuario), en minúsculas.
+    # Con jti se revoca un único token; sin jti, todos los del usuario emitidos antes de revoked_at.
+    jti = Column(String(32), nullable=True)
+    revoked_at = Column(Float, nullable=False)  # Timestamp UNIX (mismo reloj que el iat de los tokens).
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False, index=True)
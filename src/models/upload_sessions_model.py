@@ -0,0 +1,43 @@
+from sqlalchemy import BigInteger, Column, DateTime, ForeignKey, Index, Integer, String, func
+from src.db.declarative_base import Base
+
+class UploadSessionsModel(Base):
+    __tablename__ = 'upload_sessions'
+    __table_args__ = (
+        # Un reintento del POST con la misma clave devuelve la misma subida (y el mismo libro).
+        Index('ix_upload_sessions_user_id_idempotency_key', 'user_id', 'idempotency_key', unique=True),
+        Index('ix_upload_sessions_expires_at', 'expires_at'),
+    )
+    id = Column(String(32), primary_key=True)  # uuid4 hex.
+    user_id = Column(Integer, ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
+    idempotency_key = Column(String(255), nullable=True)
+    filename = Column(String, nullable=False)
+    book_type = Column(String(8), nullable=False)  # epub, pdf.
+    length = Column(BigInteger, nullable=False)  # Tamaño declarado del archivo.
+    # Los chunks se escriben directo en el archivo final, dentro de la carpeta del libro:
+    # el offset de la subida es el tamaño del archivo en disco.
+    saving_folder = Column(String, nullable=False)
+    file_path = Column(String, nullable=False)
+    checksum = Column(String(64), nullable=True)  # sha256 esperado (opcional, lo manda el cliente).
+    sha256 = Column(String(64), nullable=True)  # sha256 del archivo recibido completo.
+    # uploading: recibiendo chunks. processing: completo, ingestando. done / failed: terminada.
+    status = Column(String(16), nullable=False, default='uploading')
+    book_id = Column(Integer, ForeignKey('books.id', ondelete='SET NULL'), nullable=True)
+    error = Column(String, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+
+    def serialize(self, offset: int) -> dict:
+        return {
+            'id': self.id,
+            'filename': self.filename,
+            'length': self.length,
+            'offset': offset,
+            'status': self.status,
+            'book_id': self.book_id,
+            'sha256': self.sha256,
+            'error': self.error,
+            'created_at': self.created_at,
+            'expires_at': self.expires_at,
+        }
@@ -1,5 +1,5 @@
 import os
-from sqlalchemy import Column, Integer, String, ARRAY
+from sqlalchemy import Column, Integer, String, ARRAY, DateTime, func
 from sqlalchemy.orm import relationship
 from src.db.declarative_base import Base
 from src.models.books_model import BooksModel
@@ -15,6 +15,7 @@ class UsersModel(Base):
     image = Column(String, nullable=True)
     user_type = Column(String, default='google')  # e.g., 'google', 'email'.
     role = Column(String, default='user')  # e.g., 'user', 'admin'.
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=True, index=True)  # NULL en usuarios previos a la columna.
 
     books = relationship(BooksModel, back_populates='owner', cascade="all, delete-orphan")
 
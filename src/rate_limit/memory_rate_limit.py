@@ -0,0 +1,46 @@
+import time
+from collections import defaultdict
+
+from src.rate_limit.rate_limit_backend import RateLimit, RateLimitBackend
+
+class MemoryRateLimit(RateLimitBackend):
+    def __init__(self, max_buckets: int = 100_000) -> None:
+        """Límites en memoria del worker. Se usa sólo desde el event loop, así que no
+        necesita locks.
+
+        Args:
+            max_buckets (int, optional): Buckets antes de purgar los que ya están llenos. Defaults to 100_000.
+        """
+        self.max_buckets = max_buckets
+        self.buckets: dict[str, tuple[float, float, RateLimit]] = {}
+        self.slots: defaultdict[str, int] = defaultdict(int)
+
+    def _purge(self, now: float) -> None:
+        # Un bucket que ya se rellenó por completo equivale a uno nuevo: se puede olvidar.
+        full = [key for key, (tokens, updated, limit) in self.buckets.items()
+                if tokens + (now - updated) * limit.rate >= limit.capacity]
+        for key in full:
+            del self.buckets[key]
+
+    async def take_all(self, buckets: list[tuple[str, RateLimit]], cost: float = 1.0) -> list[float]:
+        now = time.monotonic()
+        available = []
+        for key, limit in buckets:
+            tokens, updated, _ = self.buckets.get(key, (limit.capacity, now, limit))
+            available.append(min(limit.capacity, tokens + (now - updated) * limit.rate))
+        waits = [0.0 if tokens >= cost else (cost - tokens) / limit.rate for tokens, (_, limit) in zip(available, buckets)]
+        allowed = not any(waits)
+        if allowed and len(self.buckets) >= self.max_buckets:
+            self._purge(now)
+        for tokens, (key, limit) in zip(available, buckets):
+            self.buckets[key] = (tokens - cost if allowed else tokens, now, limit)
+        return waits
+
+    async def acquire_slot(self, key: str, limit: int) -> bool:
+        if self.slots[key] >= limit:
+            return False
+        self.slots[key] += 1
+        return True
+
+    async def release_slot(self, key: str) -> None:
+        self.slots[key] = max(0, self.slots[key] - 1)
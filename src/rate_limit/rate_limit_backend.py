@@ -0,0 +1,59 @@
+import re
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+
+_PERIODS = {'second': 1, 'minute': 60, 'hour': 3600, 'day': 86400}
+_LIMIT_RE = re.compile(r'^\s*(\d+)\s*/\s*(\d+|second|minute|hour|day)\s*(?::\s*(\d+))?\s*$')
+
+@dataclass(frozen=True)
+class RateLimit:
+    """Token bucket: ``capacity`` fichas que se reponen a ``rate`` fichas por segundo."""
+    rate: float
+    capacity: float
+
+    @classmethod
+    def parse(cls, spec: str) -> 'RateLimit':
+        """Parsea '10/minute', '100/3600' o '10/minute:20' (con ráfaga de 20).
+
+        Raises:
+            ValueError: Si el formato no es válido.
+        """
+        match = _LIMIT_RE.match(spec)
+        if not match:
+            raise ValueError(f"Invalid rate limit '{spec}'")
+        amount, period, burst = match.groups()
+        seconds = int(period) if period.isdigit() else _PERIODS[period]
+        return cls(rate=int(amount) / seconds, capacity=float(burst or amount))
+
+class RateLimitBackend(ABC):
+    """Estado de los límites. El backend en memoria vale por worker; uno compartido
+    (Redis) hace que los límites se cumplan entre todos los workers.
+    """
+
+    @abstractmethod
+    async def take_all(self, buckets: list[tuple[str, RateLimit]], cost: float = 1.0) -> list[float]:
+        """Intenta consumir ``cost`` fichas de cada bucket, de forma atómica: si alguno no
+        tiene suficientes, no se consume de ninguno.
+
+        Args:
+            buckets (list[tuple[str, RateLimit]]): Pares (key, límite).
+
+        Returns:
+            list[float]: Devuelve, por bucket, 0 si alcanzaba o los segundos a esperar si no.
+        """
+
+    async def take(self, key: str, limit: RateLimit, cost: float = 1.0) -> float:
+        """Intenta consumir ``cost`` fichas del bucket ``key``.
+
+        Returns:
+            float: Devuelve 0 si se permitió, o los segundos a esperar si no.
+        """
+        return (await self.take_all([(key, limit)], cost))[0]
+
+    @abstractmethod
+    async def acquire_slot(self, key: str, limit: int) -> bool:
+        """Ocupa un lugar de un límite de concurrencia. Devuelve False si está lleno."""
+
+    @abstractmethod
+    async def release_slot(self, key: str) -> None:
+        """Libera un lugar ocupado con ``acquire_slot``."""
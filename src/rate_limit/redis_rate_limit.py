@@ -0,0 +1,74 @@
+import time
+
+from src.rate_limit.rate_limit_backend import RateLimit, RateLimitBackend
+
+# Token buckets atómicos: se consume de todos o de ninguno.
+# KEYS = buckets, ARGV = cost, now, y rate, capacity de cada bucket.
+_TAKE_SCRIPT = """
+local cost = tonumber(ARGV[1])
+local now = tonumber(ARGV[2])
+local tokens = {}
+local waits = {}
+local allowed = true
+for i = 1, #KEYS do
+    local rate = tonumber(ARGV[1 + 2 * i])
+    local capacity = tonumber(ARGV[2 + 2 * i])
+    local state = redis.call('HMGET', KEYS[i], 'tokens', 'updated')
+    local available = tonumber(state[1]) or capacity
+    local updated = tonumber(state[2]) or now
+    tokens[i] = math.min(capacity, available + math.max(0, now - updated) * rate)
+    if tokens[i] < cost then
+        waits[i] = tostring((cost - tokens[i]) / rate)
+        allowed = false
+    else
+        waits[i] = '0'
+    end
+end
+for i = 1, #KEYS do
+    local rate = tonumber(ARGV[1 + 2 * i])
+    local capacity = tonumber(ARGV[2 + 2 * i])
+    if allowed then
+        tokens[i] = tokens[i] - cost
+    end
+    redis.call('HSET', KEYS[i], 'tokens', tokens[i], 'updated', now)
+    redis.call('EXPIRE', KEYS[i], math.ceil(capacity / rate) + 1)
+end
+return waits
+"""
+
+class RedisRateLimit(RateLimitBackend):
+    def __init__(self, url: str, prefix: str = 'skoob:rl:', slot_ttl: int = 3600) -> None:
+        """Límites compartidos entre workers (y nodos) en Redis.
+
+        Args:
+            url (str): URL de Redis (redis://host:6379/0).
+            prefix (str, optional): Prefijo de las keys. Defaults to 'skoob:rl:'.
+            slot_ttl (int, optional): Expiración de los contadores de concurrencia, por si un
+                worker muere sin liberar sus lugares. Defaults to 3600.
+        """
+        # Import diferido: redis sólo es necesario con RATE_LIMIT_BACKEND=redis.
+        import redis.asyncio
+        self.client = redis.asyncio.Redis.from_url(url)
+        self.prefix = prefix
+        self.slot_ttl = slot_ttl
+        self._take = self.client.register_script(_TAKE_SCRIPT)
+
+    async def take_all(self, buckets: list[tuple[str, RateLimit]], cost: float = 1.0) -> list[float]:
+        # Usamos el reloj del worker: alcanza con que los nodos estén sincronizados por NTP.
+        args = [cost, time.time()]
+        for _, limit in buckets:
+            args += [limit.rate, limit.capacity]
+        waits = await self._take(keys=[self.prefix + key for key, _ in buckets], args=args)
+        return [float(wait) for wait in waits]
+
+    async def acquire_slot(self, key: str, limit: int) -> bool:
+        key = f'{self.prefix}slots:{key}'
+        async with self.client.pipeline(transaction=True) as pipe:
+            in_use, _ = await pipe.incr(key).expire(key, self.slot_ttl).execute()
+        if in_use > limit:
+            await self.client.decr(key)
+            return False
+        return True
+
+    async def release_slot(self, key: str) -> None:
+        await self.client.decr(f'{self.prefix}slots:{key}')
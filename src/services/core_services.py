@@ -3,10 +3,20 @@ from src.services.microservices.users_services import UsersServices
 from src.services.microservices.books_services import BooksServices
 from src.services.microservices.security_services import SecurityServices
 from src.services.microservices.search_services import SearchServices
+from src.services.microservices.storage_services import StorageServices
+from src.services.microservices.dictionary_services import DictionaryServices
+from src.services.microservices.token_revocation_services import TokenRevocationServices
+from src.services.microservices.health_services import HealthServices
+from src.services.microservices.export_services import ExportServices
+from src.services.microservices.annotations_services import AnnotationsServices
+from src.services.microservices.summary_services import SummaryServices
+from src.services.microservices.storage_layout_services import StorageLayoutServices
+from src.services.microservices.upload_services import UploadServices
+from src.services.microservices.google_auth_services import GoogleAuthServices
 from sqlalchemy import Engine
 from dotenv import load_dotenv
 
-class CoreServices(UsersServices, BooksServices, SecurityServices, SearchServices):
+class CoreServices(UsersServices, BooksServices, StorageServices, DictionaryServices, TokenRevocationServices, HealthServices, ExportServices, AnnotationsServices, SummaryServices, StorageLayoutServices, UploadServices, GoogleAuthServices, SecurityServices, SearchServices):
     def __init__(self, engine: Engine) -> None:
         load_dotenv()
         self.engine = engine
@@ -0,0 +1,144 @@
+import os
+from typing import Optional
+
+from sqlalchemy import Engine, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from src.models.annotations_model import AnnotationsModel, AnnotationVersionsModel
+from src.models.books_model import BooksModel
+from src.models.users_model import UsersModel
+
+# Campos de una anotación que el cliente puede modificar.
+ANNOTATION_FIELDS = ('book_id', 'chapter_number', 'cfi_range', 'kind', 'color', 'quote', 'note')
+
+class AnnotationsServices:
+    def __init__(self) -> None:
+        """Notas y resaltados con sincronización incremental (offline-first).
+
+        Cada cambio recibe la siguiente versión del contador del usuario y el cliente pide
+        los cambios posteriores a la última versión que vio: el costo del sync depende de
+        la cantidad de cambios, no de la cantidad de anotaciones.
+        """
+        super().__init__()
+        self.engine: Engine = self.engine
+        self.annotations_sync_max_changes: int = int(os.getenv('ANNOTATIONS_SYNC_MAX_CHANGES', '500'))
+        self.annotations_sync_page_size: int = int(os.getenv('ANNOTATIONS_SYNC_PAGE_SIZE', '500'))
+
+    @staticmethod
+    def _lock_annotations_version(session: Session, user_id: int) -> int:
+        """Bloquea (creándola si hace falta) la fila del contador del usuario y devuelve su valor.
+
+        El lock dura hasta el commit, así los push de un mismo usuario se serializan y las
+        versiones se hacen visibles en orden: un pull nunca se saltea un cambio.
+        """
+        statement = (
+            insert(AnnotationVersionsModel)
+            .values(user_id=user_id, version=0)
+            .on_conflict_do_update(index_elements=[AnnotationVersionsModel.user_id], set_={'version': AnnotationVersionsModel.version})
+            .returning(AnnotationVersionsModel.version)
+        )
+        return session.execute(statement).scalar_one()
+
+    def _apply_annotation_changes(self, session: Session, user: UsersModel, changes: list[dict]) -> tuple[list[dict], list[dict]]:
+        """Aplica los cambios del cliente (en orden). Gana el servidor si la anotación cambió
+        después de la versión en la que se basa el cambio (base_version).
+
+        Returns:
+            tuple[list[dict], list[dict]]: Conflictos (con el estado del servidor) y cambios rechazados.
+        """
+        version = self._lock_annotations_version(session, user.id)
+        owned_books = set(session.scalars(
+            select(BooksModel.id).where(BooksModel.id.in_({c['book_id'] for c in changes}), BooksModel.owner_id == user.id)
+        ))
+        existing = {
+            annotation.uid: annotation
+            for annotation in session.scalars(
+                select(AnnotationsModel)
+                .where(AnnotationsModel.user_id == user.id, AnnotationsModel.uid.in_({c['uid'] for c in changes}))
+            )
+        }
+
+        conflicts, rejected = [], []
+        for change in changes:
+            annotation = existing.get(change['uid'])
+            if change['book_id'] not in owned_books:
+                rejected.append({'uid': change['uid'], 'reason': 'BookNotFound'})
+                continue
+            base_version = change.get('base_version')
+            if annotation is not None and base_version is not None and annotation.version > base_version:
+                conflicts.append(annotation.serialize())
+                continue
+            if annotation is None:
+                if change.get('deleted'):
+                    continue  # Creada y borrada sin llegar a sincronizarse.
+                annotation = AnnotationsModel(uid=change['uid'], user_id=user.id)
+                session.add(annotation)
+                existing[change['uid']] = annotation
+            for field in ANNOTATION_FIELDS:
+                setattr(annotation, field, change.get(field))
+            annotation.deleted = bool(change.get('deleted'))
+            version += 1
+            # Todas las versiones nuevas son mayores al contador: el índice único no choca
+            # aunque el flush reordene los INSERT/UPDATE.
+            annotation.version = version
+
+        session.execute(
+            update(AnnotationVersionsModel).where(AnnotationVersionsModel.user_id == user.id).values(version=version)
+        )
+        return conflicts, rejected
+
+    def sync_annotations(self, user: UsersModel, since: int = 0, changes: Optional[list[dict]] = None) -> dict:
+        """Aplica los cambios del cliente y devuelve los del servidor posteriores a ``since``.
+
+        Los cambios propios vuelven en la respuesta con su versión asignada. Si ``has_more``
+        es True, el cliente debe volver a llamar con ``since=version`` hasta vaciar la cola.
+
+        Args:
+            user (UsersModel): Dueño de las anotaciones.
+            since (int, optional): Última versión que vio el cliente (0 la primera vez). Defaults to 0.
+            changes (Optional[list[dict]], optional): Cambios hechos offline. Defaults to None.
+
+        Returns:
+            dict: {'version', 'changes', 'has_more', 'conflicts', 'rejected'}.
+        """
+        changes = changes or []
+        if len(changes) > self.annotations_sync_max_changes:
+            raise ValueError(f'at most {self.annotations_sync_max_changes} changes per sync')
+
+        with Session(self.engine, expire_on_commit=False) as session, session.begin():
+            conflicts, rejected = self._apply_annotation_changes(session, user, changes) if changes else ([], [])
+
+            # El contador se lee antes que las filas: todo cambio con versión <= current ya es visible.
+            current = session.scalar(
+                select(AnnotationVersionsModel.version).where(AnnotationVersionsModel.user_id == user.id)
+            ) or 0
+            query = (
+                select(AnnotationsModel)
+                .where(AnnotationsModel.user_id == user.id, AnnotationsModel.version > since)
+                .order_by(AnnotationsModel.version)
+                .limit(self.annotations_sync_page_size + 1)
+            )
+            if since <= 0:
+                # Primer sync: el cliente no tiene nada que borrar.
+                query = query.where(AnnotationsModel.deleted.is_(False))
+            rows = session.scalars(query).all()
+
+        has_more = len(rows) > self.annotations_sync_page_size
+        rows = rows[:self.annotations_sync_page_size]
+        return {
+            'version': rows[-1].version if has_more else current,
+            'changes': [annotation.serialize() for annotation in rows],
+            'has_more': has_more,
+            'conflicts': conflicts,
+            'rejected': rejected,
+        }
+
+    def get_book_annotations(self, user: UsersModel, book_id: int) -> list[AnnotationsModel]:
+        """Anotaciones vigentes (sin tombstones) de un libro, en orden de lectura."""
+        with Session(self.engine) as session:
+            return session.scalars(
+                select(AnnotationsModel)
+                .where(AnnotationsModel.user_id == user.id, AnnotationsModel.book_id == book_id, AnnotationsModel.deleted.is_(False))
+                .order_by(AnnotationsModel.chapter_number, AnnotationsModel.cfi_range)
+            ).all()
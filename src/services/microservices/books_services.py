@@ -1,25 +1,39 @@
+import hashlib
+import io
 import os
 from pathlib import Path, PosixPath
 import shutil
-from typing import Annotated, Optional, Union
+import threading
+import time
+from contextlib import contextmanager
+from typing import Annotated, Callable, Iterator, Optional, Union
 from fastapi import HTTPException, status
 from urllib import response
 from fastapi import UploadFile
-from sqlalchemy import Engine
+from sqlalchemy import Engine, Row
 import uuid
 import zipfile
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, undefer
 from lxml import etree, html
 import pprint
 
 from src.models.users_model import UsersModel
 from src.models.books_model import BooksModel
+from src.models.chapters_model import ChaptersModel
 from src.utils.http.response_utils import HttpResponses
+from src.storage.storage_backend import StorageBackend
+from src.utils.metrics.prometheus_metrics import INGEST_BOOK_BYTES, INGEST_BOOK_CHAPTERS, INGEST_STAGE_SECONDS, stage_timer
+from src.storage.storage_cache import StorageCache
+from src.storage.book_layout import book_prefix
+from src.utils.pdf.pdf_document import PdfDocuments, read_pdf, render_page
+from src.utils.reader.fragments import split_chapter
+from src.utils.reader.image_size import HEADER_BYTES, image_size
+from src.utils.reader.reader_variant import build_reader_chapter, minify_css
 
 class BooksServices:
     def __init__(self) -> None:
         super().__init__()
-        self.books_sufix = ['.epub']
+        self.books_sufix = ['.epub', '.pdf']
         self.books_content_prefix = '/books/content'
         # =========================== NAMESPACES XML ============================
         # Los namespaces son como espacios que definen el contexto o grupos de 
@@ -35,40 +49,99 @@ class BooksServices:
         # ========================================================================
 
         self.engine: Engine = self.engine
+        self.storage: StorageBackend = self.storage
+
+        # Páginas de PDF renderizadas bajo demanda (caché acotada por tamaño, ver pdf_page_cache).
+        self._pdf_page_cache: Optional[StorageCache] = None
+        # PDFs abiertos para renderizar sus páginas (ver pdf_documents).
+        self._pdf_documents: Optional[PdfDocuments] = None
+        self.pdf_cover_zoom: float = float(os.getenv('PDF_COVER_ZOOM', '0.5'))
+
+        # Los capítulos más grandes que esto se dividen en fragmentos de este tamaño.
+        self.chapter_fragment_bytes: int = int(os.getenv('CHAPTER_FRAGMENT_BYTES', str(256 * 1024)))
+
+        # Ingestas en curso en este worker (para esperarlas al apagar).
+        self.ingests_in_flight: int = 0
+        self._ingests_changed = threading.Condition()
+
+    @contextmanager
+    def track_ingest(self) -> Iterator[None]:
+        with self._ingests_changed:
+            self.ingests_in_flight += 1
+        try:
+            yield
+        finally:
+            with self._ingests_changed:
+                self.ingests_in_flight -= 1
+                self._ingests_changed.notify_all()
+
+    def wait_for_ingests(self, timeout: float) -> bool:
+        """Espera a que terminen las ingestas en curso.
+
+        Args:
+            timeout (float): Segundos máximos de espera.
+
+        Returns:
+            bool: Devuelve True si no quedó ninguna en curso.
+        """
+        with self._ingests_changed:
+            return self._ingests_changed.wait_for(lambda: self.ingests_in_flight == 0, timeout=timeout)
 
     def save_book(self, file: UploadFile, user: UsersModel) -> BooksModel:
-        path = Path(file.filename) # lo convertimos a formato path.
-        if path.suffix not in self.books_sufix: # verificamos que el formato sea correcto.
+        with self.track_ingest():
+            book_type = self.book_type_from_filename(file.filename)
+            saving_folder, original_file_path = self.allocate_book_folder(book_type)
+            # Guardamos el archivo.
+            with stage_timer('copy'), open(original_file_path, 'wb') as buffer:
+                shutil.copyfileobj(file.file, buffer)
+            return self.ingest_book(original_file_path, saving_folder, book_type, user.id)
+
+    def book_type_from_filename(self, filename: Optional[str]) -> str:
+        """Valida el formato del archivo subido.
+
+        Returns:
+            str: Devuelve el tipo de libro ('epub' o 'pdf').
+        """
+        path = Path(filename or '') # lo convertimos a formato path.
+        if path.suffix.lower() not in self.books_sufix: # verificamos que el formato sea correcto.
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="File format not supported",
             )
-        # Generamos el path donde guardaremos el archivo.
-        saving_folder: PosixPath = Path('.') / 'content' / 'books' / user.email / str(uuid.uuid4())
-        
-        # Validamos la existencia de la carpeta de guardado.
-        if not saving_folder.exists():
-            os.makedirs(saving_folder)
+        return path.suffix.lower().lstrip('.')
 
-        # Guardamos el archivo, con un nombre distinto dependiendo de su formato.
-        if path.suffix == '.epub':
-            filename = Path('book_content_epub.zip')
-        else:
-            filename = Path('book' + path.suffix)
-        
-        # Guardamos el path del archivo original.
-        original_file_path = saving_folder / filename
+    def allocate_book_folder(self, book_type: str) -> tuple[PosixPath, PosixPath]:
+        """Crea la carpeta de trabajo de un libro nuevo (particionada por hash, ver book_layout).
+
+        Returns:
+            tuple[PosixPath, PosixPath]: Devuelve la carpeta y el path donde va el archivo original.
+        """
+        saving_folder: PosixPath = Path(book_prefix(str(uuid.uuid4())))
+        os.makedirs(saving_folder, exist_ok=True)
+        # El archivo original tiene un nombre distinto dependiendo de su formato.
+        filename = 'book_content_epub.zip' if book_type == 'epub' else f'book.{book_type}'
+        return saving_folder, saving_folder / filename
 
-        # Guardamos el archivo.
-        with open(original_file_path, 'wb') as buffer:
-            shutil.copyfileobj(file.file, buffer)
-            #print(f'The file {file.filename} was saved in {str(saving_folder)}')
+    def ingest_book(self, original_file_path: PosixPath, saving_folder: PosixPath, book_type: str, owner_id: int) -> BooksModel:
+        """Procesa un archivo ya guardado en su carpeta de trabajo: extrae el libro, genera sus
+        capítulos y lo publica en el almacén de contenido.
 
-        # Descomprimimos el archivo si es un .epub
-        if path.suffix == '.epub':
+        Args:
+            original_file_path (PosixPath): Path del archivo original (dentro de saving_folder).
+            saving_folder (PosixPath): Carpeta de trabajo del libro (ver allocate_book_folder).
+            book_type (str): 'epub' o 'pdf'.
+            owner_id (int): ID del dueño.
+
+        Returns:
+            BooksModel: Devuelve el libro creado.
+        """
+        INGEST_BOOK_BYTES.observe(original_file_path.stat().st_size)
+
+        # Descomprimimos el archivo si es un .epub; de los PDF sólo leemos metadatos, outline y texto.
+        if book_type == 'epub':
             book_content = {'type': 'epub', 'data': self.process_epub_book(original_file_path, saving_folder)}
         else:
-            pass
+            book_content = {'type': 'pdf', 'data': self.process_pdf_book(original_file_path, saving_folder)}
             
         book = BooksModel(
             title=book_content['data']['metadata']['title'],
@@ -84,17 +157,41 @@ class BooksServices:
             original_file_path=str(original_file_path),
             opf_path=self.safety_path(saving_folder, book_content['data']['metadata']['opf_path']),
             metadata_path=self.safety_path(saving_folder, book_content['data']['metadata']['metadata_base_path']),
-            toc_path=self.safety_path(saving_folder, book_content['data']['metadata']['content_table_path']),
+            toc_path=self.safety_path(saving_folder, book_content['data']['metadata'].get('content_table_path')),
             toc_content=book_content['data']['toc'],
-            book_content=book_content['data']['book_content'],
-            owner_id=user.id,
-            book_type='epub' if path.suffix == '.epub' else 'pdf',
+            chapters_count=len(book_content['data']['book_content']),
+            owner_id=owner_id,
+            book_type=book_type,
         )
+        chapter_paths = book_content['data']['book_content']
+        INGEST_BOOK_CHAPTERS.observe(len(chapter_paths))
         with Session(self.engine) as session:
             session.add(book)
-            session.commit()
+            session.flush() # Necesitamos el id para reescribir las URLs.
+            if book_content['type'] == 'pdf':
+                with stage_timer('chapters'):
+                    chapters = self.build_pdf_pages(book.id, book_content['data'])
+                book.chapters_count = len(chapters)
+            else:
+                with stage_timer('rewrite'):
+                    self.edit_book_urls(book, chapter_paths)
+                with stage_timer('reader'):
+                    base_path = Path(book_content['data']['metadata']['metadata_base_path'])
+                    css_aliases = self.minify_book_css(book.id, base_path)
+                    reader_paths = self.build_reader_variants(
+                        book.id, chapter_paths, base_path, lambda p: Path(p).read_bytes(), lambda p, data: Path(p).write_bytes(data), css_aliases,
+                    )
+                with stage_timer('chapters'):
+                    chapters = self.build_chapters(book.id, chapter_paths, book.toc_content, lambda p: Path(p).read_bytes(), reader_paths)
+                with stage_timer('fragments'):
+                    self.fragment_chapters(chapters, lambda p: Path(p).read_bytes(), lambda p, data: Path(p).write_bytes(data))
+            session.add_all(chapters)
+            with stage_timer('db_commit'):
+                session.commit()
             session.refresh(book)
-        self.edit_book_urls(book)
+        # Una vez procesado, publicamos el libro en el almacén de contenido.
+        with stage_timer('publish'):
+            self.storage.publish_folder(saving_folder, saving_folder)
 
         return book
     
@@ -104,19 +201,261 @@ class BooksServices:
         Returns:
             str: Devuelve el path objetivo si es seguro, de lo contrario devuelve None. 
         """
-        if str(safety_base) not in str(Path(target_path).resolve()) or not target_path:
+        if not target_path or str(safety_base) not in str(Path(target_path).resolve()):
             return None
         return target_path
 
 
-    def edit_book_urls(self, book: BooksModel) -> None:
+    def build_chapters(
+        self, book_id: int, chapter_paths: list[str], toc: Optional[dict], read: Callable[[str], bytes], reader_paths: Optional[list[Optional[str]]] = None,
+    ) -> list[ChaptersModel]:
+        """Genera las filas de la tabla chapters a partir de los archivos del spine.
+
+        Args:
+            book_id (int): ID del libro.
+            chapter_paths (list[str]): Paths de los capítulos, en el orden del spine.
+            toc (Optional[dict]): Tabla de contenidos ({título: path}).
+            read (Callable[[str], bytes]): Función para leer el contenido de cada capítulo.
+            reader_paths (Optional[list[Optional[str]]], optional): Paths de la variante lector de cada capítulo. Defaults to None.
+
+        Returns:
+            list[ChaptersModel]: Devuelve los capítulos (sin guardar).
+        """
+        # El TOC puede apuntar a anclas dentro del capítulo: nos quedamos con el primer título.
+        toc_titles = {}
+        for title, target in (toc or {}).items():
+            toc_titles.setdefault(target.split('#')[0], title)
+
+        chapters = []
+        for index, chapter_path in enumerate(chapter_paths):
+            chapter = ChaptersModel(book_id=book_id, spine_index=index, path=chapter_path, title=toc_titles.get(chapter_path))
+            if reader_paths:
+                chapter.reader_path = reader_paths[index]
+            try:
+                data = read(chapter_path)
+            except (OSError, ValueError):
+                data = None
+            if data is not None:
+                chapter.byte_size = len(data)
+                chapter.content_hash = hashlib.sha256(data).hexdigest()
+                try:
+                    chapter.word_count = len(html.fromstring(data).text_content().split())
+                except (etree.ParserError, ValueError):
+                    chapter.word_count = None
+            chapters.append(chapter)
+        return chapters
+
+    def backfill_chapters(self, batch_size: int = 100) -> int:
+        """Migra los libros que todavía guardan sus capítulos en el array book_content
+        a la tabla chapters, por lotes.
+
+        Args:
+            batch_size (int, optional): Libros por transacción. Defaults to 100.
+
+        Returns:
+            int: Devuelve la cantidad de libros migrados.
+        """
+        migrated, last_id = 0, 0
+        while True:
+            with Session(self.engine) as session:
+                books = (
+                    session.query(BooksModel)
+                    .options(undefer(BooksModel.book_content))
+                    .filter(BooksModel.chapters_count.is_(None), BooksModel.id > last_id)
+                    .order_by(BooksModel.id)
+                    .limit(batch_size)
+                    .all()
+                )
+                if not books:
+                    return migrated
+                for book in books:
+                    chapter_paths = book.book_content or []
+                    session.add_all(self.build_chapters(book.id, chapter_paths, book.toc_content, self.storage.read_bytes))
+                    book.chapters_count = len(chapter_paths)
+                    last_id = book.id
+                session.commit()
+                migrated += len(books)
+
+    def backfill_reader_chapters(self, batch_size: int = 100) -> int:
+        """Genera la variante lector de los capítulos ingestados antes de que existiera.
+
+        Args:
+            batch_size (int, optional): Libros por transacción. Defaults to 100.
+
+        Returns:
+            int: Devuelve la cantidad de libros procesados.
+        """
+        def write(key: str, data: bytes) -> None:
+            self.storage.save(key, io.BytesIO(data))
+
+        processed, last_id = 0, 0
+        while True:
+            with Session(self.engine) as session:
+                book_ids = [
+                    row.book_id for row in
+                    session.query(ChaptersModel.book_id)
+                    # Las páginas de los PDF (con text_offset) no tienen variante lector.
+                    .filter(ChaptersModel.reader_path.is_(None), ChaptersModel.text_offset.is_(None), ChaptersModel.book_id > last_id)
+                    .group_by(ChaptersModel.book_id)
+                    .order_by(ChaptersModel.book_id)
+                    .limit(batch_size)
+                ]
+                if not book_ids:
+                    return processed
+                for book_id in book_ids:
+                    book = session.get(BooksModel, book_id)
+                    chapters = (
+                        session.query(ChaptersModel)
+                        .filter(ChaptersModel.book_id == book_id, ChaptersModel.reader_path.is_(None), ChaptersModel.text_offset.is_(None))
+                        .order_by(ChaptersModel.spine_index)
+                        .all()
+                    )
+                    # Sin listar el almacén no podemos deduplicar CSS: sólo se generan los capítulos.
+                    reader_paths = self.build_reader_variants(
+                        book_id, [c.path for c in chapters], Path(book.metadata_path or ''), self.storage.read_bytes, write,
+                    )
+                    for chapter, reader_path in zip(chapters, reader_paths):
+                        chapter.reader_path = reader_path
+                    last_id = book_id
+                session.commit()
+                processed += len(book_ids)
+
+    def fragment_chapters(self, chapters: list[ChaptersModel], read: Callable[[str], bytes], write: Callable[[str, bytes], None]) -> None:
+        """Divide los capítulos más grandes que chapter_fragment_bytes en fragmentos y completa
+        su índice (fragments) y el mapa ancla -> fragmento (anchor_map). Se divide la variante
+        lector si existe.
+
+        Args:
+            chapters (list[ChaptersModel]): Capítulos a procesar (se modifican en el lugar).
+            read (Callable[[str], bytes]): Función para leer un capítulo.
+            write (Callable[[str, bytes], None]): Función para guardar un fragmento.
+        """
+        for chapter in chapters:
+            source = chapter.reader_path or chapter.path
+            try:
+                data = read(source)
+                path = Path(source)
+                parts = split_chapter(data, self.chapter_fragment_bytes, html_output=path.suffix.lower() in ('.html', '.htm'))
+            except (OSError, ValueError, etree.LxmlError):
+                continue
+            # Una lista vacía indica que el capítulo ya se evaluó y no hace falta dividirlo.
+            fragments, anchor_map = [], {}
+            for index, (content, anchors) in enumerate(parts or []):
+                fragment_path = str(path.with_name(f"{path.stem}.part{index:04d}{path.suffix}"))
+                write(fragment_path, content)
+                fragments.append({'path': fragment_path, 'byte_size': len(content)})
+                for anchor in anchors:
+                    anchor_map.setdefault(anchor, index)
+            chapter.fragments = fragments
+            chapter.anchor_map = anchor_map or None
+
+    def backfill_chapter_fragments(self, batch_size: int = 500) -> int:
+        """Divide los capítulos grandes ingestados antes de que existieran los fragmentos.
+
+        Args:
+            batch_size (int, optional): Capítulos por transacción. Defaults to 500.
+
+        Returns:
+            int: Devuelve la cantidad de capítulos evaluados.
+        """
+        def write(key: str, data: bytes) -> None:
+            self.storage.save(key, io.BytesIO(data))
+
+        processed, last_id = 0, 0
+        while True:
+            with Session(self.engine) as session:
+                chapters = (
+                    session.query(ChaptersModel)
+                    .filter(ChaptersModel.fragments.is_(None), ChaptersModel.id > last_id)
+                    .order_by(ChaptersModel.id)
+                    .limit(batch_size)
+                    .all()
+                )
+                if not chapters:
+                    return processed
+                self.fragment_chapters(chapters, self.storage.read_bytes, write)
+                last_id = chapters[-1].id
+                session.commit()
+                processed += len(chapters)
+
+    def minify_book_css(self, book_id: int, base_path: PosixPath) -> dict[str, str]:
+        """Minifica en el lugar las hojas de estilo del libro y detecta las duplicadas.
+
+        Args:
+            book_id (int): ID del libro.
+            base_path (PosixPath): Carpeta del OPF (base de las URLs del libro).
+
+        Returns:
+            dict[str, str]: Devuelve {URL de un CSS duplicado: URL de la primera copia}.
+        """
+        canonical, aliases = {}, {}
+        for css_path in sorted(base_path.rglob('*.css')):
+            css = minify_css(css_path.read_bytes().decode('utf-8', errors='replace'))
+            css_path.write_text(css, encoding='utf-8')
+            url = f"{self.books_content_prefix}/{book_id}/{css_path.relative_to(base_path).as_posix()}"
+            digest = hashlib.sha256(css.encode('utf-8')).hexdigest()
+            if digest in canonical:
+                aliases[url] = canonical[digest]
+            else:
+                canonical[digest] = url
+        return aliases
+
+    def build_reader_variants(
+        self,
+        book_id: int,
+        chapter_paths: list[str],
+        base_path: PosixPath,
+        read: Callable[[str], bytes],
+        write: Callable[[str, bytes], None],
+        css_aliases: Optional[dict[str, str]] = None,
+    ) -> list[Optional[str]]:
+        """Genera la variante lector (minificada y saneada) de cada capítulo, junto al original.
+
+        Args:
+            book_id (int): ID del libro.
+            chapter_paths (list[str]): Paths de los capítulos (ya con las URLs reescritas).
+            base_path (PosixPath): Carpeta del OPF, para resolver las URLs de las imágenes.
+            read (Callable[[str], bytes]): Función para leer un archivo del libro.
+            write (Callable[[str, bytes], None]): Función para guardar la variante.
+            css_aliases (Optional[dict[str, str]], optional): CSS duplicados (ver minify_book_css). Defaults to None.
+
+        Returns:
+            list[Optional[str]]: Devuelve el path de la variante de cada capítulo (None si no se pudo generar).
+        """
+        prefix = f"{self.books_content_prefix}/{book_id}/"
+        sizes = {}
+
+        def size_of(url: str) -> Optional[tuple[int, int]]:
+            if not url.startswith(prefix):
+                return None
+            if url not in sizes:
+                try:
+                    sizes[url] = image_size(read(str(base_path / url[len(prefix):]))[:HEADER_BYTES])
+                except (OSError, ValueError):
+                    sizes[url] = None
+            return sizes[url]
+
+        reader_paths = []
+        for chapter_path in chapter_paths:
+            path = Path(chapter_path)
+            reader_path = str(path.with_name(f"{path.stem}.reader{path.suffix}"))
+            try:
+                data = build_reader_chapter(read(chapter_path), size_of, css_aliases, html_output=path.suffix.lower() in ('.html', '.htm'))
+                write(reader_path, data)
+            except (OSError, ValueError, etree.LxmlError):
+                reader_path = None
+            reader_paths.append(reader_path)
+        return reader_paths
+
+    def edit_book_urls(self, book: BooksModel, chapter_paths: list[str]) -> None:
         """Edita las URLs de los archivos del libro para que sean accesibles desde la API.
 
         Args:
             book (BooksModel): Instancia del libro a editar.
+            chapter_paths (list[str]): Paths locales de los capítulos.
         """
         ns = {"xlink": "http://www.w3.org/1999/xlink"}
-        for chapter in book.book_content:
+        for chapter in chapter_paths:
             chapter_path = Path(chapter)
             tree = html.parse(chapter_path)
             src_nodes = tree.xpath("//*[@src]")
@@ -149,7 +488,7 @@ class BooksServices:
     def process_epub_book(self, original_file_path: PosixPath, saving_folder: PosixPath) -> None:
         """_summary_
         """        
-        with zipfile.ZipFile(original_file_path, 'r') as zip_ref:
+        with stage_timer('unzip'), zipfile.ZipFile(original_file_path, 'r') as zip_ref:
             extracted_folder = saving_folder / 'extracted'
             zip_ref.extractall(extracted_folder)
 
@@ -173,11 +512,119 @@ class BooksServices:
         # El archivo OPF contiene los metadatos del libro. Generamos su path.
         opf_path = extracted_folder / _rootfile_.get('full-path')
         metadata = self.read_opf(opf_path, saving_folder)
-        print(metadata)
         metadata['metadata']['metadata_base_path'] = str(opf_path.parent)
         metadata['metadata']['opf_path'] = str(opf_path)
         return metadata
 
+    def process_pdf_book(self, original_file_path: PosixPath, saving_folder: PosixPath) -> dict:
+        """Lee los metadatos, el outline y el texto de cada página de un PDF. No se rasteriza
+        nada salvo la portada (primera página, en baja resolución).
+
+        Args:
+            original_file_path (PosixPath): Path del PDF.
+            saving_folder (PosixPath): Carpeta del libro.
+
+        Returns:
+            dict: Devuelve los metadatos, la tabla de contenidos ({título: '#page=N'}) y las páginas.
+        """
+        text_path = saving_folder / 'book_text.txt'
+        try:
+            with stage_timer('pdf_text'):
+                pdf = read_pdf(original_file_path, text_path)
+            cover_path = saving_folder / 'cover.png'
+            with stage_timer('pdf_cover'):
+                if pdf['pages']:
+                    cover_path.write_bytes(render_page(original_file_path, 0, self.pdf_cover_zoom))
+        except ImportError:
+            shutil.rmtree(saving_folder)
+            raise HTTPException(
+                status_code=status.HTTP_501_NOT_IMPLEMENTED,
+                detail="PDF support is not installed (pymupdf).",
+            )
+        except ValueError as error:
+            shutil.rmtree(saving_folder)
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"The PDF file could not be read: {error}",
+            )
+
+        # Nos quedamos con el primer título de cada página (como con el TOC de los EPUB).
+        toc = {}
+        for _, title, page in pdf['outline']:
+            toc.setdefault(title, f'#page={page + 1}')
+        metadata = pdf['metadata']
+        metadata = {
+            'title': metadata['title'] or original_file_path.stem,
+            'description': metadata['description'] or 'No description.',
+            'creator': metadata['creator'] or 'Unknown',
+            'contributor': 'ElHaban3ro (Unknown)',
+            'category': metadata['category'],
+            'publish_date': metadata['publish_date'],
+            'publisher': metadata['publisher'],
+            'language': metadata['language'],
+            'cover_path': str(cover_path) if cover_path.exists() else None,
+            'opf_path': None,
+            'metadata_base_path': None,
+            'text_path': str(text_path),
+        }
+        return {'metadata': metadata, 'toc': toc, 'book_content': [], 'pages': pdf['pages'], 'outline': pdf['outline']}
+
+    def build_pdf_pages(self, book_id: int, pdf: dict) -> list[ChaptersModel]:
+        """Genera una fila de chapters por página del PDF. El path de cada página es el
+        archivo de texto del libro, y text_offset/byte_size ubican su texto en él.
+
+        Args:
+            book_id (int): ID del libro.
+            pdf (dict): Resultado de process_pdf_book.
+
+        Returns:
+            list[ChaptersModel]: Devuelve las páginas (sin guardar).
+        """
+        titles = {}
+        for _, title, page in pdf['outline']:
+            titles.setdefault(page, title)
+        text_path = pdf['metadata']['text_path']
+        return [
+            ChaptersModel(book_id=book_id, spine_index=index, path=text_path, title=titles.get(index), fragments=[], **page)
+            for index, page in enumerate(pdf['pages'])
+        ]
+
+    def pdf_page_cache(self) -> StorageCache:
+        if self._pdf_page_cache is None:
+            self._pdf_page_cache = StorageCache(
+                cache_dir=os.getenv('PDF_PAGE_CACHE_DIR', './content/cache/pdf_pages'),
+                max_bytes=int(os.getenv('PDF_PAGE_CACHE_MAX_MB', '256')) * 1024 * 1024,
+                max_object_bytes=int(os.getenv('PDF_PAGE_CACHE_MAX_MB', '256')) * 1024 * 1024,
+            )
+        return self._pdf_page_cache
+
+    def pdf_documents(self) -> PdfDocuments:
+        if self._pdf_documents is None:
+            self._pdf_documents = PdfDocuments(
+                max_documents=int(os.getenv('PDF_OPEN_DOCUMENTS', '8')),
+                copies_dir=os.getenv('PDF_COPIES_DIR', './content/cache/pdf_copies'),
+            )
+        return self._pdf_documents
+
+    def render_pdf_page(self, pdf_key: str, page_index: int, zoom: float) -> Path:
+        """Renderiza (o toma de la caché) una página de un PDF.
+
+        Args:
+            pdf_key (str): Key del PDF en el almacén.
+            page_index (int): Página (desde 0).
+            zoom (float): Escala del renderizado.
+
+        Returns:
+            Path: Devuelve el path local de la imagen PNG.
+        """
+        def render(target: Path) -> None:
+            target.write_bytes(self.pdf_documents().render(
+                pdf_key, page_index, zoom,
+                lambda: self.storage.local_path(pdf_key),
+                lambda: self.storage.open(pdf_key),
+            ))
+        return self.pdf_page_cache().fetch(f'{pdf_key}:{page_index}@{zoom}', None, render)
+
     def read_opf(self, opf_path: PosixPath, saving_path: PosixPath) -> dict:
         """Lee el archivo OPF y extrae los metadatos del libro.
 
@@ -195,6 +642,7 @@ class BooksServices:
                 detail="The OPF (metadata) file does not exist.",
             )
         
+        opf_started = time.perf_counter()
         # Parseamos el archivo OPF.
         tree = etree.parse(opf_path)
         root = tree.getroot() # obtenemos la raiz del XML.
@@ -246,26 +694,41 @@ class BooksServices:
         # Obtenemos el path del TOC (Tabla de Contenidos) si existe.
         toc_ref = _spine_.get('toc')
         toc = {}
+        INGEST_STAGE_SECONDS.labels('opf').observe(time.perf_counter() - opf_started)
         if toc_ref != None:
             # Buscamos el elemento que contiene el path del TOC.
             toc_obj = root.find(f".//opf:item[@id='{toc_ref}']", namespaces=self.opf_namespaces)
             # Guardamos el path del TOC en los metadatos.
             metadata['content_table_path'] = str(opf_path.parent / toc_obj.get('href'))
+            with stage_timer('ncx'):
+                toc = self.read_ncx(Path(metadata['content_table_path']), opf_path.parent)
+        return {'metadata': metadata, 'toc': toc, 'book_content': book_content}
 
-            # Parseamos el archivo NCX (TOC).
-            toc_tree = etree.parse(metadata['content_table_path'])
-            toc_root = toc_tree.getroot()
+    def read_ncx(self, ncx_path: PosixPath, base_path: PosixPath) -> dict:
+        """Lee el archivo NCX (tabla de contenidos) del libro.
 
-            # Buscamos los navPoints (puntos de navegación) en el TOC.
-            toc_navpoints = toc_root.findall('.//ncx:navPoint', namespaces=self.ncx_namespaces)
+        Args:
+            ncx_path (PosixPath): Path del archivo NCX.
+            base_path (PosixPath): Carpeta del OPF, base de los paths del TOC.
 
-            for navpoint in toc_navpoints:
-                # Obtenemos el título de ese punto.
-                nav_label = navpoint.find('ncx:navLabel/ncx:text', namespaces=self.ncx_namespaces).text
-                # Obtenemos el path de ese punto y lo convertimos a un path completo.
-                nav_path = opf_path.parent / navpoint.find('ncx:content', namespaces=self.ncx_namespaces).get('src')
-                toc[nav_label] = str(nav_path)
-        return {'metadata': metadata, 'toc': toc, 'book_content': book_content}
+        Returns:
+            dict: Devuelve la tabla de contenidos ({título: path}).
+        """
+        # Parseamos el archivo NCX (TOC).
+        toc_tree = etree.parse(ncx_path)
+        toc_root = toc_tree.getroot()
+
+        # Buscamos los navPoints (puntos de navegación) en el TOC.
+        toc_navpoints = toc_root.findall('.//ncx:navPoint', namespaces=self.ncx_namespaces)
+
+        toc = {}
+        for navpoint in toc_navpoints:
+            # Obtenemos el título de ese punto.
+            nav_label = navpoint.find('ncx:navLabel/ncx:text', namespaces=self.ncx_namespaces).text
+            # Obtenemos el path de ese punto y lo convertimos a un path completo.
+            nav_path = base_path / navpoint.find('ncx:content', namespaces=self.ncx_namespaces).get('src')
+            toc[nav_label] = str(nav_path)
+        return toc
     
     def get_book(self, id: int) -> BooksModel:
         with Session(self.engine) as session:
@@ -291,31 +754,36 @@ class BooksServices:
             session.delete(book)
             session.commit()
             # Eliminamos los archivos del libro.
-            if Path(book.main_folder_path).exists():
-                shutil.rmtree(book.main_folder_path)
+            self.storage.delete_prefix(book.main_folder_path)
+            if self._pdf_page_cache is not None:
+                self._pdf_page_cache.invalidate_prefix(f'{book.original_file_path}:')
+            if self._pdf_documents is not None:
+                self._pdf_documents.forget(book.original_file_path)
             return True
         
-    def read_book(self, book_id: int, chapter: int) -> str:
-        """Obtiene la ruta del capítulo solicitado.
+    def read_book(self, book_id: int, chapter: int) -> Optional[Row]:
+        """Obtiene el capítulo solicitado por (libro, número de capítulo), sin cargar el libro.
 
         Args:
             book_id (int): ID del libro.
-            chapter (int): Capítulo a leer.
+            chapter (int): Capítulo a leer (empezando en 1).
 
         Returns:
-            str: Devuelve el path del capítulo solicitado.
-        """        
+            Optional[Row]: Devuelve el capítulo (path, reader_path, fragments, anchor_map, text_offset, byte_size)
+            con owner_id, book_type y original_file_path del libro, o None si no existe.
+        """
         with Session(self.engine) as session:
-            book = session.query(BooksModel).filter(BooksModel.id == book_id).first()
-            if chapter <= 0 or chapter > len(book.book_content):
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="The chapter number is out of range.",
-                )
-            chapter_path = book.book_content[chapter - 1]
-            if not Path(chapter_path).exists():
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail="The chapter file does not exist.",
+            return (
+                session.query(
+                    ChaptersModel.path, ChaptersModel.reader_path, ChaptersModel.fragments, ChaptersModel.anchor_map,
+                    ChaptersModel.text_offset, ChaptersModel.byte_size,
+                    BooksModel.owner_id, BooksModel.book_type, BooksModel.original_file_path,
                 )
-            return chapter_path
\ No newline at end of file
+                .join(BooksModel, BooksModel.id == ChaptersModel.book_id)
+                .filter(ChaptersModel.book_id == book_id, ChaptersModel.spine_index == chapter - 1)
+                .first()
+            )
+
+    def book_exists(self, book_id: int) -> bool:
+        with Session(self.engine) as session:
+            return session.query(BooksModel.id).filter(BooksModel.id == book_id).first() is not None
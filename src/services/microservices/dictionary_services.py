@@ -0,0 +1,102 @@
+import os
+import re
+import threading
+from pathlib import Path
+from typing import Optional
+
+from sqlalchemy.orm import Session
+
+from src.dictionary.dictionary_index import DictionaryIndex
+from src.models.books_model import BooksModel
+from src.models.users_model import UsersModel
+
+# Códigos ISO 639-2 que aparecen en los OPF en lugar del código de dos letras.
+_ISO_639_2 = {
+    'spa': 'es', 'eng': 'en', 'por': 'pt', 'fra': 'fr', 'fre': 'fr', 'deu': 'de', 'ger': 'de',
+    'ita': 'it', 'cat': 'ca', 'nld': 'nl', 'dut': 'nl', 'rus': 'ru', 'jpn': 'ja', 'zho': 'zh', 'chi': 'zh',
+}
+# Los códigos de idioma se usan para armar el nombre del índice: nada de '/', '.' ni similares.
+_LANGUAGE_RE = re.compile(r'^[a-z]{2,3}$')
+
+class DictionaryServices:
+    def __init__(self) -> None:
+        """Definiciones de palabras desde diccionarios locales (ver src/dictionary)."""
+        super().__init__()
+        self.dictionary_dir = Path(os.getenv('DICTIONARY_DIR', './content/dictionaries'))
+        self.dictionary_default_language: str = os.getenv('DICTIONARY_DEFAULT_LANGUAGE', 'es')
+        # Sólo los diccionarios abiertos: los idiomas sin diccionario no se guardan, así un
+        # cliente no puede hacer crecer el dict pidiendo idiomas inventados.
+        self._dictionaries: dict[str, DictionaryIndex] = {}
+        self._dictionaries_lock = threading.Lock()
+
+    @staticmethod
+    def normalize_language(language: Optional[str]) -> Optional[str]:
+        """Convierte el idioma de un libro ('es-AR', 'spa', 'EN_us') en el código del diccionario ('es', 'en').
+        Devuelve None si no es un código de idioma válido (dos o tres letras)."""
+        if not language:
+            return None
+        code = language.strip().lower().replace('_', '-').split('-')[0]
+        code = _ISO_639_2.get(code, code)
+        return code if _LANGUAGE_RE.match(code) else None
+
+    def dictionary(self, language: str) -> Optional[DictionaryIndex]:
+        """Devuelve el diccionario del idioma (abierto una sola vez por proceso), o None si no está instalado.
+
+        Args:
+            language (str): Código del idioma.
+
+        Returns:
+            Optional[DictionaryIndex]: Devuelve el índice del diccionario.
+        """
+        if not _LANGUAGE_RE.match(language or ''):
+            return None
+        index = self._dictionaries.get(language)
+        if index is None:
+            with self._dictionaries_lock:
+                index = self._dictionaries.get(language)
+                if index is None:
+                    path = self.dictionary_dir / f'{language}.idx'
+                    if not path.is_file():
+                        return None
+                    try:
+                        index = self._dictionaries[language] = DictionaryIndex(path)
+                    except (OSError, ValueError):
+                        return None
+        return index
+
+    def book_language(self, book_id: int, user: UsersModel) -> Optional[str]:
+        """Idioma de un libro del usuario, o None si el libro no existe o no es suyo."""
+        with Session(self.engine) as session:
+            row = session.query(BooksModel.language, BooksModel.owner_id).filter(BooksModel.id == book_id).first()
+        if row is None or row.owner_id != user.id:
+            return None
+        return self.normalize_language(row.language)
+
+    def define_word(self, word: str, language: Optional[str] = None) -> Optional[dict]:
+        """Busca la definición de una palabra en el diccionario local.
+
+        Args:
+            word (str): Palabra a definir.
+            language (Optional[str], optional): Idioma (por ejemplo el del libro). Defaults to DICTIONARY_DEFAULT_LANGUAGE.
+
+        Returns:
+            Optional[dict]: Devuelve la definición con el mismo formato que search_with_gemini
+            (más 'definitions' y 'source'), o None si la palabra no está en el diccionario.
+        """
+        language = self.normalize_language(language) or self.dictionary_default_language
+        index = self.dictionary(language)
+        senses = index.lookup(word) if index is not None else None
+        if not senses:
+            return None
+        text = '\n'.join(
+            f"{sense['pos']}: {gloss}" if sense['pos'] else gloss
+            for sense in senses for gloss in sense['glosses']
+        )
+        return {
+            'raw_text': text,
+            'text_with_citations': text,
+            'citations': {},
+            'definitions': senses,
+            'language': language,
+            'source': 'dictionary',
+        }
@@ -0,0 +1,173 @@
+import csv
+import io
+import os
+from datetime import datetime
+from typing import Iterator, Optional
+
+import orjson
+from sqlalchemy import ARRAY, Engine, Integer, Select, func, select
+from sqlalchemy.orm import Session
+
+from src.models.books_model import BooksModel
+from src.models.users_model import UsersModel
+
+EXPORT_MEDIA_TYPES: dict[str, str] = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv; charset=utf-8',
+}
+
+# Celdas que una planilla interpretaría como fórmula (CSV injection).
+_CSV_FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+def _csv_cell(value: object) -> object:
+    if value is None:
+        return ''
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, list):
+        return ' '.join(str(item) for item in value)
+    if isinstance(value, str) and value.startswith(_CSV_FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+class ExportServices:
+    def __init__(self) -> None:
+        """Exportaciones de tablas completas para administración.
+
+        Las filas se leen con un cursor del lado del servidor (``yield_per``) y se
+        serializan de a EXPORT_BATCH_ROWS: la memoria no depende del tamaño de la tabla.
+        """
+        super().__init__()
+        self.engine: Engine = self.engine
+        self.export_batch_rows: int = max(1, int(os.getenv('EXPORT_BATCH_ROWS', '1000')))
+
+    def _stream_export(self, statement: Select, export_format: str) -> Iterator[bytes]:
+        """Ejecuta la consulta y va devolviendo un chunk de NDJSON o CSV por lote de filas.
+
+        Args:
+            statement (Select): Consulta de columnas (no entidades ORM) a exportar.
+            export_format (str): 'ndjson' o 'csv'.
+
+        Yields:
+            bytes: Chunks del archivo exportado.
+        """
+        if export_format not in EXPORT_MEDIA_TYPES:
+            raise ValueError(f'unknown export format: {export_format}')
+        with Session(self.engine) as session:
+            result = session.execute(statement.execution_options(yield_per=self.export_batch_rows))
+            columns = list(result.keys())
+            buffer = io.StringIO()
+            writer = csv.writer(buffer, lineterminator='\n')
+            if export_format == 'csv':
+                writer.writerow(columns)
+                yield buffer.getvalue().encode('utf-8')
+            for rows in result.partitions():
+                if export_format == 'ndjson':
+                    yield b''.join(orjson.dumps(row._asdict()) + b'\n' for row in rows)
+                else:
+                    buffer.seek(0)
+                    buffer.truncate()
+                    writer.writerows([_csv_cell(value) for value in row] for row in rows)
+                    yield buffer.getvalue().encode('utf-8')
+
+    def export_users(
+        self,
+        export_format: str = 'ndjson',
+        role: Optional[str] = None,
+        user_type: Optional[str] = None,
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None,
+    ) -> Iterator[bytes]:
+        """Exporta los usuarios (sin contraseñas ni tokens) ordenados por id.
+
+        Args:
+            export_format (str, optional): 'ndjson' o 'csv'. Defaults to 'ndjson'.
+            role (Optional[str], optional): Filtra por rol. Defaults to None.
+            user_type (Optional[str], optional): Filtra por tipo de cuenta. Defaults to None.
+            created_from (Optional[datetime], optional): Creados desde (inclusive). Defaults to None.
+            created_to (Optional[datetime], optional): Creados hasta (exclusive). Defaults to None.
+
+        Returns:
+            Iterator[bytes]: Chunks del archivo exportado.
+        """
+        # Los ids de los libros se agregan en Postgres: una sola consulta para toda la tabla.
+        books = func.array(
+            select(BooksModel.id)
+            .where(BooksModel.owner_id == UsersModel.id)
+            .order_by(BooksModel.id)
+            .correlate(UsersModel)
+            .scalar_subquery(),
+            type_=ARRAY(Integer),
+        )
+        statement = select(
+            UsersModel.id,
+            UsersModel.name,
+            UsersModel.email,
+            UsersModel.image,
+            UsersModel.user_type.label('type'),
+            UsersModel.role,
+            UsersModel.created_at,
+            books.label('books'),
+        ).order_by(UsersModel.id)
+        if role:
+            statement = statement.where(UsersModel.role == role)
+        if user_type:
+            statement = statement.where(UsersModel.user_type == user_type)
+        if created_from:
+            statement = statement.where(UsersModel.created_at >= created_from)
+        if created_to:
+            statement = statement.where(UsersModel.created_at < created_to)
+        return self._stream_export(statement, export_format)
+
+    def export_books(
+        self,
+        export_format: str = 'ndjson',
+        owner_id: Optional[int] = None,
+        book_type: Optional[str] = None,
+        language: Optional[str] = None,
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None,
+    ) -> Iterator[bytes]:
+        """Exporta los libros (sin la tabla de contenidos ni los paths) ordenados por id.
+
+        Args:
+            export_format (str, optional): 'ndjson' o 'csv'. Defaults to 'ndjson'.
+            owner_id (Optional[int], optional): Filtra por dueño. Defaults to None.
+            book_type (Optional[str], optional): Filtra por tipo (epub, pdf). Defaults to None.
+            language (Optional[str], optional): Filtra por idioma. Defaults to None.
+            created_from (Optional[datetime], optional): Creados desde (inclusive). Defaults to None.
+            created_to (Optional[datetime], optional): Creados hasta (exclusive). Defaults to None.
+
+        Returns:
+            Iterator[bytes]: Chunks del archivo exportado.
+        """
+        statement = (
+            select(
+                BooksModel.id,
+                BooksModel.title,
+                BooksModel.author,
+                BooksModel.contributor,
+                BooksModel.category,
+                BooksModel.publish_date,
+                BooksModel.publisher,
+                BooksModel.language,
+                BooksModel.book_type,
+                BooksModel.chapters_count,
+                BooksModel.owner_id,
+                UsersModel.email.label('owner_email'),
+                BooksModel.created_at,
+            )
+            .outerjoin(UsersModel, UsersModel.id == BooksModel.owner_id)
+            .order_by(BooksModel.id)
+        )
+        if owner_id is not None:
+            statement = statement.where(BooksModel.owner_id == owner_id)
+        if book_type:
+            statement = statement.where(BooksModel.book_type == book_type)
+        if language:
+            statement = statement.where(BooksModel.language == language)
+        if created_from:
+            statement = statement.where(BooksModel.created_at >= created_from)
+        if created_to:
+            statement = statement.where(BooksModel.created_at < created_to)
+        return self._stream_export(statement, export_format)
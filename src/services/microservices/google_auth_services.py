@@ -0,0 +1,154 @@
+import asyncio
+import base64
+import json
+import logging
+import os
+import re
+import time
+from typing import Optional
+
+import anyio.to_thread
+
+logger = logging.getLogger(__name__)
+
+GOOGLE_ISSUERS = ('accounts.google.com', 'https://accounts.google.com')
+_MAX_AGE_RE = re.compile(r'(?:^|,)\s*max-age\s*=\s*"?(\d+)"?', re.IGNORECASE)
+
+def cache_seconds(headers) -> Optional[float]:
+    """Segundos que se puede cachear una respuesta según Cache-Control (menos Age).
+
+    Returns:
+        Optional[float]: Devuelve None si no dice nada (o no se puede cachear).
+    """
+    cache_control = headers.get('cache-control', '')
+    if any(directive in cache_control.lower() for directive in ('no-store', 'no-cache')):
+        return None
+    match = _MAX_AGE_RE.search(cache_control)
+    if match is None:
+        return None
+    try:
+        age = float(headers.get('age', '0'))
+    except ValueError:
+        age = 0.0
+    return max(0.0, int(match.group(1)) - age)
+
+def token_key_id(token: str) -> Optional[str]:
+    """kid del header de un JWT (sin verificarlo)."""
+    try:
+        header = token.split('.', 1)[0]
+        return json.loads(base64.urlsafe_b64decode(header + '=' * (-len(header) % 4))).get('kid')
+    except (ValueError, AttributeError):
+        return None
+
+class GoogleAuthServices:
+    def __init__(self) -> None:
+        """Login con Google: canje del código por tokens y verificación del id_token.
+
+        Las peticiones a Google van por un cliente httpx compartido (conexiones reutilizadas),
+        y los certificados con los que Google firma los id_token se cachean el tiempo que
+        indica su Cache-Control, así un login no los vuelve a descargar. La verificación de
+        la firma corre fuera del event loop.
+        """
+        super().__init__()
+        self.google_client_id: Optional[str] = os.getenv('GOOGLE_CLIENT_ID')
+        self.google_secret_key: Optional[str] = os.getenv('GOOGLE_SECRET_KEY')
+        self.google_redirect_uri: str = os.getenv('GOOGLE_REDIRECT_CALLBACK_URI', 'http://localhost:3030/users/auth/google/callback')
+        self.google_token_url: str = os.getenv('GOOGLE_TOKEN_URL', 'https://oauth2.googleapis.com/token')
+        self.google_certs_url: str = os.getenv('GOOGLE_CERTS_URL', 'https://www.googleapis.com/oauth2/v1/certs')
+        self.google_http_timeout: float = float(os.getenv('GOOGLE_HTTP_TIMEOUT', '10'))
+        # Si la respuesta de los certificados no trae max-age, se cachean este tiempo.
+        self.google_certs_default_ttl: float = float(os.getenv('GOOGLE_CERTS_DEFAULT_TTL', '300'))
+        self._google_client = None
+        self._google_certs: Optional[dict[str, str]] = None
+        self._google_certs_expires_at: float = 0.0
+        self._google_certs_fetched_at: float = 0.0
+        self._google_certs_lock: Optional[asyncio.Lock] = None
+
+    def google_http_client(self):
+        """Cliente httpx compartido del worker (se crea con el primer login)."""
+        if self._google_client is None:
+            # httpx se importa recién cuando alguien inicia sesión con Google.
+            import httpx
+            self._google_client = httpx.AsyncClient(
+                timeout=self.google_http_timeout,
+                limits=httpx.Limits(max_connections=20, max_keepalive_connections=20),
+            )
+        return self._google_client
+
+    async def close_google_http_client(self) -> None:
+        if self._google_client is not None:
+            await self._google_client.aclose()
+            self._google_client = None
+
+    async def exchange_google_code(self, code: str) -> dict:
+        """Canjea el código de autorización por los tokens de Google.
+
+        Args:
+            code (str): Código que Google manda al callback.
+
+        Returns:
+            dict: Devuelve la respuesta del endpoint de tokens (id_token, access_token, ...).
+        """
+        response = await self.google_http_client().post(self.google_token_url, data={
+            'code': code,
+            'client_id': self.google_client_id,
+            'client_secret': self.google_secret_key,
+            'redirect_uri': self.google_redirect_uri,
+            'grant_type': 'authorization_code',
+        })
+        response.raise_for_status()
+        return response.json()
+
+    async def google_certs(self, key_id: Optional[str] = None) -> dict[str, str]:
+        """Certificados de Google ({kid: PEM}), cacheados según su Cache-Control.
+
+        Una sola petición los descarga aunque lleguen muchos logins a la vez. Si el token
+        trae un kid que no está en la caché (Google rotó las claves) se vuelven a pedir,
+        a lo sumo una vez por minuto; si Google no responde, se usan los que había.
+
+        Args:
+            key_id (Optional[str], optional): kid del token a verificar. Defaults to None.
+        """
+        if self._google_certs_lock is None:
+            self._google_certs_lock = asyncio.Lock()
+        async with self._google_certs_lock:
+            now = time.monotonic()
+            fresh = self._google_certs is not None and now < self._google_certs_expires_at
+            rotated = key_id is not None and self._google_certs is not None and key_id not in self._google_certs
+            if fresh and not (rotated and now - self._google_certs_fetched_at >= 60):
+                return self._google_certs
+            try:
+                response = await self.google_http_client().get(self.google_certs_url)
+                response.raise_for_status()
+                certs = response.json()
+            except Exception as error:
+                if self._google_certs is None:
+                    raise
+                logger.warning('Google certs refresh failed, using cached ones: %s: %s', type(error).__name__, error)
+                return self._google_certs
+            ttl = cache_seconds(response.headers)
+            self._google_certs = certs
+            self._google_certs_fetched_at = now
+            self._google_certs_expires_at = now + (self.google_certs_default_ttl if ttl is None else ttl)
+            return certs
+
+    async def verify_google_id_token(self, token: str) -> dict:
+        """Verifica la firma, la audiencia, el emisor y la vigencia de un id_token de Google.
+
+        Args:
+            token (str): id_token devuelto por el endpoint de tokens.
+
+        Returns:
+            dict: Devuelve los claims del token.
+
+        Raises:
+            ValueError: Si el token no es válido.
+        """
+        # Igual que google.oauth2.id_token.verify_oauth2_token, pero con los certificados de la caché.
+        from google.auth import jwt
+
+        certs = await self.google_certs(token_key_id(token))
+        id_info = await anyio.to_thread.run_sync(lambda: jwt.decode(token, certs=certs, audience=self.google_client_id))
+        if id_info.get('iss') not in GOOGLE_ISSUERS:
+            raise ValueError(f"Wrong issuer. 'iss' should be one of the following: {GOOGLE_ISSUERS}")
+        return id_info
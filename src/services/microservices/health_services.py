@@ -0,0 +1,98 @@
+import io
+import os
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Callable, Optional
+
+from sqlalchemy import Engine, text
+
+from src.storage.storage_backend import StorageBackend
+
+class HealthServices:
+    def __init__(self) -> None:
+        """Chequeos de readiness (base de datos, almacén de contenido y cola de ingestas).
+
+        Los resultados se cachean READINESS_CACHE_SECONDS y cada chequeo tiene un timeout
+        (READINESS_CHECK_TIMEOUT): un balanceador que consulta seguido no genera carga, y
+        una dependencia colgada no deja colgado al endpoint.
+        """
+        super().__init__()
+        self.engine: Engine = self.engine
+        self.readiness_cache_seconds: float = float(os.getenv('READINESS_CACHE_SECONDS', '2'))
+        self.readiness_check_timeout: float = float(os.getenv('READINESS_CHECK_TIMEOUT', '2'))
+        # Ingestas en curso a partir de las cuales el worker deja de estar listo (0 no lo limita).
+        self.readiness_max_ingests: int = int(os.getenv('READINESS_MAX_INGESTS', os.getenv('INGEST_MAX_CONCURRENT', '4')))
+        self._readiness: Optional[tuple[float, bool, dict]] = None
+        self._readiness_lock = threading.Lock()
+        self._health_pool: Optional[ThreadPoolExecutor] = None
+        self._health_probe_key = f'content/health/{socket.gethostname()}-{os.getpid()}'
+
+    def _check_database(self) -> dict:
+        with self.engine.connect() as connection:
+            connection.execute(text('SELECT 1'))
+        pool = self.engine.pool
+        return {'pool_size': pool.size(), 'checked_out': pool.checkedout()} if hasattr(pool, 'checkedout') else {}
+
+    def _check_storage(self) -> dict:
+        storage: StorageBackend = self.storage
+        storage.save(self._health_probe_key, io.BytesIO(b'ok'))
+        if storage.read_bytes(self._health_probe_key) != b'ok':
+            raise OSError('storage probe read back different content')
+        storage.delete_prefix(self._health_probe_key)
+        return {}
+
+    def _check_ingests(self) -> dict:
+        in_flight = self.ingests_in_flight
+        if self.readiness_max_ingests and in_flight >= self.readiness_max_ingests:
+            raise RuntimeError(f'{in_flight} ingests in flight')
+        return {'in_flight': in_flight}
+
+    @staticmethod
+    def _timed_check(check: Callable[[], dict]) -> dict:
+        started = time.perf_counter()
+        try:
+            result = {'ok': True, **check()}
+        except Exception as error:
+            result = {'ok': False, 'error': f'{type(error).__name__}: {error}'}
+        result['ms'] = round((time.perf_counter() - started) * 1000, 2)
+        return result
+
+    def readiness(self) -> tuple[bool, dict]:
+        """Devuelve si el worker está listo para recibir tráfico, con el detalle de cada chequeo.
+
+        Si otro hilo ya está chequeando, se devuelve el último resultado en lugar de esperar.
+
+        Returns:
+            tuple[bool, dict]: Devuelve (listo, {chequeo: resultado}).
+        """
+        cached = self._readiness
+        if cached is not None and time.monotonic() - cached[0] < self.readiness_cache_seconds:
+            return cached[1], cached[2]
+        if not self._readiness_lock.acquire(blocking=cached is None):
+            return cached[1], cached[2]
+        try:
+            if self._health_pool is None:
+                # Pool propio: un chequeo colgado no ocupa hilos del threadpool de las rutas.
+                self._health_pool = ThreadPoolExecutor(max_workers=6, thread_name_prefix='health')
+            futures = {
+                name: self._health_pool.submit(self._timed_check, check)
+                for name, check in (('database', self._check_database), ('storage', self._check_storage), ('ingests', self._check_ingests))
+            }
+            deadline = time.monotonic() + self.readiness_check_timeout
+            checks = {}
+            for name, future in futures.items():
+                try:
+                    checks[name] = future.result(timeout=max(0.0, deadline - time.monotonic()))
+                except FutureTimeoutError:
+                    checks[name] = {'ok': False, 'error': 'timeout'}
+            ready = all(check['ok'] for check in checks.values())
+            self._readiness = (time.monotonic(), ready, checks)
+            return ready, checks
+        finally:
+            self._readiness_lock.release()
+
+    def shutdown_health_pool(self) -> None:
+        if self._health_pool is not None:
+            self._health_pool.shutdown(wait=False, cancel_futures=True)
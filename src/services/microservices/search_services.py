@@ -1,8 +1,11 @@
 import os
-from google import genai
 from dotenv import load_dotenv
-from google.genai import types
-from typing import TypedDict
+from typing import TYPE_CHECKING, TypedDict
+
+if TYPE_CHECKING:
+    # google.genai es pesado de importar: sólo se carga la primera vez que se busca algo.
+    from google import genai
+    from google.genai import types
 
 class SearchType(TypedDict):
     raw_text: str
@@ -15,19 +18,21 @@ class SearchServices:
         """
         load_dotenv()
 
-    def gemini_client(self) -> genai.Client:
+    def gemini_client(self) -> 'genai.Client':
         """Create a Gemini client.
 
         Returns:
             dict: Return the Gemini client.
         """
+        from google import genai
         gemini_api_key = os.getenv('GOOGLE_GEMINI_API_KEY', '')
         _gemini_client_ = genai.Client(api_key=gemini_api_key)
         return _gemini_client_
 
-    def setup_gemini_grounded(self) -> types.GenerationConfig:
+    def setup_gemini_grounded(self) -> 'types.GenerateContentConfig':
         """Configura la solicitud para Gemini Grounded Search.
         """
+        from google.genai import types
         # We define the grounding type.
         grounding_type = types.Tool(
             google_search=types.GoogleSearch()
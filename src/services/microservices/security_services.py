@@ -1,15 +1,80 @@
-from typing import Optional, Union
-from fastapi import Depends
-from fastapi.security import OAuth2PasswordBearer
-from typing import Annotated
+import asyncio
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from functools import lru_cache
+from typing import Callable, List, Optional, Tuple
 
-from passlib.hash import pbkdf2_sha256
+from passlib.context import CryptContext
+
+# ======================== POOL DE HASHING ========================
+# El hashing de passwords es CPU puro: lo sacamos del threadpool compartido
+# de FastAPI a un pool de procesos propio y acotado, así una ráfaga de logins
+# no deja sin threads a las lecturas de capítulos.
+_password_pool: Optional[ProcessPoolExecutor] = None
+_password_pool_lock = threading.Lock()
+_password_pending: Optional[threading.BoundedSemaphore] = None
+
+class PasswordPoolBusy(Exception):
+    """El pool de hashing tiene la cola llena (PASSWORD_HASH_MAX_PENDING). La API lo responde
+    como 503 con Retry-After.
+    """
+    retry_after: int = 1
+
+def _hash_rounds() -> int:
+    return int(os.getenv('PASSWORD_HASH_ROUNDS', '29000'))
+
+@lru_cache(maxsize=None)
+def _password_context(rounds: int) -> CryptContext:
+    # min == max == default: cualquier hash con otros parámetros se marca para rehash.
+    return CryptContext(
+        schemes=['pbkdf2_sha256'],
+        pbkdf2_sha256__default_rounds=rounds,
+        pbkdf2_sha256__min_rounds=rounds,
+        pbkdf2_sha256__max_rounds=rounds,
+    )
+
+def _hash(password: str, rounds: int) -> str:
+    return _password_context(rounds).hash(password)
+
+def _verify_and_update(plain_password: str, hashed_password: Optional[str], rounds: int) -> Tuple[bool, Optional[str]]:
+    if not hashed_password:
+        return False, None # Usuarios de OAuth, sin password.
+    try:
+        return _password_context(rounds).verify_and_update(plain_password, hashed_password)
+    except (ValueError, TypeError):
+        return False, None
+
+def _submit(fn: Callable, *args, wait: bool = False) -> Future:
+    global _password_pool, _password_pending
+    with _password_pool_lock:
+        if _password_pool is None:
+            workers = int(os.getenv('PASSWORD_HASH_WORKERS', str(max(1, min(4, (os.cpu_count() or 2) // 2)))))
+            # forkserver: hacer fork de un servidor con varios hilos puede copiar locks tomados
+            # (logging, pool de SQLAlchemy) y dejar colgados a los procesos hijos. El servidor
+            # precarga este módulo; como con spawn, los hijos importan el script principal, que
+            # tiene que estar protegido con if __name__ == '__main__' (main.py lo está).
+            context = multiprocessing.get_context('forkserver')
+            context.set_forkserver_preload([__name__])
+            _password_pool = ProcessPoolExecutor(max_workers=workers, mp_context=context)
+            _password_pending = threading.BoundedSemaphore(int(os.getenv('PASSWORD_HASH_MAX_PENDING', '64')))
+        pool, pending = _password_pool, _password_pending
+
+    # Si la cola está llena respondemos rápido en lugar de acumular trabajo (salvo los
+    # lotes, que esperan su lugar).
+    if not pending.acquire(blocking=wait):
+        raise PasswordPoolBusy()
+    future = pool.submit(fn, *args)
+    future.add_done_callback(lambda _: pending.release())
+    return future
+# =================================================================
 
 class SecurityServices:
     def __init__(self) -> None:
         """Servicios proporcionados para facilitar las operaciones de seguirdad.
         """
-    
+
     @staticmethod
     def hash_password(password: str) -> str:
         """Hashea una password y devuelve su hash.
@@ -19,9 +84,27 @@ class SecurityServices:
 
         Returns:
             str: Devuelve el Hash.
-        """        
-        return pbkdf2_sha256.hash(password)
-    
+
+        Raises:
+            PasswordPoolBusy: Si el pool de hashing está saturado.
+        """
+        return _submit(_hash, password, _hash_rounds()).result()
+
+    @staticmethod
+    def hash_passwords(passwords: List[str]) -> List[str]:
+        """Hashea varias passwords en paralelo dentro del pool de hashing. Es para los lotes
+        (seed de admins): espera lugar en la cola en vez de fallar si está llena.
+
+        Args:
+            passwords (List[str]): Passwords a hashear.
+
+        Returns:
+            List[str]: Devuelve los hashes en el mismo orden.
+        """
+        rounds = _hash_rounds()
+        futures = [_submit(_hash, password, rounds, wait=True) for password in passwords]
+        return [future.result() for future in futures]
+
     @staticmethod
     def verify_password(plain_password: str, hashed_password: str) -> bool:
         """Verifica si una password en texto plano coincide con su hash.
@@ -32,5 +115,28 @@ class SecurityServices:
 
         Returns:
             bool: Devuelve True si coinciden, False en caso contrario.
-        """        
-        return pbkdf2_sha256.verify(plain_password, hashed_password)
\ No newline at end of file
+        """
+        return _submit(_verify_and_update, plain_password, hashed_password, _hash_rounds()).result()[0]
+
+    @staticmethod
+    async def verify_and_update_password(plain_password: str, hashed_password: Optional[str]) -> Tuple[bool, Optional[str]]:
+        """Verifica una password sin bloquear el event loop y, si el hash fue creado con
+        otros parámetros (PASSWORD_HASH_ROUNDS), devuelve también el hash nuevo.
+
+        Args:
+            plain_password (str): Password en texto plano.
+            hashed_password (Optional[str]): Hash guardado del usuario.
+
+        Returns:
+            Tuple[bool, Optional[str]]: (es válida, hash nuevo o None si no hace falta rehashear).
+        """
+        future = _submit(_verify_and_update, plain_password, hashed_password, _hash_rounds())
+        return await asyncio.wrap_future(future)
+
+    @staticmethod
+    def shutdown_password_pool() -> None:
+        global _password_pool
+        with _password_pool_lock:
+            if _password_pool is not None:
+                _password_pool.shutdown(wait=False, cancel_futures=True)
+                _password_pool = None
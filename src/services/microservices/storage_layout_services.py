@@ -0,0 +1,192 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import PurePosixPath
+from typing import Optional
+
+from sqlalchemy import Engine, not_, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session, undefer
+
+from src.models.books_model import BooksModel
+from src.models.chapters_model import ChaptersModel
+from src.models.storage_migrations_model import StorageMigrationsModel
+from src.storage.book_layout import BOOKS_ROOT, book_prefix, is_sharded, rebase_path
+from src.storage.local_storage import LocalStorage
+
+# Mismo criterio que book_layout.is_sharded, para filtrar en la base de datos.
+SHARDED_PATTERN = r'^content/books/[0-9a-f]{2}/[0-9a-f]{2}/[^/]+$'
+
+class StorageLayoutServices:
+    def __init__(self) -> None:
+        """Migración en línea de los libros al layout particionado por hash (ver book_layout).
+
+        Cada libro se copia al prefijo nuevo, sus paths se reescriben en una transacción y
+        el prefijo viejo se borra después de un margen, así la API sigue sirviendo el libro
+        durante toda la migración. El journal storage_migrations permite retomarla.
+        """
+        super().__init__()
+        self.engine: Engine = self.engine
+
+    @staticmethod
+    def _journal_storage_migration(session: Session, book_id: int, old_prefix: str, new_prefix: str, state: str) -> None:
+        session.execute(
+            insert(StorageMigrationsModel)
+            .values(book_id=book_id, old_prefix=old_prefix, new_prefix=new_prefix, state=state)
+            .on_conflict_do_update(
+                index_elements=[StorageMigrationsModel.book_id],
+                set_={'old_prefix': old_prefix, 'new_prefix': new_prefix, 'state': state},
+            )
+        )
+
+    @staticmethod
+    def _rebase_book_paths(session: Session, book: BooksModel, old_prefix: str, new_prefix: str) -> None:
+        for column in ('main_folder_path', 'original_file_path', 'cover_path', 'opf_path', 'metadata_path', 'toc_path'):
+            setattr(book, column, rebase_path(getattr(book, column), old_prefix, new_prefix))
+        if book.book_content:
+            book.book_content = [rebase_path(path, old_prefix, new_prefix) for path in book.book_content]
+        if book.toc_content:
+            book.toc_content = {title: rebase_path(target, old_prefix, new_prefix) for title, target in book.toc_content.items()}
+        for chapter in session.scalars(select(ChaptersModel).where(ChaptersModel.book_id == book.id)):
+            chapter.path = rebase_path(chapter.path, old_prefix, new_prefix)
+            chapter.reader_path = rebase_path(chapter.reader_path, old_prefix, new_prefix)
+            if chapter.fragments:
+                chapter.fragments = [{**fragment, 'path': rebase_path(fragment['path'], old_prefix, new_prefix)} for fragment in chapter.fragments]
+
+    def migrate_book_storage(self, book_id: int) -> Optional[str]:
+        """Copia un libro al layout particionado y reescribe sus paths (libro, capítulos,
+        fragmentos y tabla de contenidos). No borra el prefijo viejo.
+
+        Args:
+            book_id (int): ID del libro.
+
+        Returns:
+            Optional[str]: Devuelve el prefijo viejo (a borrar), o None si no había nada que migrar.
+        """
+        with Session(self.engine) as session:
+            old_prefix = session.scalar(select(BooksModel.main_folder_path).where(BooksModel.id == book_id))
+        if old_prefix is None or is_sharded(old_prefix):
+            return None
+        new_prefix = str(book_prefix(PurePosixPath(old_prefix).name))
+
+        with Session(self.engine) as session, session.begin():
+            self._journal_storage_migration(session, book_id, old_prefix, new_prefix, 'copying')
+        self.storage.copy_prefix(old_prefix, new_prefix)
+
+        with Session(self.engine) as session, session.begin():
+            book = session.scalars(
+                select(BooksModel)
+                .where(BooksModel.id == book_id, BooksModel.main_folder_path == old_prefix)
+                .options(undefer(BooksModel.book_content))
+                .with_for_update()
+            ).first()
+            if book is not None:
+                self._rebase_book_paths(session, book, old_prefix, new_prefix)
+                self._journal_storage_migration(session, book_id, old_prefix, new_prefix, 'copied')
+                return old_prefix
+            # Se borró (o lo migró otro proceso) mientras copiábamos: la copia sobra, salvo que
+            # algún libro ya apunte a ella.
+            in_use = session.scalar(select(BooksModel.id).where(BooksModel.main_folder_path == new_prefix))
+            self._journal_storage_migration(session, book_id, old_prefix, new_prefix, 'done')
+        if in_use is None:
+            self.storage.delete_prefix(new_prefix)
+        return None
+
+    def _finish_storage_migration(self, book_id: int, old_prefix: str) -> None:
+        self.storage.delete_prefix(old_prefix)
+        with Session(self.engine) as session, session.begin():
+            session.get(StorageMigrationsModel, book_id).state = 'done'
+
+    def resume_storage_migrations(self) -> int:
+        """Termina lo que dejó pendiente una migración cortada: borra los prefijos viejos de
+        los libros ya reescritos y las copias huérfanas de libros que ya no existen. Los libros
+        que quedaron a medio copiar se vuelven a migrar desde cero.
+
+        Returns:
+            int: Devuelve la cantidad de entradas del journal terminadas.
+        """
+        with Session(self.engine) as session:
+            pending = session.execute(
+                select(StorageMigrationsModel.book_id, StorageMigrationsModel.old_prefix,
+                       StorageMigrationsModel.new_prefix, StorageMigrationsModel.state, BooksModel.id.label('exists'))
+                .outerjoin(BooksModel, BooksModel.id == StorageMigrationsModel.book_id)
+                .where(StorageMigrationsModel.state != 'done')
+            ).all()
+        finished = 0
+        for row in pending:
+            if row.state == 'copied':
+                self._finish_storage_migration(row.book_id, row.old_prefix)
+            elif row.exists is None:
+                self._finish_storage_migration(row.book_id, row.new_prefix)
+            else:
+                continue
+            finished += 1
+        return finished
+
+    def _prune_legacy_book_folders(self) -> int:
+        """Borra las carpetas por usuario del layout viejo que quedaron vacías (sólo almacén local)."""
+        if not isinstance(self.storage, LocalStorage):
+            return 0
+        pruned = 0
+        root = self.storage.path(BOOKS_ROOT)
+        for folder in root.iterdir() if root.is_dir() else []:
+            if folder.is_dir() and not (len(folder.name) == 2 and all(c in '0123456789abcdef' for c in folder.name)):
+                try:
+                    folder.rmdir()
+                    pruned += 1
+                except OSError:
+                    pass  # Todavía tiene libros sin migrar.
+        return pruned
+
+    def migrate_storage_layout(self, workers: int = 4, batch_size: int = 100, grace_seconds: float = 5.0, limit: Optional[int] = None) -> dict:
+        """Migra los libros del layout viejo al particionado, por lotes y en paralelo. Se puede
+        cortar y volver a correr: retoma desde el journal y sólo procesa lo que falta.
+
+        Args:
+            workers (int, optional): Libros que se migran a la vez. Defaults to 4.
+            batch_size (int, optional): Libros por lote. Defaults to 100.
+            grace_seconds (float, optional): Espera antes de borrar los prefijos viejos de cada
+                lote, para las peticiones que ya habían leído los paths anteriores. Defaults to 5.0.
+            limit (Optional[int], optional): Máximo de libros a migrar en esta corrida. Defaults to None.
+
+        Returns:
+            dict: Devuelve los contadores de la corrida.
+        """
+        stats = {'resumed': self.resume_storage_migrations(), 'migrated': 0, 'skipped': 0, 'failed': 0}
+        last_id = 0
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='storage-migration') as executor:
+            while limit is None or stats['migrated'] < limit:
+                size = batch_size if limit is None else min(batch_size, limit - stats['migrated'])
+                with Session(self.engine) as session:
+                    book_ids = session.scalars(
+                        select(BooksModel.id)
+                        .where(BooksModel.id > last_id, not_(BooksModel.main_folder_path.regexp_match(SHARDED_PATTERN)))
+                        .order_by(BooksModel.id)
+                        .limit(size)
+                    ).all()
+                if not book_ids:
+                    break
+                last_id = book_ids[-1]
+
+                futures = {executor.submit(self.migrate_book_storage, book_id): book_id for book_id in book_ids}
+                moved = []
+                for future in as_completed(futures):
+                    try:
+                        old_prefix = future.result()
+                    except Exception as error:
+                        # Queda en el layout viejo (y en el journal): la próxima corrida lo reintenta.
+                        stats['failed'] += 1
+                        print(f'[MIGRATE-STORAGE] book {futures[future]} failed: {type(error).__name__}: {error}')
+                        continue
+                    if old_prefix is None:
+                        stats['skipped'] += 1
+                    else:
+                        moved.append((futures[future], old_prefix))
+
+                if moved:
+                    time.sleep(grace_seconds)
+                    for book_id, old_prefix in moved:
+                        self._finish_storage_migration(book_id, old_prefix)
+                stats['migrated'] += len(moved)
+                print(f'[MIGRATE-STORAGE] up to book {last_id}: {stats}')
+        stats['pruned_folders'] = self._prune_legacy_book_folders()
+        return stats
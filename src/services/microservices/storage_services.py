@@ -0,0 +1,158 @@
+import os
+from pathlib import Path
+from typing import Optional
+from urllib.parse import quote
+from dotenv import load_dotenv
+from fastapi.responses import FileResponse, Response, StreamingResponse
+
+from src.storage.storage_backend import StorageBackend, StorageKey
+from src.storage.local_storage import LocalStorage
+from src.storage.storage_cache import StorageCache
+from src.utils.metrics.prometheus_metrics import FILES_SERVED
+
+class StorageServices:
+    def __init__(self) -> None:
+        """Acceso al almacén de contenido de los libros (local o compatible con S3).
+        """
+        super().__init__()
+        load_dotenv()
+        self.storage: StorageBackend = self.create_storage()
+
+        # Modo de descarga de archivos en el proxy inverso ('none', 'x-accel-redirect' o 'x-sendfile').
+        self.file_offload_mode: str = os.getenv('FILE_OFFLOAD_MODE', 'none').strip().lower()
+        self.file_offload_prefix: str = os.getenv('FILE_OFFLOAD_PREFIX', '/_protected/')
+        if self.file_offload_mode not in ('none', 'x-accel-redirect', 'x-sendfile'):
+            raise ValueError(f"Unknown FILE_OFFLOAD_MODE '{self.file_offload_mode}'")
+
+    @staticmethod
+    def create_storage() -> StorageBackend:
+        """Crea el backend de almacenamiento configurado en STORAGE_BACKEND ('local' o 's3').
+
+        Returns:
+            StorageBackend: Devuelve el backend de almacenamiento.
+        """
+        backend = os.getenv('STORAGE_BACKEND', 'local').strip().lower()
+        if backend == 'local':
+            return LocalStorage(os.getenv('STORAGE_LOCAL_ROOT', '.'))
+        if backend == 's3':
+            from src.storage.s3_storage import S3Storage
+            cache = StorageCache(
+                cache_dir=os.getenv('STORAGE_CACHE_DIR', './content/cache'),
+                max_bytes=int(os.getenv('STORAGE_CACHE_MAX_MB', '256')) * 1024 * 1024,
+                max_object_bytes=int(os.getenv('STORAGE_CACHE_MAX_OBJECT_MB', '4')) * 1024 * 1024,
+            )
+            return S3Storage(
+                bucket=os.getenv('S3_BUCKET', 'skoob'),
+                endpoint_url=os.getenv('S3_ENDPOINT_URL') or None,
+                region=os.getenv('S3_REGION') or None,
+                access_key_id=os.getenv('S3_ACCESS_KEY_ID') or None,
+                secret_access_key=os.getenv('S3_SECRET_ACCESS_KEY') or None,
+                multipart_threshold=int(os.getenv('S3_MULTIPART_THRESHOLD_MB', '8')) * 1024 * 1024,
+                multipart_chunksize=int(os.getenv('S3_MULTIPART_CHUNKSIZE_MB', '8')) * 1024 * 1024,
+                cache=cache,
+            )
+        raise ValueError(f"Unknown STORAGE_BACKEND '{backend}'")
+
+    def offload_response(self, key: StorageKey, media_type: Optional[str] = None, static: bool = False) -> Optional[Response]:
+        """Delega el envío del archivo al proxy inverso (nginx con X-Accel-Redirect o
+        Apache/lighttpd con X-Sendfile). La autorización ya se hizo en la ruta, el proxy
+        sólo sirve los bytes con sendfile.
+
+        Args:
+            key (StorageKey): Key del objeto (o path local si es estático).
+            media_type (Optional[str], optional): Mimetype de la respuesta. Defaults to None.
+            static (bool, optional): Si el archivo es un recurso local de la API y no del almacén. Defaults to False.
+
+        Returns:
+            Optional[Response]: La respuesta vacía con la cabecera correspondiente, o None si no se puede delegar.
+        """
+        if self.file_offload_mode == 'x-accel-redirect':
+            location = f"{self.file_offload_prefix.rstrip('/')}/{quote(StorageBackend.normalize_key(key))}"
+            return Response(media_type=media_type, headers={'X-Accel-Redirect': location})
+
+        if self.file_offload_mode == 'x-sendfile':
+            # X-Sendfile necesita un path absoluto en el disco que ve el proxy.
+            if static:
+                local_path = Path(key)
+            elif isinstance(self.storage, LocalStorage):
+                local_path = self.storage.local_path(key)
+            else:
+                local_path = None
+            if local_path is not None:
+                return Response(media_type=media_type, headers={'X-Sendfile': str(local_path.resolve())})
+        return None
+
+    def file_response(self, key: StorageKey, media_type: Optional[str] = None, static: bool = False, range_header: Optional[str] = None) -> Response:
+        """Sirve un objeto del almacén. Si está configurado, el envío se delega al proxy
+        inverso; si hay una copia local (backend local o caché) se usa FileResponse, y si
+        no se transmite en streaming desde el almacén.
+
+        Las peticiones con Range las resuelven el proxy o FileResponse; en el streaming
+        desde el almacén se soporta un único rango (range_header).
+
+        Args:
+            key (StorageKey): Key del objeto a servir.
+            media_type (Optional[str], optional): Mimetype de la respuesta. Defaults to None.
+            static (bool, optional): Si el archivo es un recurso local de la API y no del almacén. Defaults to False.
+            range_header (Optional[str], optional): Cabecera Range de la petición. Defaults to None.
+
+        Returns:
+            Response: Devuelve la respuesta con el contenido del archivo.
+        """
+        offloaded = self.offload_response(key, media_type=media_type, static=static)
+        if offloaded is not None:
+            FILES_SERVED.labels('offload').inc()
+            return offloaded
+        if static:
+            FILES_SERVED.labels('file').inc()
+            return FileResponse(path=key, media_type=media_type)
+
+        local_path = self.storage.local_path(key)
+        if local_path is not None:
+            FILES_SERVED.labels('file').inc()
+            return FileResponse(path=local_path, media_type=media_type)
+        FILES_SERVED.labels('stream').inc()
+        size = self.storage.size(key)
+        byte_range = self.parse_range(range_header, size) if range_header else None
+        if byte_range == (None, None):
+            return Response(status_code=416, headers={'Content-Range': f'bytes */{size}'})
+        if byte_range is not None:
+            start, end = byte_range
+            return StreamingResponse(
+                self.storage.iter_chunks(key, start, end),
+                status_code=206,
+                media_type=media_type,
+                headers={'Content-Length': str(end - start + 1), 'Content-Range': f'bytes {start}-{end}/{size}', 'Accept-Ranges': 'bytes'},
+            )
+        return StreamingResponse(
+            self.storage.iter_chunks(key),
+            media_type=media_type,
+            headers={'Content-Length': str(size), 'Accept-Ranges': 'bytes'},
+        )
+
+    @staticmethod
+    def parse_range(range_header: str, size: int) -> Optional[tuple[Optional[int], Optional[int]]]:
+        """Interpreta una cabecera Range de un único rango ('bytes=0-99', 'bytes=100-', 'bytes=-100').
+
+        Args:
+            range_header (str): Cabecera Range.
+            size (int): Tamaño del objeto.
+
+        Returns:
+            Optional[tuple[Optional[int], Optional[int]]]: Devuelve (inicio, fin) inclusivos, (None, None)
+            si el rango no es satisfacible, o None si la cabecera no se soporta (se envía el objeto entero).
+        """
+        unit, _, ranges = range_header.partition('=')
+        if unit.strip().lower() != 'bytes' or ',' in ranges:
+            return None
+        first, _, last = ranges.strip().partition('-')
+        try:
+            if not first:
+                start, end = max(0, size - int(last)), size - 1
+            else:
+                start, end = int(first), min(int(last), size - 1) if last else size - 1
+        except ValueError:
+            return None
+        if start > end or start >= size:
+            return (None, None)
+        return start, end
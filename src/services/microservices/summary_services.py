@@ -0,0 +1,313 @@
+import datetime
+import hashlib
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from typing import Optional
+
+from sqlalchemy import Engine, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from src.models.books_model import BooksModel
+from src.models.chapters_model import ChaptersModel
+from src.models.summaries_model import SummariesModel, SummaryJobsModel
+from src.utils.summary.summarizer import (
+    PROMPT_VERSION, FakeSummaryModel, GeminiSummaryModel, SummaryModel, html_to_text, reduce_summaries, summarize_text,
+)
+
+@dataclass(frozen=True)
+class SummaryUnit:
+    """Parte del libro que se resume por separado: un capítulo, o un grupo de páginas de un PDF."""
+    content_hash: str
+    chapter_numbers: tuple[int, ...]
+    # (path, text_offset, byte_size) de cada capítulo; text_offset sólo en PDFs.
+    sources: tuple[tuple[str, Optional[int], Optional[int]], ...]
+
+class SummaryServices:
+    def __init__(self) -> None:
+        """Resúmenes de libros (map-reduce sobre los capítulos) en segundo plano.
+
+        Los resúmenes de cada capítulo se cachean por el hash de su contenido, así que
+        repetir un resumen o pedir el de un capítulo ya resumido no llama al modelo.
+        """
+        super().__init__()
+        self.engine: Engine = self.engine
+        self.summary_model_name: str = os.getenv('SUMMARY_MODEL', 'gemini-2.5-flash-lite')
+        # Llamadas simultáneas al modelo por worker (entre todos los trabajos).
+        self.summary_max_concurrent: int = int(os.getenv('SUMMARY_MAX_CONCURRENT', '4'))
+        self.summary_job_workers: int = int(os.getenv('SUMMARY_JOB_WORKERS', '2'))
+        # Caracteres máximos por pedido al modelo.
+        self.summary_chunk_chars: int = int(os.getenv('SUMMARY_CHUNK_CHARS', '48000'))
+        # Un trabajo sin progreso por más de esto se considera muerto (p. ej. el worker se reinició).
+        self.summary_job_stale_seconds: float = float(os.getenv('SUMMARY_JOB_STALE_SECONDS', '600'))
+        self._summary_model: Optional[SummaryModel] = None
+        self._summary_pools: Optional[tuple[ThreadPoolExecutor, ThreadPoolExecutor]] = None
+        self._summary_lock = threading.Lock()
+
+    def summary_model(self) -> SummaryModel:
+        if self._summary_model is None:
+            if self.summary_model_name == 'fake':
+                self._summary_model = FakeSummaryModel(delay=float(os.getenv('SUMMARY_FAKE_DELAY', '0')))
+            else:
+                self._summary_model = GeminiSummaryModel(self.gemini_client, self.summary_model_name)
+        return self._summary_model
+
+    def summary_pools(self) -> tuple[ThreadPoolExecutor, ThreadPoolExecutor]:
+        """Pools de trabajos y de llamadas al modelo. Son distintos: un trabajo espera a sus
+        capítulos sin ocupar los hilos que los resumen.
+        """
+        with self._summary_lock:
+            if self._summary_pools is None:
+                self._summary_pools = (
+                    ThreadPoolExecutor(max_workers=self.summary_job_workers, thread_name_prefix='summary-job'),
+                    ThreadPoolExecutor(max_workers=self.summary_max_concurrent, thread_name_prefix='summary-map'),
+                )
+            return self._summary_pools
+
+    def shutdown_summary_pools(self) -> None:
+        if self._summary_pools is not None:
+            for pool in self._summary_pools:
+                pool.shutdown(wait=False, cancel_futures=True)
+
+    def _summary_key(self, kind: str, content_hash: str) -> str:
+        return hashlib.sha256(f'{PROMPT_VERSION}:{self.summary_model().name}:{kind}:{content_hash}'.encode()).hexdigest()
+
+    def _cached_summary(self, cache_key: str) -> Optional[SummariesModel]:
+        with Session(self.engine) as session:
+            return session.get(SummariesModel, cache_key)
+
+    def _store_summary(self, cache_key: str, kind: str, summary: str) -> None:
+        with Session(self.engine) as session, session.begin():
+            session.execute(
+                insert(SummariesModel)
+                .values(cache_key=cache_key, kind=kind, model=self.summary_model().name, summary=summary)
+                .on_conflict_do_nothing(index_elements=[SummariesModel.cache_key])
+            )
+
+    def summary_units(self, book_id: int) -> list[SummaryUnit]:
+        """Divide el libro en las unidades que se resumen por separado. Las páginas de un PDF
+        se agrupan hasta SUMMARY_CHUNK_CHARS: resumirlas de a una serían cientos de llamadas.
+        """
+        with Session(self.engine) as session:
+            rows = session.execute(
+                select(ChaptersModel.spine_index, ChaptersModel.path, ChaptersModel.content_hash,
+                       ChaptersModel.text_offset, ChaptersModel.byte_size)
+                .where(ChaptersModel.book_id == book_id)
+                .order_by(ChaptersModel.spine_index)
+            ).all()
+
+        units, group, group_bytes = [], [], 0
+        def close_group() -> None:
+            nonlocal group, group_bytes
+            if group:
+                content_hash = hashlib.sha256(':'.join(row.content_hash or '' for row in group).encode()).hexdigest()
+                units.append(SummaryUnit(content_hash, tuple(row.spine_index + 1 for row in group),
+                                         tuple((row.path, row.text_offset, row.byte_size) for row in group)))
+            group, group_bytes = [], 0
+
+        for row in rows:
+            if row.text_offset is None:
+                content_hash = row.content_hash or hashlib.sha256(self.storage.read_bytes(row.path)).hexdigest()
+                units.append(SummaryUnit(content_hash, (row.spine_index + 1,), ((row.path, None, row.byte_size),)))
+                continue
+            if group and group_bytes + (row.byte_size or 0) > self.summary_chunk_chars:
+                close_group()
+            group.append(row)
+            group_bytes += row.byte_size or 0
+        close_group()
+        return units
+
+    def _unit_text(self, unit: SummaryUnit) -> str:
+        texts = []
+        for path, text_offset, byte_size in unit.sources:
+            if text_offset is None:
+                texts.append(html_to_text(self.storage.read_bytes(path)))
+            elif byte_size:
+                data = b''.join(self.storage.iter_chunks(path, text_offset, text_offset + byte_size - 1))
+                texts.append(data.decode('utf-8', errors='replace').strip())
+        return '\n\n'.join(text for text in texts if text)
+
+    def summarize_unit(self, unit: SummaryUnit) -> tuple[str, bool]:
+        """Resume una unidad, o la trae de la caché.
+
+        Returns:
+            tuple[str, bool]: Devuelve el resumen ('' si no tiene texto) y si salió de la caché.
+        """
+        cache_key = self._summary_key('chapter', unit.content_hash)
+        cached = self._cached_summary(cache_key)
+        if cached is not None:
+            return cached.summary, True
+        summary = summarize_text(self.summary_model(), self._unit_text(unit), self.summary_chunk_chars) or ''
+        self._store_summary(cache_key, 'chapter', summary)
+        return summary, False
+
+    def _book_summary_key(self, units: list[SummaryUnit]) -> str:
+        return self._summary_key('book', hashlib.sha256(':'.join(unit.content_hash for unit in units).encode()).hexdigest())
+
+    def chapter_summary_unit(self, book_id: int, chapter_number: int) -> Optional[SummaryUnit]:
+        """Unidad que contiene a un capítulo (o a una página de un PDF). Son las mismas unidades
+        que las del resumen del libro, así ambos comparten la caché: en un PDF es el grupo de
+        páginas que incluye a la pedida.
+
+        Args:
+            book_id (int): ID del libro.
+            chapter_number (int): Número de capítulo (empezando en 1).
+
+        Returns:
+            Optional[SummaryUnit]: Devuelve la unidad, o None si el capítulo no existe.
+        """
+        with Session(self.engine) as session:
+            row = session.execute(
+                select(ChaptersModel.path, ChaptersModel.content_hash, ChaptersModel.text_offset, ChaptersModel.byte_size)
+                .where(ChaptersModel.book_id == book_id, ChaptersModel.spine_index == chapter_number - 1)
+            ).first()
+        if row is None:
+            return None
+        if row.text_offset is None:
+            content_hash = row.content_hash or hashlib.sha256(self.storage.read_bytes(row.path)).hexdigest()
+            return SummaryUnit(content_hash, (chapter_number,), ((row.path, None, row.byte_size),))
+        return next(unit for unit in self.summary_units(book_id) if chapter_number in unit.chapter_numbers)
+
+    def chapter_summary(self, book_id: int, chapter_number: int, unit: SummaryUnit, summary: str, cached: bool) -> dict:
+        return {
+            'book_id': book_id, 'chapter_number': chapter_number, 'chapter_numbers': list(unit.chapter_numbers),
+            'summary': summary, 'cached': cached, 'model': self.summary_model().name,
+        }
+
+    def cached_chapter_summary(self, book_id: int, chapter_number: int) -> tuple[Optional[SummaryUnit], Optional[dict]]:
+        """Resumen de un capítulo sólo si ya está en la caché (no llama al modelo).
+
+        Returns:
+            tuple[Optional[SummaryUnit], Optional[dict]]: Devuelve la unidad del capítulo (None si
+            no existe) y el resumen (None si no está cacheado).
+        """
+        unit = self.chapter_summary_unit(book_id, chapter_number)
+        if unit is None:
+            return None, None
+        cached = self._cached_summary(self._summary_key('chapter', unit.content_hash))
+        if cached is None:
+            return unit, None
+        return unit, self.chapter_summary(book_id, chapter_number, unit, cached.summary, True)
+
+    def summarize_chapter(self, book_id: int, chapter_number: int) -> Optional[dict]:
+        """Resumen de un capítulo, cacheado o llamando al modelo (síncrono).
+
+        Args:
+            book_id (int): ID del libro.
+            chapter_number (int): Número de capítulo (empezando en 1).
+
+        Returns:
+            Optional[dict]: Devuelve el resumen, o None si el capítulo no existe.
+        """
+        unit = self.chapter_summary_unit(book_id, chapter_number)
+        if unit is None:
+            return None
+        return self.chapter_summary(book_id, chapter_number, unit, *self.summarize_unit(unit))
+
+    def submit_chapter_summary(self, book_id: int, chapter_number: int, unit: SummaryUnit) -> Future:
+        """Encola el resumen de una unidad que no estaba en la caché en el pool de llamadas al
+        modelo (SUMMARY_MAX_CONCURRENT), el mismo que usan los trabajos: los pedidos de
+        capítulos no suman llamadas simultáneas. Los cacheados no pasan por acá (ver
+        cached_chapter_summary), así no esperan detrás de los capítulos de un trabajo.
+        """
+        _, map_pool = self.summary_pools()
+        return map_pool.submit(lambda: self.chapter_summary(book_id, chapter_number, unit, *self.summarize_unit(unit)))
+
+    def get_book_summary(self, book_id: int) -> Optional[dict]:
+        """Resumen del libro, si ya se generó para su contenido actual."""
+        units = self.summary_units(book_id)
+        if not units:
+            return None
+        cached = self._cached_summary(self._book_summary_key(units))
+        if cached is None:
+            return None
+        return {'book_id': book_id, 'summary': cached.summary, 'model': cached.model, 'created_at': cached.created_at}
+
+    def start_book_summary(self, book: BooksModel, user_id: int) -> SummaryJobsModel:
+        """Encola el resumen del libro. Si ya hay un trabajo activo para el libro, devuelve ese.
+
+        Args:
+            book (BooksModel): Libro a resumir.
+            user_id (int): Usuario que lo pide.
+
+        Returns:
+            SummaryJobsModel: Devuelve el trabajo (consultar su progreso con get_summary_job).
+        """
+        stale_before = datetime.datetime.now(datetime.UTC) - datetime.timedelta(seconds=self.summary_job_stale_seconds)
+        active_statuses = ('queued', 'running')
+        # Un trabajo activo sin progreso reciente murió con su worker: le liberamos el lugar.
+        with Session(self.engine) as session, session.begin():
+            session.execute(
+                update(SummaryJobsModel)
+                .where(SummaryJobsModel.book_id == book.id, SummaryJobsModel.status.in_(active_statuses),
+                       SummaryJobsModel.updated_at <= stale_before)
+                .values(status='failed', error='Stale')
+            )
+        # El índice único parcial (ux_summary_jobs_active_book) decide quién crea el trabajo.
+        while True:
+            with Session(self.engine, expire_on_commit=False) as session:
+                job = SummaryJobsModel(id=uuid.uuid4().hex, book_id=book.id, user_id=user_id, status='queued', total=0, done=0, cached=0)
+                session.add(job)
+                try:
+                    session.commit()
+                    break
+                except IntegrityError:
+                    session.rollback()
+                active = session.scalars(
+                    select(SummaryJobsModel)
+                    .where(SummaryJobsModel.book_id == book.id, SummaryJobsModel.status.in_(active_statuses))
+                ).first()
+                if active is not None:
+                    return active
+                # Terminó entre el INSERT y el SELECT: volvemos a intentar.
+        job_pool, _ = self.summary_pools()
+        job_pool.submit(self._run_summary_job, job.id, book.id)
+        return job
+
+    def get_summary_job(self, job_id: str) -> Optional[SummaryJobsModel]:
+        with Session(self.engine) as session:
+            return session.get(SummaryJobsModel, job_id)
+
+    def _update_summary_job(self, job_id: str, **values) -> None:
+        with Session(self.engine) as session, session.begin():
+            session.execute(update(SummaryJobsModel).where(SummaryJobsModel.id == job_id).values(**values))
+
+    def _run_summary_job(self, job_id: str, book_id: int) -> None:
+        futures: list[Future] = []
+        try:
+            units = self.summary_units(book_id)
+            self._update_summary_job(job_id, status='running', total=len(units))
+            book_key = self._book_summary_key(units)
+            if self._cached_summary(book_key) is not None:
+                self._update_summary_job(job_id, status='done', done=len(units), cached=len(units), summary_key=book_key)
+                return
+
+            # Map: capítulos en paralelo (acotado por el pool); el progreso se guarda cada medio segundo.
+            _, map_pool = self.summary_pools()
+            futures = [map_pool.submit(self.summarize_unit, unit) for unit in units]
+            index = {future: i for i, future in enumerate(futures)}
+            summaries: list[str] = [''] * len(units)
+            done = cached = 0
+            reported_at = time.monotonic()
+            for future in as_completed(futures):
+                summaries[index[future]], was_cached = future.result()
+                done += 1
+                cached += was_cached
+                if time.monotonic() - reported_at >= 0.5:
+                    self._update_summary_job(job_id, done=done, cached=cached)
+                    reported_at = time.monotonic()
+            self._update_summary_job(job_id, done=done, cached=cached)
+
+            # Reduce: resúmenes de los capítulos -> resumen del libro.
+            summary = reduce_summaries(self.summary_model(), summaries, self.summary_chunk_chars) or ''
+            self._store_summary(book_key, 'book', summary)
+            self._update_summary_job(job_id, status='done', summary_key=book_key)
+        except Exception as error:
+            for future in futures:
+                future.cancel()
+            self._update_summary_job(job_id, status='failed', error=f'{type(error).__name__}: {error}')
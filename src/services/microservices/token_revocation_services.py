@@ -0,0 +1,154 @@
+import datetime
+import os
+import threading
+import time
+from typing import Optional
+
+import jwt
+from jwt.exceptions import InvalidTokenError
+from sqlalchemy import Engine, delete, or_
+from sqlalchemy.orm import Session
+
+from src.models.token_revocations_model import TokenRevocationsModel
+
+# Duración de los tokens: las revocaciones más viejas ya no afectan a ningún token válido.
+TOKEN_TTL = datetime.timedelta(days=10)
+# Las filas se numeran al insertarse pero se hacen visibles al commitear, que puede ser en
+# otro orden: releemos las revocaciones recientes además de las de id mayor al último visto.
+REVOCATION_OVERLAP = datetime.timedelta(seconds=60)
+
+class TokenRevocationServices:
+    def __init__(self) -> None:
+        """Revocación de tokens JWT (por jti o todos los de un usuario).
+
+        La tabla token_revocations se replica en memoria en cada worker y se refresca de
+        forma incremental cada TOKEN_REVOCATION_REFRESH_SECONDS, así validar un token no
+        suma consultas: es una búsqueda en dos dicts.
+
+        Una revocación de hace más de TOKEN_TTL ya no afecta a ningún token válido (todos los
+        emitidos antes vencieron): cada TOKEN_REVOCATION_PRUNE_SECONDS se borran de la tabla y
+        de la memoria.
+        """
+        super().__init__()
+        self.engine: Engine = self.engine
+        self.revocation_refresh_seconds: float = float(os.getenv('TOKEN_REVOCATION_REFRESH_SECONDS', '2'))
+        self.revocation_prune_seconds: float = float(os.getenv('TOKEN_REVOCATION_PRUNE_SECONDS', '3600'))
+        self._revoked_jtis: dict[str, float] = {}  # jti -> revoked_at.
+        self._revoked_before: dict[str, float] = {}
+        self._revocations_last_id: int = 0
+        self._revocations_refreshed_at: Optional[float] = None
+        self._revocations_pruned_at: float = time.monotonic()
+        self._revocations_lock = threading.Lock()
+
+    def _apply_revocation(self, subject: str, jti: Optional[str], revoked_at: float) -> None:
+        if jti:
+            self._revoked_jtis[jti] = revoked_at
+        elif revoked_at > self._revoked_before.get(subject, 0.0):
+            self._revoked_before[subject] = revoked_at
+
+    def prune_revocations(self) -> int:
+        """Borra las revocaciones de hace más de TOKEN_TTL, de la tabla y de la memoria del worker.
+
+        Returns:
+            int: Devuelve la cantidad de filas borradas.
+        """
+        horizon = datetime.datetime.now(datetime.UTC) - TOKEN_TTL
+        with Session(self.engine) as session, session.begin():
+            deleted = session.execute(
+                delete(TokenRevocationsModel).where(TokenRevocationsModel.created_at < horizon)
+            ).rowcount
+        horizon = horizon.timestamp()
+        # Se borran en el lugar (y no reconstruyendo los dicts) para no perder una revocación
+        # que otro hilo agregue mientras tanto.
+        for revocations in (self._revoked_jtis, self._revoked_before):
+            for key, revoked_at in list(revocations.items()):
+                if revoked_at < horizon:
+                    revocations.pop(key, None)
+        self._revocations_pruned_at = time.monotonic()
+        return deleted
+
+    def refresh_revocations(self, force: bool = False) -> None:
+        """Trae las revocaciones nuevas. Si ya hay otro hilo refrescando, no espera: sigue
+        con lo que hay en memoria (salvo la primera carga).
+
+        Args:
+            force (bool, optional): Refrescar aunque no haya pasado el intervalo. Defaults to False.
+        """
+        first_load = self._revocations_refreshed_at is None
+        if not force and not first_load and time.monotonic() - self._revocations_refreshed_at < self.revocation_refresh_seconds:
+            return
+        if not self._revocations_lock.acquire(blocking=first_load or force):
+            return
+        try:
+            now = datetime.datetime.now(datetime.UTC)
+            with Session(self.engine) as session:
+                query = session.query(
+                    TokenRevocationsModel.id, TokenRevocationsModel.subject, TokenRevocationsModel.jti, TokenRevocationsModel.revoked_at,
+                )
+                if self._revocations_refreshed_at is None:
+                    query = query.filter(TokenRevocationsModel.created_at > now - TOKEN_TTL)
+                else:
+                    query = query.filter(or_(
+                        TokenRevocationsModel.id > self._revocations_last_id,
+                        TokenRevocationsModel.created_at > now - REVOCATION_OVERLAP,
+                    ))
+                for row in query:
+                    self._apply_revocation(row.subject, row.jti, row.revoked_at)
+                    self._revocations_last_id = max(self._revocations_last_id, row.id)
+            self._revocations_refreshed_at = time.monotonic()
+            if self._revocations_refreshed_at - self._revocations_pruned_at >= self.revocation_prune_seconds:
+                self.prune_revocations()
+        finally:
+            self._revocations_lock.release()
+
+    def token_is_revoked(self, payload: dict) -> bool:
+        """Verifica si un token (ya decodificado) fue revocado.
+
+        Args:
+            payload (dict): Claims del token.
+
+        Returns:
+            bool: Devuelve True si el token fue revocado.
+        """
+        self.refresh_revocations()
+        if payload.get('jti') in self._revoked_jtis:
+            return True
+        # Los tokens anteriores a los jti/iat no tienen iat: se revocan con cualquier revocación del usuario.
+        return payload.get('iat', 0) < self._revoked_before.get(str(payload.get('sub', '')).lower(), 0.0)
+
+    def revoke_user_tokens(self, email: str) -> None:
+        """Revoca todos los tokens emitidos hasta ahora para el usuario.
+
+        Args:
+            email (str): Email del usuario (sub de sus tokens).
+        """
+        self._revoke(email.lower(), None)
+
+    def revoke_token(self, token: Optional[str], all_sessions: bool = True) -> bool:
+        """Revoca el token recibido (por ejemplo, la cookie al cerrar sesión).
+
+        Args:
+            token (Optional[str]): Token JWT.
+            all_sessions (bool, optional): Revocar todos los tokens del usuario y no sólo este. Defaults to True.
+
+        Returns:
+            bool: Devuelve False si el token no es válido (no hay nada que revocar).
+        """
+        try:
+            payload = jwt.decode(token or '', self.JWT_SECRET_KEY, algorithms=['HS256'])
+        except InvalidTokenError:
+            return False
+        subject = str(payload.get('sub', '')).lower()
+        if all_sessions or not payload.get('jti'):
+            self._revoke(subject, None)
+        else:
+            self._revoke(subject, payload['jti'])
+        return True
+
+    def _revoke(self, subject: str, jti: Optional[str]) -> None:
+        revoked_at = time.time()
+        with Session(self.engine) as session:
+            session.add(TokenRevocationsModel(subject=subject, jti=jti, revoked_at=revoked_at))
+            session.commit()
+        # En este worker la revocación rige ya; el resto la ve en el próximo refresco.
+        self._apply_revocation(subject, jti, revoked_at)
@@ -0,0 +1,332 @@
+import datetime
+import fcntl
+import hashlib
+import logging
+import os
+import shutil
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Optional
+
+from sqlalchemy import Engine, delete, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from src.models.books_model import BooksModel
+from src.models.upload_sessions_model import UploadSessionsModel
+
+logger = logging.getLogger(__name__)
+
+def file_sha256(path: str) -> str:
+    hasher = hashlib.sha256()
+    with open(path, 'rb') as file:
+        while chunk := file.read(1024 * 1024):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+class UploadConflict(Exception):
+    """El offset del chunk no coincide con lo recibido, o la subida ya no acepta chunks."""
+    def __init__(self, offset: int) -> None:
+        super().__init__(offset)
+        self.offset = offset
+
+class UploadLocked(Exception):
+    """Otra petición está escribiendo en la misma subida."""
+
+class UploadWriter:
+    def __init__(self, upload: UploadSessionsModel, file, offset: int, hasher) -> None:
+        """Escribe los chunks de una subida al final del archivo y, si tiene hasher, los va
+        hasheando. Tiene el archivo bloqueado (flock) hasta close(), así dos PATCH no pueden
+        escribir a la vez.
+        """
+        self.upload = upload
+        self.file = file
+        self.offset = offset
+        self.hasher = hasher
+
+    @property
+    def remaining(self) -> int:
+        return self.upload.length - self.offset
+
+    def write(self, data: bytes) -> None:
+        self.file.write(data)
+        if self.hasher is not None:
+            self.hasher.update(data)
+        self.offset += len(data)
+
+    def close(self) -> None:
+        try:
+            self.file.flush()
+            os.fsync(self.file.fileno())
+        finally:
+            self.file.close()  # Libera el flock.
+
+class UploadServices:
+    def __init__(self) -> None:
+        """Subidas reanudables de libros (estilo tus): se crea la subida, se mandan chunks con
+        su offset (PATCH) y se consulta lo recibido (HEAD). Los chunks se escriben directo en el
+        archivo final y se hashean a medida que llegan; al completarse, el libro se ingesta en
+        segundo plano.
+        """
+        super().__init__()
+        self.engine: Engine = self.engine
+        self.upload_max_bytes: int = int(os.getenv('UPLOAD_MAX_BYTES', str(1024 * 1024 * 1024)))
+        self.upload_session_ttl: datetime.timedelta = datetime.timedelta(hours=float(os.getenv('UPLOAD_SESSION_TTL_HOURS', '24')))
+        self.upload_ingest_workers: int = int(os.getenv('UPLOAD_INGEST_WORKERS', '2'))
+        # Una subida que sigue en 'processing' después de esto quedó colgada (el worker murió
+        # durante la ingesta): la purga la cierra.
+        self.upload_processing_timeout: datetime.timedelta = datetime.timedelta(minutes=float(os.getenv('UPLOAD_PROCESSING_TIMEOUT_MINUTES', '60')))
+        self._upload_pool: Optional[ThreadPoolExecutor] = None
+        self._upload_lock = threading.Lock()
+        # Estado del sha256 de cada subida al final de su último PATCH en este worker: el
+        # siguiente chunk sigue hasheando sin releer el archivo. Si el PATCH llega a otro
+        # worker (o tras un reinicio) se deja de hashear por partes y el archivo se hashea una
+        # sola vez al completarse (releerlo en cada chunk sería cuadrático).
+        self._upload_hashers: dict[str, tuple[int, object]] = {}
+        self._uploads_purged_at: float = 0.0
+
+    def upload_pool(self) -> ThreadPoolExecutor:
+        with self._upload_lock:
+            if self._upload_pool is None:
+                self._upload_pool = ThreadPoolExecutor(max_workers=self.upload_ingest_workers, thread_name_prefix='upload-ingest')
+            return self._upload_pool
+
+    def shutdown_upload_pool(self) -> None:
+        if self._upload_pool is not None:
+            self._upload_pool.shutdown(wait=False, cancel_futures=True)
+
+    @staticmethod
+    def upload_offset(upload: UploadSessionsModel) -> int:
+        """Bytes recibidos de la subida (el tamaño del archivo en disco)."""
+        if upload.status != 'uploading':
+            return upload.length
+        try:
+            return os.path.getsize(upload.file_path)
+        except FileNotFoundError:
+            return 0
+
+    def create_upload(self, user_id: int, filename: str, length: int, idempotency_key: Optional[str] = None, checksum: Optional[str] = None) -> tuple[UploadSessionsModel, bool]:
+        """Crea una subida. Con la misma clave de idempotencia devuelve la subida que ya existe
+        (en el estado en que esté, incluso con el libro ya creado).
+
+        Args:
+            user_id (int): ID del dueño.
+            filename (str): Nombre del archivo (define el formato del libro).
+            length (int): Tamaño del archivo en bytes.
+            idempotency_key (Optional[str], optional): Clave del cliente para los reintentos. Defaults to None.
+            checksum (Optional[str], optional): sha256 esperado del archivo (hex). Defaults to None.
+
+        Returns:
+            tuple[UploadSessionsModel, bool]: Devuelve la subida y si se creó ahora.
+        """
+        self.purge_expired_uploads()
+        if idempotency_key:
+            existing = self.get_upload_by_key(user_id, idempotency_key)
+            if existing is not None:
+                return existing, False
+
+        book_type = self.book_type_from_filename(filename)
+        saving_folder, file_path = self.allocate_book_folder(book_type)
+        file_path.touch()
+        upload_id = uuid.uuid4().hex
+        with Session(self.engine) as session, session.begin():
+            created = session.scalar(
+                insert(UploadSessionsModel)
+                .values(
+                    id=upload_id, user_id=user_id, idempotency_key=idempotency_key, filename=filename, book_type=book_type,
+                    length=length, saving_folder=str(saving_folder), file_path=str(file_path),
+                    checksum=checksum.lower() if checksum else None, status='uploading',
+                    expires_at=datetime.datetime.now(datetime.UTC) + self.upload_session_ttl,
+                )
+                .on_conflict_do_nothing(index_elements=[UploadSessionsModel.user_id, UploadSessionsModel.idempotency_key])
+                .returning(UploadSessionsModel.id)
+            )
+        if created is None:
+            # Otra petición con la misma clave ganó la carrera.
+            shutil.rmtree(saving_folder, ignore_errors=True)
+            return self.get_upload_by_key(user_id, idempotency_key), False
+        return self.get_upload(upload_id), True
+
+    def get_upload(self, upload_id: str) -> Optional[UploadSessionsModel]:
+        with Session(self.engine) as session:
+            return session.get(UploadSessionsModel, upload_id)
+
+    def get_upload_by_key(self, user_id: int, idempotency_key: str) -> Optional[UploadSessionsModel]:
+        with Session(self.engine) as session:
+            return session.scalars(
+                select(UploadSessionsModel)
+                .where(UploadSessionsModel.user_id == user_id, UploadSessionsModel.idempotency_key == idempotency_key)
+            ).first()
+
+    def open_upload(self, upload: UploadSessionsModel, offset: int) -> UploadWriter:
+        """Abre la subida para escribir a partir de offset.
+
+        Raises:
+            UploadLocked: Si otro PATCH está escribiendo en ella.
+            UploadConflict: Si offset no es lo recibido hasta ahora, o la subida ya no acepta chunks.
+        """
+        if upload.status != 'uploading':
+            raise UploadConflict(upload.length)
+        try:
+            file = open(upload.file_path, 'r+b')
+        except FileNotFoundError:
+            raise UploadConflict(0)
+        try:
+            fcntl.flock(file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            file.close()
+            raise UploadLocked()
+        size = os.fstat(file.fileno()).st_size
+        if size != offset:
+            file.close()
+            raise UploadConflict(size)
+
+        with self._upload_lock:
+            cached = self._upload_hashers.pop(upload.id, None)
+        if cached is not None and cached[0] == size:
+            hasher = cached[1]
+        elif size == 0:
+            hasher = hashlib.sha256()
+        else:
+            hasher = None
+        file.seek(size)
+        return UploadWriter(upload, file, size, hasher)
+
+    def close_upload(self, writer: UploadWriter) -> bool:
+        """Cierra el archivo y, si la subida quedó completa, lanza la ingesta.
+
+        Returns:
+            bool: Devuelve True si este PATCH completó la subida.
+        """
+        writer.close()
+        if writer.remaining > 0:
+            if writer.hasher is not None:
+                with self._upload_lock:
+                    self._upload_hashers[writer.upload.id] = (writer.offset, writer.hasher)
+            return False
+        sha256 = writer.hasher.hexdigest() if writer.hasher is not None else file_sha256(writer.upload.file_path)
+        return self.complete_upload(writer.upload, sha256)
+
+    def complete_upload(self, upload: UploadSessionsModel, sha256: str) -> bool:
+        """Pasa la subida a 'processing' y encola la ingesta. Es condicional: si dos peticiones
+        completan la misma subida (un reintento), sólo una crea el libro.
+
+        Returns:
+            bool: Devuelve True si esta llamada lanzó la ingesta.
+        """
+        if upload.checksum and upload.checksum != sha256:
+            status, error = 'failed', 'ChecksumMismatch'
+        else:
+            status, error = 'processing', None
+        with Session(self.engine) as session, session.begin():
+            claimed = session.execute(
+                update(UploadSessionsModel)
+                .where(UploadSessionsModel.id == upload.id, UploadSessionsModel.status == 'uploading')
+                .values(status=status, sha256=sha256, error=error)
+            ).rowcount
+        if not claimed or status == 'failed':
+            if claimed:
+                shutil.rmtree(upload.saving_folder, ignore_errors=True)
+            return False
+        self.upload_pool().submit(self._ingest_upload, upload.id)
+        return True
+
+    def _ingest_upload(self, upload_id: str) -> None:
+        upload = self.get_upload(upload_id)
+        try:
+            with self.track_ingest():
+                book = self.ingest_book(Path(upload.file_path), Path(upload.saving_folder), upload.book_type, upload.user_id)
+        except Exception as error:
+            logger.exception('Ingest of upload %s failed', upload_id)
+            with Session(self.engine) as session, session.begin():
+                session.execute(
+                    update(UploadSessionsModel).where(UploadSessionsModel.id == upload_id)
+                    .values(status='failed', error=type(error).__name__)
+                )
+                in_use = session.scalar(select(BooksModel.id).where(BooksModel.main_folder_path == upload.saving_folder))
+            if in_use is None:
+                shutil.rmtree(upload.saving_folder, ignore_errors=True)
+            return
+        with Session(self.engine) as session, session.begin():
+            session.execute(
+                update(UploadSessionsModel).where(UploadSessionsModel.id == upload_id)
+                .values(status='done', book_id=book.id)
+            )
+
+    def abort_upload(self, upload: UploadSessionsModel) -> bool:
+        """Cancela una subida en curso y borra lo recibido.
+
+        Returns:
+            bool: Devuelve False si la subida ya estaba completa (el libro se borra por /books).
+        """
+        with Session(self.engine) as session, session.begin():
+            deleted = session.execute(
+                delete(UploadSessionsModel)
+                .where(UploadSessionsModel.id == upload.id, UploadSessionsModel.status.in_(('uploading', 'failed')))
+            ).rowcount
+            # Si la ingesta falló después de crear el libro, la carpeta es la del libro (ver _ingest_upload).
+            in_use = session.scalar(select(BooksModel.id).where(BooksModel.main_folder_path == upload.saving_folder))
+        if not deleted:
+            return False
+        with self._upload_lock:
+            self._upload_hashers.pop(upload.id, None)
+        if in_use is None:
+            shutil.rmtree(upload.saving_folder, ignore_errors=True)
+        return True
+
+    def purge_expired_uploads(self, min_interval: float = 300.0) -> int:
+        """Borra las subidas vencidas (a lo sumo una vez cada min_interval segundos por worker).
+        Sólo se borra la carpeta de las que quedaron a medio subir: la de una terminada ya es la
+        del libro, y las fallidas se limpian al fallar.
+
+        Antes cierra las que llevan más de UPLOAD_PROCESSING_TIMEOUT_MINUTES en 'processing'
+        (ver close_stuck_uploads), así también se purgan cuando vencen.
+
+        Returns:
+            int: Devuelve la cantidad de subidas borradas.
+        """
+        now = time.monotonic()
+        if now - self._uploads_purged_at < min_interval:
+            return 0
+        self._uploads_purged_at = now
+        self.close_stuck_uploads()
+        with Session(self.engine) as session, session.begin():
+            expired = session.execute(
+                delete(UploadSessionsModel)
+                .where(UploadSessionsModel.expires_at < datetime.datetime.now(datetime.UTC),
+                       UploadSessionsModel.status != 'processing')
+                .returning(UploadSessionsModel.id, UploadSessionsModel.status, UploadSessionsModel.saving_folder)
+            ).all()
+        for row in expired:
+            with self._upload_lock:
+                self._upload_hashers.pop(row.id, None)
+            if row.status == 'uploading':
+                shutil.rmtree(row.saving_folder, ignore_errors=True)
+        return len(expired)
+
+    def close_stuck_uploads(self) -> int:
+        """Cierra las subidas que quedaron en 'processing' más de upload_processing_timeout (el
+        worker que las ingestaba se cayó). Si el libro se llegó a crear, la subida pasa a 'done'
+        con ese libro; si no, a 'failed' (IngestTimeout) y se borra lo recibido.
+
+        Returns:
+            int: Devuelve la cantidad de subidas cerradas.
+        """
+        stuck_before = datetime.datetime.now(datetime.UTC) - self.upload_processing_timeout
+        with Session(self.engine) as session, session.begin():
+            stuck = session.execute(
+                select(UploadSessionsModel.id, UploadSessionsModel.saving_folder, BooksModel.id.label('book_id'))
+                .outerjoin(BooksModel, BooksModel.main_folder_path == UploadSessionsModel.saving_folder)
+                .where(UploadSessionsModel.status == 'processing', UploadSessionsModel.updated_at < stuck_before)
+                .with_for_update(of=UploadSessionsModel, skip_locked=True)
+            ).all()
+            for row in stuck:
+                values = {'status': 'done', 'book_id': row.book_id} if row.book_id is not None else {'status': 'failed', 'error': 'IngestTimeout'}
+                session.execute(update(UploadSessionsModel).where(UploadSessionsModel.id == row.id).values(**values))
+        for row in stuck:
+            if row.book_id is None:
+                shutil.rmtree(row.saving_folder, ignore_errors=True)
+        return len(stuck)
@@ -2,17 +2,24 @@ import os
 from typing import Annotated, Optional, Union
 from fastapi import Depends, HTTPException, Request, Response
 from fastapi.security import OAuth2PasswordBearer, APIKeyCookie
-from sqlalchemy import Engine
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import Engine, func, text
+from sqlalchemy.orm import Session, joinedload, noload, selectinload
 from src.models.users_model import UsersModel
+from src.models.books_model import BooksModel
 from src.services.microservices.security_services import SecurityServices
+from src.services.microservices.token_revocation_services import TOKEN_TTL
 import datetime
+import time
+import uuid
 import jwt
 from jwt.exceptions import InvalidTokenError
 from fastapi import status
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl='/users/auth')
 
+# Id del advisory lock de Postgres usado para el seed de admins.
+ADMIN_SEED_LOCK_ID = 5_400_000_001
+
 class UsersServices:
     def __init__(self) -> None:
         super().__init__()
@@ -46,7 +53,8 @@ class UsersServices:
 
     def get_all_users(self) -> list[UsersModel]:
         with Session(self.engine) as session:
-            return session.query(UsersModel).options(joinedload(UsersModel.books)).all()
+            # serialize sólo usa los ids de los libros: no traemos el resto de columnas.
+            return session.query(UsersModel).options(selectinload(UsersModel.books).load_only(BooksModel.id)).all()
         
     def get_user(self, email: str) -> Optional[UsersModel]:
         # Normalizamos el email para evitar problemas de mayúsculas/minúsculas y espacios
@@ -67,12 +75,35 @@ class UsersServices:
         email = self._norm_email(email)
         with Session(self.engine) as session:
             return bool(
+                session.query(UsersModel.id)
+                .filter(UsersModel.email.ilike(email))
+                .first()
+            )
+
+    def get_user_for_login(self, email: str) -> Optional[UsersModel]:
+        """Obtiene el usuario para el login en una sola consulta, sin cargar sus libros.
+
+        Args:
+            email (str): Email del usuario.
+
+        Returns:
+            Optional[UsersModel]: Devuelve el usuario o None si no existe.
+        """
+        email = self._norm_email(email)
+        with Session(self.engine) as session:
+            return (
                 session.query(UsersModel)
                 .filter(UsersModel.email.ilike(email))
-                .options(joinedload(UsersModel.books))
+                .options(noload(UsersModel.books))
                 .first()
             )
 
+    def update_password_hash(self, user_id: int, password_hash: str) -> None:
+        """Guarda un hash ya calculado (rehash transparente en el login)."""
+        with Session(self.engine) as session:
+            session.query(UsersModel).filter(UsersModel.id == user_id).update({UsersModel.password: password_hash})
+            session.commit()
+
     def create_admin_user_if_missing(self, name: str, email: str, password: str) -> bool:
         email = self._norm_email(email)
         with Session(self.engine) as session:
@@ -131,17 +162,10 @@ class UsersServices:
             return new_user
         
     def user_credentials_are_valid(self, email: str, password: str) -> bool:
-        email = self._norm_email(email)
-        with Session(self.engine) as session:
-            user = (
-                session.query(UsersModel)
-                .filter(UsersModel.email.ilike(email))
-                .options(joinedload(UsersModel.books))
-                .first()
-            )
-            if not user:
-                return False
-            return SecurityServices.verify_password(password, user.password)
+        user = self.get_user_for_login(email)
+        if not user:
+            return False
+        return SecurityServices.verify_password(password, user.password)
         
     def create_user_token(self, email: str, type: str) -> str:
         email = self._norm_email(email)
@@ -149,15 +173,27 @@ class UsersServices:
             user = session.query(UsersModel).filter(UsersModel.email.ilike(email)).first()
             if not user:
                 return ''
+            return self.create_token_for_user(user, type)
 
-            to_encode = {'sub': user.email, 'type': 'email' if type == 'email' else 'google'}
+    def create_token_for_user(self, user: UsersModel, type: str) -> str:
+        """Crea el JWT de un usuario ya cargado, sin volver a consultarlo.
 
-            # Establecemos una expiración de 30 minutos para el token.
-            expire = datetime.datetime.now(datetime.UTC) + datetime.timedelta(days=10)
-            to_encode.update({'exp': expire})
+        Args:
+            user (UsersModel): Usuario autenticado.
+            type (str): Tipo de login ('email' o 'google').
 
-            encode_jwt = jwt.encode(to_encode, self.JWT_SECRET_KEY, algorithm='HS256')
-            return encode_jwt
+        Returns:
+            str: Devuelve el token firmado.
+        """
+        to_encode = {'sub': user.email, 'type': 'email' if type == 'email' else 'google'}
+
+        # Establecemos una expiración de 10 días para el token.
+        expire = datetime.datetime.now(datetime.UTC) + TOKEN_TTL
+        # jti identifica al token e iat (con decimales) permite revocar los emitidos antes de un momento dado.
+        to_encode.update({'exp': expire, 'iat': time.time(), 'jti': uuid.uuid4().hex})
+
+        encode_jwt = jwt.encode(to_encode, self.JWT_SECRET_KEY, algorithm='HS256')
+        return encode_jwt
         
     def get_current_user(self, response: Response, request: Request) -> UsersModel:
         """Obtiene el usuario actual a partir del token JWT.
@@ -180,9 +216,12 @@ class UsersServices:
             email = payload.get('sub')
         except InvalidTokenError:
             raise credentials_exception
+        # Se resuelve en memoria (ver TokenRevocationServices), sin consultar la base.
+        if self.token_is_revoked(payload):
+            raise credentials_exception
         
         user = self.get_user(email)
-        if user is None:
+        if user is None or user.role == 'banned':
             raise credentials_exception
         return user
 
@@ -199,6 +238,7 @@ class UsersServices:
                 return False
             session.delete(user)
             session.commit()
+            self.revoke_user_tokens(user.email)
             return True
         
     def edit_user(
@@ -224,30 +264,97 @@ class UsersServices:
                 user.image = image
             session.commit()
             session.refresh(user)
+            # Cambiar la password cierra todas las sesiones abiertas.
+            if password:
+                self.revoke_user_tokens(user.email)
             return user
+
+    def set_user_role(self, email: str, role: str) -> Optional[UsersModel]:
+        """Cambia el rol de un usuario. Al banearlo se revocan todos sus tokens.
+
+        Args:
+            email (str): Email del usuario.
+            role (str): Nuevo rol ('user', 'admin' o 'banned').
+
+        Returns:
+            Optional[UsersModel]: Devuelve el usuario actualizado, o None si no existe.
+        """
+        email = self._norm_email(email)
+        with Session(self.engine) as session:
+            user = (
+                session.query(UsersModel)
+                .filter(UsersModel.email.ilike(email))
+                .options(noload(UsersModel.books))
+                .first()
+            )
+            if not user:
+                return None
+            user.role = role
+            session.commit()
+            session.refresh(user)
+        if role == 'banned':
+            self.revoke_user_tokens(user.email)
+        return user
         
     def sync_admins(self, admins: list[dict], update_passwords: bool = False) -> dict:
-        created, updated = [], []
+        """Sincroniza los admins por defecto en una sola transacción.
+
+        Los admins que ya están al día no se tocan (ni se hashea nada). En Postgres se toma
+        un advisory lock, así con varios workers sólo uno hace el seed y el resto lo salta.
+
+        Args:
+            admins (list[dict]): Admins leídos del entorno.
+            update_passwords (bool, optional): Si se debe actualizar la password de los existentes. Defaults to False.
+
+        Returns:
+            dict: Devuelve los emails creados, actualizados y sin cambios.
+        """
+        created, updated, unchanged = [], [], []
+        emails = [self._norm_email(a["email"]) for a in admins]
         with Session(self.engine) as session:
-            for a in admins:
-                email = self._norm_email(a["email"])
-                user = session.query(UsersModel).filter(UsersModel.email.ilike(email)).first()
-                if user:
-                    user.role = "admin"
-                    if update_passwords:
-                        user.password = SecurityServices.hash_password(a["password"])
-                    session.commit()
-                    updated.append(email)
-                else:
-                    new_user = UsersModel(
-                        name=a["name"],
-                        email=email,
-                        password=SecurityServices.hash_password(a["password"]),
-                        image=None,
-                        user_type="email",
-                        role="admin",
-                    )
-                    session.add(new_user)
-                    session.commit()
-                    created.append(email)
-        return {"created": created, "updated": updated}
\ No newline at end of file
+            if self.engine.dialect.name == 'postgresql':
+                locked = session.execute(
+                    text('SELECT pg_try_advisory_xact_lock(:lock_id)'), {'lock_id': ADMIN_SEED_LOCK_ID}
+                ).scalar()
+                if not locked:
+                    return {"created": [], "updated": [], "unchanged": [], "skipped_by_lock": True}
+
+            existing = {
+                user.email.lower(): user
+                for user in session.query(UsersModel)
+                .filter(func.lower(UsersModel.email).in_(emails))
+                .options(noload(UsersModel.books))
+            }
+
+            to_create, to_rehash = [], []
+            for a, email in zip(admins, emails):
+                user = existing.get(email)
+                if user is None:
+                    to_create.append((a, email))
+                    continue
+                changed = user.role != "admin"
+                user.role = "admin"
+                if update_passwords and not SecurityServices.verify_password(a["password"], user.password):
+                    to_rehash.append((a, user))
+                    changed = True
+                (updated if changed else unchanged).append(email)
+
+            # Sólo hasheamos lo imprescindible, y en paralelo en el pool de hashing.
+            hashes = SecurityServices.hash_passwords(
+                [a["password"] for a, _ in to_create] + [a["password"] for a, _ in to_rehash]
+            )
+            for (a, email), password_hash in zip(to_create, hashes):
+                session.add(UsersModel(
+                    name=a["name"],
+                    email=email,
+                    password=password_hash,
+                    image=None,
+                    user_type="email",
+                    role="admin",
+                ))
+                created.append(email)
+            for (_, user), password_hash in zip(to_rehash, hashes[len(to_create):]):
+                user.password = password_hash
+
+            session.commit()
+        return {"created": created, "updated": updated, "unchanged": unchanged}
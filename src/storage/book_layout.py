@@ -0,0 +1,35 @@
+"""Ubicación de los libros en el almacén de contenido.
+
+Los libros se guardan en ``content/books/<ab>/<cd>/<id de carpeta>``, con ``ab`` y ``cd`` los
+primeros bytes del sha256 del id: ninguna carpeta crece sin límite (65536 hojas) y los paths
+no dependen del email del dueño. El layout anterior (``content/books/<email>/<uuid>``) se
+migra con ``python main.py migrate-storage``.
+"""
+import hashlib
+import re
+from pathlib import PurePosixPath
+from typing import Optional
+
+BOOKS_ROOT = PurePosixPath('content/books')
+_SHARDED_RE = re.compile(r'^content/books/[0-9a-f]{2}/[0-9a-f]{2}/[^/]+$')
+
+def book_prefix(folder_id: str) -> PurePosixPath:
+    """Prefijo de un libro en el layout particionado.
+
+    Args:
+        folder_id (str): Id de la carpeta del libro (un uuid4).
+
+    Returns:
+        PurePosixPath: Devuelve el prefijo (``content/books/<ab>/<cd>/<folder_id>``).
+    """
+    digest = hashlib.sha256(folder_id.encode('utf-8')).hexdigest()
+    return BOOKS_ROOT / digest[:2] / digest[2:4] / folder_id
+
+def is_sharded(prefix: str) -> bool:
+    return bool(_SHARDED_RE.match(prefix))
+
+def rebase_path(path: Optional[str], old_prefix: str, new_prefix: str) -> Optional[str]:
+    """Cambia el prefijo de un path guardado en la base de datos (deja igual los que no lo tienen)."""
+    if path is not None and (path == old_prefix or path.startswith(old_prefix + '/')):
+        return new_prefix + path[len(old_prefix):]
+    return path
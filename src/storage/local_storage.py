@@ -0,0 +1,83 @@
+import os
+import shutil
+from pathlib import Path
+from typing import BinaryIO, Iterator, Optional
+
+from src.storage.storage_backend import StorageBackend, StorageKey
+
+class LocalStorage(StorageBackend):
+    def __init__(self, root: str = '.') -> None:
+        """Almacén en el sistema de archivos local. Con root='.' las keys son los mismos
+        paths relativos que usábamos antes, por lo que no hace falta migrar nada.
+
+        Args:
+            root (str, optional): Carpeta raíz del almacén. Defaults to '.'.
+        """
+        self.root = Path(root)
+
+    def path(self, key: StorageKey) -> Path:
+        return self.root / self.normalize_key(key)
+
+    def save(self, key: StorageKey, fileobj: BinaryIO) -> None:
+        target = self.path(key)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        with open(target, 'wb') as buffer:
+            shutil.copyfileobj(fileobj, buffer, self.chunk_size)
+
+    def publish_folder(self, local_folder: Path, prefix: StorageKey) -> None:
+        target = self.path(prefix)
+        if target.resolve() == Path(local_folder).resolve():
+            return # Ya está en su lugar definitivo.
+        target.parent.mkdir(parents=True, exist_ok=True)
+        shutil.move(str(local_folder), str(target))
+
+    def copy_prefix(self, source: StorageKey, target: StorageKey) -> int:
+        source_dir, target_dir = self.path(source), self.path(target)
+        if not source_dir.is_dir():
+            return 0
+        copied = 0
+        for path in source_dir.rglob('*'):
+            if not path.is_file():
+                continue
+            destination = target_dir / path.relative_to(source_dir)
+            destination.parent.mkdir(parents=True, exist_ok=True)
+            destination.unlink(missing_ok=True)
+            # En el mismo disco alcanza con un hard link: no duplica el contenido.
+            try:
+                os.link(path, destination)
+            except OSError:
+                shutil.copy2(path, destination)
+            copied += 1
+        return copied
+
+    def open(self, key: StorageKey) -> BinaryIO:
+        return open(self.path(key), 'rb')
+
+    def iter_chunks(self, key: StorageKey, start: int = 0, end: Optional[int] = None) -> Iterator[bytes]:
+        with self.open(key) as stream:
+            stream.seek(start)
+            remaining = None if end is None else end - start + 1
+            while remaining is None or remaining > 0:
+                chunk = stream.read(self.chunk_size if remaining is None else min(self.chunk_size, remaining))
+                if not chunk:
+                    break
+                if remaining is not None:
+                    remaining -= len(chunk)
+                yield chunk
+
+    def exists(self, key: StorageKey) -> bool:
+        return self.path(key).is_file()
+
+    def size(self, key: StorageKey) -> int:
+        return os.path.getsize(self.path(key))
+
+    def delete_prefix(self, prefix: StorageKey) -> None:
+        target = self.path(prefix)
+        if target.is_dir():
+            shutil.rmtree(target)
+        elif target.exists():
+            target.unlink()
+
+    def local_path(self, key: StorageKey) -> Optional[Path]:
+        path = self.path(key)
+        return path if path.is_file() else None
@@ -0,0 +1,127 @@
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import BinaryIO, Iterator, Optional
+
+from src.storage.storage_backend import StorageBackend, StorageKey
+from src.storage.storage_cache import StorageCache
+
+class S3Storage(StorageBackend):
+    def __init__(
+        self,
+        bucket: str,
+        endpoint_url: Optional[str] = None,
+        region: Optional[str] = None,
+        access_key_id: Optional[str] = None,
+        secret_access_key: Optional[str] = None,
+        multipart_threshold: int = 8 * 1024 * 1024,
+        multipart_chunksize: int = 8 * 1024 * 1024,
+        cache: Optional[StorageCache] = None,
+    ) -> None:
+        """Almacén compatible con S3 (AWS, MinIO, etc.). Con ``endpoint_url`` puede
+        apuntarse a un MinIO local para desarrollo y pruebas.
+
+        Las subidas superiores a ``multipart_threshold`` se hacen con multipart upload.
+        """
+        try:
+            import boto3
+            from boto3.s3.transfer import TransferConfig
+            from botocore.exceptions import ClientError
+        except ImportError as e:
+            raise RuntimeError("The S3 storage backend requires 'boto3' (pip install boto3).") from e
+
+        self.bucket = bucket
+        self.cache = cache
+        self._client_error = ClientError
+        self.client = boto3.client(
+            's3',
+            endpoint_url=endpoint_url,
+            region_name=region,
+            aws_access_key_id=access_key_id,
+            aws_secret_access_key=secret_access_key,
+        )
+        self.transfer_config = TransferConfig(
+            multipart_threshold=multipart_threshold,
+            multipart_chunksize=multipart_chunksize,
+        )
+
+    def save(self, key: StorageKey, fileobj: BinaryIO) -> None:
+        self.client.upload_fileobj(fileobj, self.bucket, self.normalize_key(key), Config=self.transfer_config)
+
+    def publish_folder(self, local_folder: Path, prefix: StorageKey) -> None:
+        local_folder = Path(local_folder)
+        prefix = self.normalize_key(prefix)
+        files = [path for path in local_folder.rglob('*') if path.is_file()]
+
+        def upload(path: Path) -> None:
+            key = f'{prefix}/{path.relative_to(local_folder).as_posix()}'
+            self.client.upload_file(str(path), self.bucket, key, Config=self.transfer_config)
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            list(executor.map(upload, files))
+        # El contenido ya vive en el bucket, la copia local sólo era de trabajo.
+        shutil.rmtree(local_folder, ignore_errors=True)
+
+    def copy_prefix(self, source: StorageKey, target: StorageKey) -> int:
+        source, target = self.normalize_key(source), self.normalize_key(target)
+        paginator = self.client.get_paginator('list_objects_v2')
+        keys = [item['Key'] for page in paginator.paginate(Bucket=self.bucket, Prefix=f'{source}/') for item in page.get('Contents', [])]
+
+        def copy(key: str) -> None:
+            # Copia del lado del servidor (multipart para los objetos grandes).
+            self.client.copy({'Bucket': self.bucket, 'Key': key}, self.bucket, target + key[len(source):], Config=self.transfer_config)
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            list(executor.map(copy, keys))
+        return len(keys)
+
+    def open(self, key: StorageKey) -> BinaryIO:
+        return self.client.get_object(Bucket=self.bucket, Key=self.normalize_key(key))['Body']
+
+    def iter_chunks(self, key: StorageKey, start: int = 0, end: Optional[int] = None) -> Iterator[bytes]:
+        params = {'Bucket': self.bucket, 'Key': self.normalize_key(key)}
+        if start or end is not None:
+            params['Range'] = f"bytes={start}-{'' if end is None else end}"
+        body = self.client.get_object(**params)['Body']
+        try:
+            yield from body.iter_chunks(self.chunk_size)
+        finally:
+            body.close()
+
+    def exists(self, key: StorageKey) -> bool:
+        key = self.normalize_key(key)
+        if self.cache is not None and self.cache.get(key) is not None:
+            return True
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=key)
+            return True
+        except self._client_error as e:
+            if e.response.get('Error', {}).get('Code') in ('404', 'NoSuchKey', 'NotFound'):
+                return False
+            raise
+
+    def size(self, key: StorageKey) -> int:
+        return self.client.head_object(Bucket=self.bucket, Key=self.normalize_key(key))['ContentLength']
+
+    def delete_prefix(self, prefix: StorageKey) -> None:
+        prefix = self.normalize_key(prefix)
+        paginator = self.client.get_paginator('list_objects_v2')
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=f'{prefix}/'):
+            objects = [{'Key': item['Key']} for item in page.get('Contents', [])]
+            if objects:
+                self.client.delete_objects(Bucket=self.bucket, Delete={'Objects': objects, 'Quiet': True})
+        if self.cache is not None:
+            self.cache.invalidate_prefix(prefix)
+
+    def local_path(self, key: StorageKey) -> Optional[Path]:
+        if self.cache is None:
+            return None
+        key = self.normalize_key(key)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+        return self.cache.fetch(
+            key,
+            self.size(key),
+            lambda target: self.client.download_file(self.bucket, key, str(target), Config=self.transfer_config),
+        )
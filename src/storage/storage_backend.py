@@ -0,0 +1,73 @@
+from abc import ABC, abstractmethod
+from pathlib import Path, PurePosixPath
+from typing import BinaryIO, Iterator, Optional, Union
+
+StorageKey = Union[str, Path, PurePosixPath]
+
+class StorageBackend(ABC):
+    """Interfaz común para los almacenes del contenido de los libros.
+
+    Las claves (keys) son los mismos paths relativos que guardamos en la base de datos
+    (por ejemplo ``content/books/<...>/extracted/OEBPS/ch1.xhtml``), así el backend local
+    sigue siendo compatible con los libros que ya existen.
+    """
+    chunk_size: int = 1024 * 1024
+
+    @staticmethod
+    def normalize_key(key: StorageKey) -> str:
+        """Normaliza una key a formato posix, sin './' ni '/' al inicio.
+
+        Args:
+            key (StorageKey): Path o key a normalizar.
+
+        Returns:
+            str: Devuelve la key normalizada.
+        """
+        return PurePosixPath(str(key).replace('\\', '/')).as_posix().lstrip('/')
+
+    @abstractmethod
+    def save(self, key: StorageKey, fileobj: BinaryIO) -> None:
+        """Guarda (en streaming) el contenido de un archivo abierto bajo la key indicada."""
+
+    @abstractmethod
+    def publish_folder(self, local_folder: Path, prefix: StorageKey) -> None:
+        """Publica una carpeta local ya procesada bajo el prefijo indicado.
+
+        La carpeta local puede dejar de existir después de publicarse.
+        """
+
+    @abstractmethod
+    def copy_prefix(self, source: StorageKey, target: StorageKey) -> int:
+        """Copia todos los objetos bajo ``source`` a ``target`` (pisando los que ya existan).
+
+        Returns:
+            int: Devuelve la cantidad de objetos copiados.
+        """
+
+    @abstractmethod
+    def open(self, key: StorageKey) -> BinaryIO:
+        """Abre el objeto para lectura."""
+
+    @abstractmethod
+    def iter_chunks(self, key: StorageKey, start: int = 0, end: Optional[int] = None) -> Iterator[bytes]:
+        """Lee el objeto por partes, opcionalmente sólo el rango [start, end]."""
+
+    @abstractmethod
+    def exists(self, key: StorageKey) -> bool:
+        """Indica si el objeto existe."""
+
+    @abstractmethod
+    def size(self, key: StorageKey) -> int:
+        """Devuelve el tamaño del objeto en bytes."""
+
+    @abstractmethod
+    def delete_prefix(self, prefix: StorageKey) -> None:
+        """Elimina todos los objetos bajo el prefijo indicado."""
+
+    @abstractmethod
+    def local_path(self, key: StorageKey) -> Optional[Path]:
+        """Devuelve un path local legible para el objeto, o None si sólo puede leerse en streaming."""
+
+    def read_bytes(self, key: StorageKey) -> bytes:
+        with self.open(key) as stream:
+            return stream.read()
@@ -0,0 +1,108 @@
+import hashlib
+import itertools
+import os
+import shutil
+import threading
+import time
+from collections import OrderedDict, deque
+from pathlib import Path
+from typing import Callable, Optional
+
+class StorageCache:
+    def __init__(self, cache_dir: str, max_bytes: int, max_object_bytes: int, delete_delay: float = 60.0) -> None:
+        """Caché local de lectura (read-through) con desalojo LRU por tamaño. Pensado para
+        los capítulos "calientes" cuando el contenido vive en un almacén remoto.
+
+        Cada proceso usa su propia subcarpeta, así varios workers no se pisan entre sí.
+
+        Los paths devueltos se abren después (FileResponse lo hace recién al enviar), así que
+        los archivos desalojados o invalidados se borran delete_delay segundos más tarde. Cada
+        versión de un objeto tiene su propio archivo: volver a cachearlo no pisa al anterior, ni
+        el borrado pendiente del anterior se lleva al nuevo.
+
+        Args:
+            cache_dir (str): Carpeta base de la caché.
+            max_bytes (int): Tamaño máximo total de la caché.
+            max_object_bytes (int): Tamaño máximo de un objeto para ser cacheado.
+            delete_delay (float, optional): Segundos que se conserva un archivo desalojado. Defaults to 60.0.
+        """
+        self.cache_dir = Path(cache_dir) / str(os.getpid())
+        self.max_bytes = max_bytes
+        self.max_object_bytes = max_object_bytes
+        self.delete_delay = delete_delay
+        self._entries: OrderedDict[str, tuple[int, Path]] = OrderedDict()
+        self._total_bytes = 0
+        self._versions = itertools.count()
+        self._pending_deletes: deque[tuple[float, Path]] = deque()
+        self._lock = threading.Lock()
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{hashlib.sha1(key.encode('utf-8')).hexdigest()}.{next(self._versions)}"
+
+    def _discard(self, key: str) -> None:
+        """Saca la entrada del índice y agenda el borrado de su archivo (con el lock tomado)."""
+        size, path = self._entries.pop(key)
+        self._total_bytes -= size
+        self._pending_deletes.append((time.monotonic() + self.delete_delay, path))
+
+    def _delete_due(self) -> None:
+        """Borra los archivos cuyo plazo ya pasó (con el lock tomado)."""
+        now = time.monotonic()
+        while self._pending_deletes and self._pending_deletes[0][0] <= now:
+            self._pending_deletes.popleft()[1].unlink(missing_ok=True)
+
+    def get(self, key: str) -> Optional[Path]:
+        with self._lock:
+            if key not in self._entries:
+                return None
+            self._entries.move_to_end(key)
+            return self._entries[key][1]
+
+    def fetch(self, key: str, size: Optional[int], download: Callable[[Path], None]) -> Optional[Path]:
+        """Devuelve el path cacheado del objeto, descargándolo si hace falta.
+
+        Args:
+            key (str): Key del objeto.
+            size (Optional[int]): Tamaño del objeto (para decidir si se cachea). None si no se
+                conoce de antemano (por ejemplo, si el objeto se genera): se mide al guardarlo.
+            download (Callable[[Path], None]): Función que descarga (o genera) el objeto en el path dado.
+
+        Returns:
+            Optional[Path]: El path local, o None si el objeto es demasiado grande para la caché.
+        """
+        cached = self.get(key)
+        if cached is not None:
+            return cached
+        if size is not None and size > self.max_object_bytes:
+            return None
+
+        with self._lock:
+            target = self._path(key)
+        tmp = target.with_name(f'{target.name}.tmp')
+        download(tmp)
+        os.replace(tmp, target)
+        if size is None:
+            size = target.stat().st_size
+
+        with self._lock:
+            if key in self._entries:
+                # Otro hilo lo cacheó mientras lo descargábamos: nadie más vio nuestra copia.
+                target.unlink(missing_ok=True)
+                target = self._entries[key][1]
+            else:
+                self._entries[key] = (size, target)
+                self._total_bytes += size
+            self._entries.move_to_end(key)
+            # Desalojamos los menos usados hasta volver al límite.
+            while self._total_bytes > self.max_bytes and len(self._entries) > 1:
+                self._discard(next(iter(self._entries)))
+            self._delete_due()
+        return target
+
+    def invalidate_prefix(self, prefix: str) -> None:
+        with self._lock:
+            for key in [k for k in self._entries if k.startswith(prefix)]:
+                self._discard(key)
+            self._delete_due()
@@ -0,0 +1,18 @@
+import os
+import shutil
+from pathlib import Path
+from dotenv import load_dotenv
+
+def reset_metrics_dir() -> None:
+    """Vacía PROMETHEUS_MULTIPROC_DIR antes de arrancar la API, para no mezclar métricas
+    de ejecuciones anteriores. Debe llamarse antes de importar prometheus_metrics: al
+    definir las métricas cada proceso ya abre sus archivos en ese directorio.
+    """
+    load_dotenv()
+    metrics_dir = os.getenv('PROMETHEUS_MULTIPROC_DIR')
+    if not metrics_dir:
+        return
+    path = Path(metrics_dir)
+    if path.exists():
+        shutil.rmtree(path)
+    path.mkdir(parents=True)
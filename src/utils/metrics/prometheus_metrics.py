@@ -0,0 +1,119 @@
+"""Métricas de Prometheus de la API.
+
+Con varios workers de uvicorn hay que definir PROMETHEUS_MULTIPROC_DIR (un directorio
+vacío y escribible): cada proceso escribe sus valores ahí y /metrics los agrega. La
+variable se lee al importar prometheus_client, por eso cargamos el .env antes, y el
+directorio se vacía en main.py antes de importar este módulo (ver metrics_dir.py).
+"""
+import os
+import time
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, generate_latest, multiprocess, REGISTRY
+from sqlalchemy import Engine
+
+MULTIPROC_DIR: Optional[str] = os.getenv('PROMETHEUS_MULTIPROC_DIR') or None
+
+# Los gauges se suman entre los workers vivos.
+_GAUGE_MODE = 'livesum'
+
+# ============================== HTTP ==============================
+REQUEST_LATENCY = Histogram(
+    'skoob_http_request_duration_seconds', 'Latencia de las peticiones HTTP por ruta.',
+    ['method', 'route', 'status'],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+REQUESTS_IN_FLIGHT = Gauge(
+    'skoob_http_requests_in_flight', 'Peticiones HTTP en curso.',
+    ['method'], multiprocess_mode=_GAUGE_MODE,
+)
+RESPONSE_BYTES = Counter(
+    'skoob_http_response_bytes', 'Bytes del cuerpo de las respuestas enviadas por la API.',
+    ['route'],
+)
+FILES_SERVED = Counter(
+    'skoob_files_served', 'Archivos servidos desde el almacén, por modo de envío.',
+    ['mode'],
+)
+
+RATE_LIMITED = Counter(
+    'skoob_rate_limited', 'Peticiones rechazadas con 429 por el control de admisión.',
+    ['route', 'scope'],
+)
+
+# ============================== Recursos ==============================
+THREADPOOL_IN_USE = Gauge(
+    'skoob_threadpool_in_use', 'Hilos del threadpool de anyio ocupados (rutas síncronas).',
+    multiprocess_mode=_GAUGE_MODE,
+)
+THREADPOOL_SIZE = Gauge(
+    'skoob_threadpool_size', 'Tamaño del threadpool de anyio.',
+    multiprocess_mode=_GAUGE_MODE,
+)
+DB_POOL_CHECKED_OUT = Gauge(
+    'skoob_db_pool_checked_out', 'Conexiones de la base de datos en uso.',
+    multiprocess_mode=_GAUGE_MODE,
+)
+DB_POOL_SIZE = Gauge(
+    'skoob_db_pool_size', 'Tamaño configurado del pool de conexiones.',
+    multiprocess_mode=_GAUGE_MODE,
+)
+DB_POOL_OVERFLOW = Gauge(
+    'skoob_db_pool_overflow', 'Conexiones abiertas por encima del tamaño del pool.',
+    multiprocess_mode=_GAUGE_MODE,
+)
+
+# ============================== Ingesta ==============================
+INGEST_STAGE_SECONDS = Histogram(
+    'skoob_ingest_stage_duration_seconds', 'Duración de cada etapa de la ingesta de libros.',
+    ['stage'],
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60),
+)
+INGEST_BOOK_BYTES = Histogram(
+    'skoob_ingest_book_bytes', 'Tamaño del archivo original de los libros subidos.',
+    buckets=(64e3, 256e3, 1e6, 4e6, 16e6, 64e6, 256e6),
+)
+INGEST_BOOK_CHAPTERS = Histogram(
+    'skoob_ingest_book_chapters', 'Capítulos (elementos del spine) de los libros subidos.',
+    buckets=(1, 5, 10, 25, 50, 100, 250, 500, 1000),
+)
+
+@contextmanager
+def stage_timer(stage: str) -> Iterator[None]:
+    """Mide la duración de una etapa de la ingesta (también si falla)."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        INGEST_STAGE_SECONDS.labels(stage).observe(time.perf_counter() - start)
+
+def observe_db_pool(engine: Optional[Engine]) -> None:
+    """Actualiza los gauges del pool de conexiones (sólo para QueuePool)."""
+    pool = getattr(engine, 'pool', None)
+    if pool is None or not hasattr(pool, 'checkedout'):
+        return
+    DB_POOL_CHECKED_OUT.set(pool.checkedout())
+    DB_POOL_SIZE.set(pool.size())
+    DB_POOL_OVERFLOW.set(max(0, pool.overflow()))
+
+def render_latest() -> tuple[bytes, str]:
+    """Genera el texto de exposición de Prometheus (agregando los workers si hay varios).
+
+    Returns:
+        tuple[bytes, str]: Devuelve el contenido y su content-type.
+    """
+    if MULTIPROC_DIR:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
+
+def mark_worker_dead() -> None:
+    """Quita los gauges 'live' del worker que termina."""
+    if MULTIPROC_DIR:
+        multiprocess.mark_process_dead(os.getpid())
@@ -0,0 +1,184 @@
+"""Lectura y renderizado de PDFs con PyMuPDF (dependencia opcional, se importa en el primer uso).
+
+La ingesta sólo lee metadatos, el outline y el texto de cada página (sin rasterizar); las
+páginas se renderizan bajo demanda.
+"""
+import hashlib
+import os
+import re
+import shutil
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import TYPE_CHECKING, BinaryIO, Callable, Optional, Union
+
+if TYPE_CHECKING:
+    import pymupdf
+
+# MuPDF no es thread-safe (ni siquiera con documentos distintos): cada llamada a PyMuPDF se
+# hace con este lock, que se suelta entre llamadas para que otros hilos puedan intercalarse.
+PDF_LOCK = threading.Lock()
+PAGE_SEPARATOR = '\f'
+_PDF_DATE_RE = re.compile(r'^D:(\d{4})(\d{2})?(\d{2})?')
+
+def _open(source: Union[Path, str, bytes]) -> 'pymupdf.Document':
+    import pymupdf
+    if isinstance(source, bytes):
+        return pymupdf.open(stream=source, filetype='pdf')
+    return pymupdf.open(source, filetype='pdf')
+
+def _pdf_date(value: Optional[str]) -> Optional[str]:
+    """'D:20240131120000Z' -> '2024-01-31'."""
+    match = _PDF_DATE_RE.match(value or '')
+    if not match:
+        return None
+    return '-'.join(part for part in match.groups() if part)
+
+def read_pdf(pdf_path: Path, text_path: Path) -> dict:
+    """Lee metadatos, outline y texto de un PDF. El texto de todas las páginas se escribe en
+    text_path (separado por form feeds) y de cada página se guarda su offset en bytes.
+
+    Args:
+        pdf_path (Path): Path del PDF.
+        text_path (Path): Path del archivo de texto a generar.
+
+    Raises:
+        ValueError: Si el archivo no es un PDF válido o está cifrado.
+
+    Returns:
+        dict: Devuelve {'metadata', 'outline': [(nivel, título, página desde 0)], 'pages': [{'text_offset', 'byte_size', 'word_count', 'content_hash'}]}.
+    """
+    try:
+        with PDF_LOCK:
+            document = _open(pdf_path)
+    except RuntimeError as error:  # pymupdf.FileDataError y similares.
+        raise ValueError('not a valid PDF') from error
+
+    try:
+        with PDF_LOCK:
+            if document.needs_pass:
+                raise ValueError('encrypted PDF')
+            info = document.metadata or {}
+            language = getattr(document, 'language', None)
+            toc = document.get_toc(simple=True)
+            page_count = document.page_count
+        metadata = {
+            'title': info.get('title') or None,
+            'creator': info.get('author') or None,
+            'description': info.get('subject') or None,
+            'category': info.get('keywords') or None,
+            'publisher': info.get('producer') or None,
+            'publish_date': _pdf_date(info.get('creationDate')),
+            'language': language,
+        }
+        outline = [(level, title, page - 1) for level, title, page, *_ in toc if page >= 1]
+
+        pages, offset = [], 0
+        with open(text_path, 'wb') as text_file:
+            for index in range(page_count):
+                # Sólo la extracción toma el lock; el hash y la escritura no.
+                with PDF_LOCK:
+                    text = document[index].get_text('text').encode('utf-8')
+                text_file.write(text + PAGE_SEPARATOR.encode('utf-8'))
+                pages.append({
+                    'text_offset': offset,
+                    'byte_size': len(text),
+                    'word_count': len(text.split()),
+                    'content_hash': hashlib.sha256(text).hexdigest(),
+                })
+                offset += len(text) + len(PAGE_SEPARATOR)
+    finally:
+        with PDF_LOCK:
+            document.close()
+    return {'metadata': metadata, 'outline': outline, 'pages': pages}
+
+def _render(document: 'pymupdf.Document', page_index: int, zoom: float) -> bytes:
+    import pymupdf
+    pixmap = document[page_index].get_pixmap(matrix=pymupdf.Matrix(zoom, zoom), alpha=False)
+    return pixmap.tobytes('png')
+
+def render_page(source: Union[Path, str, bytes], page_index: int, zoom: float = 1.0) -> bytes:
+    """Renderiza una página del PDF como PNG.
+
+    Args:
+        source (Union[Path, str, bytes]): Path del PDF o su contenido.
+        page_index (int): Página a renderizar (desde 0).
+        zoom (float, optional): Escala (1.0 = 72 dpi). Defaults to 1.0.
+
+    Returns:
+        bytes: Devuelve la imagen PNG.
+    """
+    with PDF_LOCK, _open(source) as document:
+        return _render(document, page_index, zoom)
+
+class PdfDocuments:
+    def __init__(self, max_documents: int, copies_dir: str) -> None:
+        """PDFs abiertos hace poco (LRU por cantidad), para renderizar sus páginas sin volver a
+        abrirlos. Si el almacén no da un path local (S3 sin caché, o un PDF más grande que la
+        caché), el PDF se descarga una sola vez a copies_dir y la copia vive lo que el documento.
+
+        Cada proceso usa su propia subcarpeta, así varios workers no se pisan entre sí.
+
+        Args:
+            max_documents (int): Cantidad máxima de documentos abiertos.
+            copies_dir (str): Carpeta base de las copias locales.
+        """
+        self.max_documents = max(1, max_documents)
+        self.copies_dir = Path(copies_dir) / str(os.getpid())
+        # El diccionario se usa siempre con PDF_LOCK: así nadie cierra un documento que otro
+        # hilo está renderizando.
+        self._documents: OrderedDict[str, tuple['pymupdf.Document', Optional[Path]]] = OrderedDict()
+        shutil.rmtree(self.copies_dir, ignore_errors=True)
+        self.copies_dir.mkdir(parents=True, exist_ok=True)
+
+    def _copy_path(self, key: str) -> Path:
+        return self.copies_dir / f"{hashlib.sha1(key.encode('utf-8')).hexdigest()}.pdf"
+
+    def _close(self, key: str) -> None:
+        document, copy = self._documents.pop(key)
+        document.close()
+        if copy is not None:
+            copy.unlink(missing_ok=True)
+
+    def render(self, key: str, page_index: int, zoom: float, local_path: Callable[[], Optional[Path]], open_stream: Callable[[], BinaryIO]) -> bytes:
+        """Renderiza una página como PNG, abriendo el PDF sólo si no está abierto.
+
+        Args:
+            key (str): Key del PDF.
+            page_index (int): Página a renderizar (desde 0).
+            zoom (float): Escala (1.0 = 72 dpi).
+            local_path (Callable[[], Optional[Path]]): Devuelve un path local del PDF, o None si no hay.
+            open_stream (Callable[[], BinaryIO]): Abre el PDF para leerlo en streaming (para la copia).
+
+        Returns:
+            bytes: Devuelve la imagen PNG.
+        """
+        with PDF_LOCK:
+            if key in self._documents:
+                self._documents.move_to_end(key)
+                return _render(self._documents[key][0], page_index, zoom)
+
+        # La descarga se hace sin el lock.
+        path, copy = local_path(), None
+        if path is None:
+            path = copy = self._copy_path(key)
+            tmp = copy.with_suffix(f'.{threading.get_ident()}.tmp')
+            with open_stream() as stream, open(tmp, 'wb') as file:
+                shutil.copyfileobj(stream, file, 1024 * 1024)
+            os.replace(tmp, copy)
+
+        with PDF_LOCK:
+            if key not in self._documents:
+                # MuPDF mantiene el archivo abierto: si después se borra (la caché del almacén
+                # lo desaloja), el documento se sigue leyendo.
+                self._documents[key] = (_open(path), copy)
+                while len(self._documents) > self.max_documents:
+                    self._close(next(iter(self._documents)))
+            self._documents.move_to_end(key)
+            return _render(self._documents[key][0], page_index, zoom)
+
+    def forget(self, key: str) -> None:
+        """Cierra el documento (y borra su copia), por ejemplo al borrar el libro."""
+        with PDF_LOCK:
+            if key in self._documents:
+                self._close(key)
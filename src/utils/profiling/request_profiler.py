@@ -0,0 +1,137 @@
+"""Profile con cProfile de peticiones puntuales.
+
+Un admin firma (HMAC) un permiso para un path y una fecha de expiración; las peticiones
+que llegan con ese valor en la cabecera ``X-Profile`` ejecutan su endpoint bajo cProfile.
+El resultado se guarda en PROFILES_DIR (compartido entre workers) y su id vuelve en la
+cabecera ``X-Profile-Id``.
+"""
+import cProfile
+import functools
+import hashlib
+import hmac
+import inspect
+import io
+import os
+import pstats
+import time
+import uuid
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+from dotenv import load_dotenv
+from fastapi import Request, Response
+from fastapi.routing import APIRoute
+
+from src.utils.profiling.sampling_profiler import PROFILE_LOCK
+
+load_dotenv()
+
+PROFILE_HEADER = 'X-Profile'
+PROFILE_ID_HEADER = 'X-Profile-Id'
+PROFILES_DIR = Path(os.getenv('PROFILES_DIR', './content/profiles'))
+
+_active_profile: ContextVar[Optional[cProfile.Profile]] = ContextVar('active_profile', default=None)
+
+def _secret() -> bytes:
+    return (os.getenv('PROFILE_SECRET') or os.getenv('JWT_SECRET_KEY', 'supersecretkey')).encode()
+
+def _signature(path: str, expires: int) -> str:
+    return hmac.new(_secret(), f'{expires}:{path}'.encode(), hashlib.sha256).hexdigest()
+
+def sign_profile_request(path: str, ttl_seconds: int) -> str:
+    """Genera el valor de la cabecera X-Profile para ``path``, válido ``ttl_seconds`` segundos."""
+    expires = int(time.time()) + ttl_seconds
+    return f'{expires}.{_signature(path, expires)}'
+
+def verify_profile_request(path: str, value: Optional[str]) -> bool:
+    if not value or '.' not in value:
+        return False
+    expires, signature = value.split('.', 1)
+    if not expires.isdigit() or int(expires) < time.time():
+        return False
+    return hmac.compare_digest(signature, _signature(path, int(expires)))
+
+def profile_path(profile_id: str, suffix: str) -> Optional[Path]:
+    """Path del resultado de un profile (None si el id no es válido)."""
+    try:
+        uuid.UUID(profile_id)
+    except ValueError:
+        return None
+    return PROFILES_DIR / f'{profile_id}.{suffix}'
+
+def save_profile(profiler: cProfile.Profile, label: str) -> str:
+    """Guarda el profile (binario para snakeviz/pstats y un resumen de texto).
+
+    Returns:
+        str: Devuelve el id del profile.
+    """
+    profile_id = str(uuid.uuid4())
+    PROFILES_DIR.mkdir(parents=True, exist_ok=True)
+    profiler.dump_stats(profile_path(profile_id, 'prof'))
+    text = io.StringIO()
+    text.write(f'{label}\n\n')
+    pstats.Stats(profiler, stream=text).sort_stats('cumulative').print_stats(60)
+    profile_path(profile_id, 'txt').write_text(text.getvalue())
+    return profile_id
+
+def _profiled_call(call: Callable) -> Callable:
+    """Envuelve el endpoint para que corra bajo cProfile si la petición lo pidió. El
+    wrapper corre en el mismo hilo que el endpoint (el del threadpool en rutas síncronas),
+    que es el único que cProfile ve.
+    """
+    if inspect.iscoroutinefunction(call):
+        # En endpoints async el profile también ve las otras corrutinas que el event loop
+        # intercale mientras el endpoint espera.
+        @functools.wraps(call)
+        async def async_wrapper(*args, **kwargs) -> Any:
+            profiler = _active_profile.get()
+            if profiler is None:
+                return await call(*args, **kwargs)
+            profiler.enable()
+            try:
+                return await call(*args, **kwargs)
+            finally:
+                profiler.disable()
+        return async_wrapper
+
+    @functools.wraps(call)
+    def wrapper(*args, **kwargs) -> Any:
+        profiler = _active_profile.get()
+        if profiler is None:
+            return call(*args, **kwargs)
+        profiler.enable()
+        try:
+            return call(*args, **kwargs)
+        finally:
+            profiler.disable()
+    return wrapper
+
+class ProfiledAPIRoute(APIRoute):
+    """APIRoute que permite profilear peticiones con una cabecera X-Profile firmada."""
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.dependant.call = _profiled_call(self.dependant.call)
+
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+
+        async def profiled_handler(request: Request) -> Response:
+            if PROFILE_HEADER.lower() not in request.headers:
+                return await handler(request)
+            if not verify_profile_request(request.url.path, request.headers[PROFILE_HEADER.lower()]):
+                return await handler(request)
+            if not PROFILE_LOCK.acquire(blocking=False):
+                response = await handler(request)
+                response.headers[PROFILE_ID_HEADER] = 'busy'
+                return response
+            profiler = cProfile.Profile()
+            token = _active_profile.set(profiler)
+            try:
+                response = await handler(request)
+            finally:
+                _active_profile.reset(token)
+                PROFILE_LOCK.release()
+            response.headers[PROFILE_ID_HEADER] = save_profile(profiler, f'{request.method} {request.url.path}')
+            return response
+        return profiled_handler
@@ -0,0 +1,77 @@
+"""Profiler por muestreo del worker en ejecución.
+
+Un hilo toma cada ``interval`` segundos la pila de todos los hilos del proceso
+(``sys._current_frames``) y acumula cuántas veces se vio cada pila. El resultado se
+exporta en formato "collapsed" (``frame;frame;frame N``), el que consumen
+flamegraph.pl, speedscope o inferno.
+"""
+import sys
+import threading
+import time
+from collections import Counter
+from types import FrameType
+from typing import Optional
+
+# Sólo un profile (por muestreo o cProfile) a la vez por proceso.
+PROFILE_LOCK = threading.Lock()
+
+class ProfilerBusy(RuntimeError):
+    """Ya hay otro profile corriendo en este worker."""
+
+def _frame_label(frame: FrameType) -> str:
+    code = frame.f_code
+    module = frame.f_globals.get('__name__', code.co_filename)
+    return f'{module}:{code.co_name}:{frame.f_lineno}'
+
+def _collapse(frame: Optional[FrameType], max_depth: int) -> str:
+    labels = []
+    while frame is not None and len(labels) < max_depth:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    return ';'.join(reversed(labels))
+
+class SamplingProfiler:
+    def __init__(self, interval: float = 0.01, max_depth: int = 128) -> None:
+        """
+        Args:
+            interval (float, optional): Segundos entre muestras. Defaults to 0.01.
+            max_depth (int, optional): Frames máximos por pila. Defaults to 128.
+        """
+        self.interval = interval
+        self.max_depth = max_depth
+        self.stacks: Counter[str] = Counter()
+        self.samples: int = 0
+
+    def sample(self, ignore_thread: int) -> None:
+        names = {thread.ident: thread.name.replace(' ', '_') for thread in threading.enumerate()}
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == ignore_thread:
+                continue
+            stack = _collapse(frame, self.max_depth)
+            self.stacks[f'{names.get(thread_id, thread_id)};{stack}'] += 1
+        self.samples += 1
+
+    def run(self, seconds: float) -> str:
+        """Muestrea el proceso durante ``seconds`` segundos (bloquea el hilo que llama).
+
+        Raises:
+            ProfilerBusy: Si ya hay un profile en curso.
+
+        Returns:
+            str: Devuelve las pilas en formato collapsed.
+        """
+        if not PROFILE_LOCK.acquire(blocking=False):
+            raise ProfilerBusy('A profile is already running in this worker')
+        try:
+            me = threading.get_ident()
+            deadline = time.monotonic() + seconds
+            while time.monotonic() < deadline:
+                started = time.monotonic()
+                self.sample(ignore_thread=me)
+                time.sleep(max(0.0, self.interval - (time.monotonic() - started)))
+        finally:
+            PROFILE_LOCK.release()
+        return self.collapsed()
+
+    def collapsed(self) -> str:
+        return ''.join(f'{stack} {count}\n' for stack, count in self.stacks.most_common())
@@ -0,0 +1,96 @@
+"""División de capítulos enormes en fragmentos que el lector puede cargar de a uno.
+
+Algunos EPUBs ponen todo el libro en uno o dos archivos del spine. Cortamos el <body>
+entre elementos de bloque (nunca dentro de un párrafo): cada fragmento es un documento
+completo con el mismo <head> y los mismos contenedores que el original, para que los
+estilos se apliquen igual.
+"""
+import copy
+from typing import Optional
+
+from lxml import etree
+
+from src.utils.reader.reader_variant import parse_chapter, serialize_chapter
+
+# Contenedores que atravesamos cuando envuelven a todo el capítulo (<body><div>...</div></body>).
+_WRAPPER_TAGS = frozenset(('div', 'section', 'article', 'main'))
+
+def _local_name(element) -> str:
+    return etree.QName(element.tag).localname.lower() if isinstance(element.tag, str) else ''
+
+def _ids(element) -> list[str]:
+    return [node.get('id') for node in element.iter() if isinstance(node.tag, str) and node.get('id')]
+
+def split_chapter(data: bytes, max_bytes: int, html_output: bool = False) -> Optional[list[tuple[bytes, list[str]]]]:
+    """Divide un capítulo en fragmentos de hasta max_bytes (aproximadamente).
+
+    Un bloque más grande que max_bytes queda entero en su propio fragmento.
+
+    Args:
+        data (bytes): Contenido del capítulo.
+        max_bytes (int): Tamaño objetivo de cada fragmento.
+        html_output (bool, optional): Serializar como HTML en lugar de XHTML. Defaults to False.
+
+    Returns:
+        Optional[list[tuple[bytes, list[str]]]]: Devuelve [(fragmento, ids que contiene)], o None si no hace falta dividirlo.
+    """
+    if len(data) <= max_bytes:
+        return None
+    root = parse_chapter(data)
+    body = next((node for node in root.iter() if _local_name(node) == 'body'), None)
+    if body is None:
+        return None
+
+    # Bajamos por los contenedores que envuelven a todo el capítulo.
+    chain = [body]
+    while True:
+        children = [child for child in chain[-1] if isinstance(child.tag, str)]
+        if (
+            len(children) == 1 and _local_name(children[0]) in _WRAPPER_TAGS and len(children[0])
+            and not (chain[-1].text or '').strip() and not (children[0].tail or '').strip()
+        ):
+            chain.append(children[0])
+        else:
+            break
+    container = chain[-1]
+
+    groups, current, size = [], [], 0
+    for child in container:
+        child_size = len(etree.tostring(child, encoding='utf-8'))
+        if current and size + child_size > max_bytes:
+            groups.append(current)
+            current, size = [], 0
+        current.append(child)
+        size += child_size
+    if current:
+        groups.append(current)
+    if len(groups) < 2:
+        return None
+
+    # Todo lo que no es el contenido a dividir (head, atributos de los contenedores) se repite en cada fragmento.
+    for child in list(container):
+        container.remove(child)
+    leading_text, container.text = container.text, None
+    shared_ids = _ids(root)
+    fragments = []
+    for index, group in enumerate(groups):
+        document = copy.deepcopy(root)
+        target = _same_node(document, root, container)
+        if index == 0:
+            target.text = leading_text
+        for element in group:
+            target.append(element)
+        ids = (shared_ids if index == 0 else []) + [i for element in group for i in _ids(element)]
+        fragments.append((serialize_chapter(document, html_output), ids))
+    return fragments
+
+def _same_node(document, root, node):
+    """Devuelve el nodo de la copia del documento que ocupa el mismo lugar que node en root."""
+    positions = []
+    while node is not root:
+        parent = node.getparent()
+        positions.append(parent.index(node))
+        node = parent
+    for position in reversed(positions):
+        document = document[position]
+    return document
@@ -0,0 +1,59 @@
+"""Tamaño intrínseco de imágenes leyendo sólo la cabecera (PNG, JPEG, GIF y WebP)."""
+import struct
+from typing import Optional
+
+# Suficiente para la cabecera de casi cualquier imagen (los JPEG con miniaturas EXIF
+# grandes pueden tener el SOF más adelante; en ese caso no devolvemos tamaño).
+HEADER_BYTES = 256 * 1024
+
+def _jpeg_size(data: bytes) -> Optional[tuple[int, int]]:
+    i = 2
+    while i + 9 < len(data):
+        if data[i] != 0xFF:
+            i += 1
+            continue
+        marker = data[i + 1]
+        if marker in (0xD8, 0x01) or 0xD0 <= marker <= 0xD7 or marker == 0xFF:
+            i += 1 if marker == 0xFF else 2
+            continue
+        (length,) = struct.unpack('>H', data[i + 2:i + 4])
+        # SOF0..SOF15, salvo DHT (C4), JPG (C8) y DAC (CC).
+        if 0xC0 <= marker <= 0xCF and marker not in (0xC4, 0xC8, 0xCC):
+            height, width = struct.unpack('>HH', data[i + 5:i + 9])
+            return width, height
+        i += 2 + length
+    return None
+
+def _webp_size(data: bytes) -> Optional[tuple[int, int]]:
+    chunk = data[12:16]
+    if chunk == b'VP8 ' and len(data) >= 30:
+        width, height = struct.unpack('<HH', data[26:30])
+        return width & 0x3FFF, height & 0x3FFF
+    if chunk == b'VP8L' and len(data) >= 25:
+        bits = int.from_bytes(data[21:25], 'little')
+        return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+    if chunk == b'VP8X' and len(data) >= 30:
+        return int.from_bytes(data[24:27], 'little') + 1, int.from_bytes(data[27:30], 'little') + 1
+    return None
+
+def image_size(data: bytes) -> Optional[tuple[int, int]]:
+    """Devuelve (ancho, alto) de la imagen, o None si el formato no se reconoce.
+
+    Args:
+        data (bytes): Comienzo del archivo (con HEADER_BYTES alcanza).
+
+    Returns:
+        Optional[tuple[int, int]]: Devuelve el tamaño en píxeles.
+    """
+    try:
+        if data.startswith(b'\x89PNG\r\n\x1a\n') and data[12:16] == b'IHDR':
+            return struct.unpack('>II', data[16:24])
+        if data[:6] in (b'GIF87a', b'GIF89a'):
+            return struct.unpack('<HH', data[6:10])
+        if data.startswith(b'\xff\xd8'):
+            return _jpeg_size(data)
+        if data[:4] == b'RIFF' and data[8:12] == b'WEBP':
+            return _webp_size(data)
+    except struct.error:
+        return None
+    return None
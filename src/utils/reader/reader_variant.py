@@ -0,0 +1,162 @@
+"""Variante "lector" de los capítulos: XHTML minificado y saneado para servir al lector.
+
+- Quita scripts, comentarios, instrucciones de procesamiento, atributos on* y enlaces
+  javascript:, y los namespaces que no se usan.
+- Colapsa los espacios (salvo en <pre>) y elimina los que separan elementos de bloque.
+- Agrega loading="lazy" y el tamaño intrínseco a las imágenes, para que el lector
+  reserve el espacio y no haya saltos de layout.
+- Apunta los CSS duplicados a una única copia minificada.
+"""
+import re
+from typing import Callable, Optional
+
+from lxml import etree, html
+
+_CSS_TOKEN_RE = re.compile(r'("(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\')|/\*.*?\*/', re.S)
+_CSS_SPACES_RE = re.compile(r'\s+')
+_CSS_PUNCTUATION_RE = re.compile(r'\s*([{};,>])\s*')
+_CSS_COLON_RE = re.compile(r':\s+')
+# "prop : valor" dentro de un bloque; "a :hover{" es un selector y no se toca.
+_CSS_PROPERTY_COLON_RE = re.compile(r'([{;][-\w]+) :(?=[^{};]*[;}])')
+_SPACES_RE = re.compile(r'\s+')
+
+# Entre estos elementos los espacios no se renderizan.
+_BLOCK_TAGS = frozenset((
+    'html', 'head', 'body', 'title', 'meta', 'link', 'style', 'div', 'p', 'section', 'article',
+    'header', 'footer', 'nav', 'aside', 'main', 'blockquote', 'figure', 'figcaption', 'hr',
+    'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'ul', 'ol', 'li', 'dl', 'dt', 'dd', 'table', 'thead',
+    'tbody', 'tfoot', 'tr', 'td', 'th', 'caption', 'pre',
+))
+_PRESERVE_SPACE_TAGS = frozenset(('pre', 'textarea', 'script', 'style'))
+
+def minify_css(css: str) -> str:
+    """Minifica CSS sin cambiar su significado: quita comentarios y espacios sobrantes,
+    respetando el contenido de los strings.
+    """
+    parts, last = [], 0
+    for match in _CSS_TOKEN_RE.finditer(css):
+        parts.append(_minify_css_code(css[last:match.start()]))
+        if match.group(1):  # Los strings quedan intactos; los comentarios se descartan.
+            parts.append(match.group(1))
+        last = match.end()
+    parts.append(_minify_css_code(css[last:]))
+    return ''.join(parts).replace(';}', '}').strip()
+
+def _minify_css_code(code: str) -> str:
+    code = _CSS_SPACES_RE.sub(' ', code)
+    code = _CSS_PUNCTUATION_RE.sub(r'\1', code)
+    code = _CSS_COLON_RE.sub(':', code)
+    return _CSS_PROPERTY_COLON_RE.sub(r'\1:', code)
+
+def _local_name(element) -> str:
+    tag = element.tag
+    return etree.QName(tag).localname.lower() if isinstance(tag, str) else ''
+
+def _is_block(element) -> bool:
+    return element is None or _local_name(element) in _BLOCK_TAGS
+
+def _collapse_spaces(element, preserve: bool = False) -> None:
+    preserve = preserve or _local_name(element) in _PRESERVE_SPACE_TAGS
+    children = list(element)
+    if not preserve and element.text is not None:
+        if element.text.strip() or not (_is_block(element) and children and _is_block(children[0])):
+            element.text = _SPACES_RE.sub(' ', element.text)
+        else:
+            element.text = None
+    for index, child in enumerate(children):
+        _collapse_spaces(child, preserve)
+        if preserve or child.tail is None:
+            continue
+        following = children[index + 1] if index + 1 < len(children) else None
+        if child.tail.strip() or not (_is_block(child) and _is_block(following) and _is_block(element)):
+            child.tail = _SPACES_RE.sub(' ', child.tail)
+        else:
+            child.tail = None
+
+def _remove(element) -> None:
+    """Quita el elemento conservando el texto que le sigue."""
+    parent = element.getparent()
+    if parent is None:
+        return
+    if element.tail:
+        previous = element.getprevious()
+        if previous is not None:
+            previous.tail = (previous.tail or '') + element.tail
+        else:
+            parent.text = (parent.text or '') + element.tail
+    parent.remove(element)
+
+def parse_chapter(data: bytes):
+    """Parsea un capítulo como XHTML o, si no es XML válido, como HTML."""
+    parser = etree.XMLParser(remove_comments=True, remove_pis=True, resolve_entities=False, no_network=True, huge_tree=True)
+    try:
+        return etree.fromstring(data, parser)
+    except etree.XMLSyntaxError:
+        # Capítulos que no son XML válido: los leemos como HTML.
+        root = html.fromstring(data)
+        for node in root.xpath('//comment() | //processing-instruction()'):
+            _remove(node)
+        return root
+
+def build_reader_chapter(
+    data: bytes,
+    image_size: Callable[[str], Optional[tuple[int, int]]],
+    css_aliases: Optional[dict[str, str]] = None,
+    html_output: bool = False,
+) -> bytes:
+    """Genera la variante lector de un capítulo.
+
+    Args:
+        data (bytes): Contenido del capítulo (ya con las URLs reescritas).
+        image_size (Callable[[str], Optional[tuple[int, int]]]): Tamaño de una imagen a partir de su URL.
+        css_aliases (Optional[dict[str, str]], optional): URL de un CSS duplicado -> URL de la copia canónica. Defaults to None.
+        html_output (bool, optional): Serializar como HTML (capítulos .html) en lugar de XHTML. Defaults to False.
+
+    Returns:
+        bytes: Devuelve el capítulo minificado y saneado.
+    """
+    css_aliases = css_aliases or {}
+    root = parse_chapter(data)
+
+    for script in root.xpath('//*[local-name()="script" or local-name()="noscript"]'):
+        _remove(script)
+
+    seen_stylesheets = set()
+    for element in root.iter():
+        if not isinstance(element.tag, str):
+            continue
+        for name in list(element.attrib):
+            value = element.attrib[name]
+            local = etree.QName(name).localname.lower()
+            if local.startswith('on') or (local in ('href', 'src') and value.strip().lower().startswith('javascript:')):
+                del element.attrib[name]
+
+        tag = _local_name(element)
+        if tag == 'link' and 'stylesheet' in element.get('rel', '').lower():
+            href = css_aliases.get(element.get('href'), element.get('href'))
+            if href in seen_stylesheets:
+                element.set('data-duplicate', '1')
+                continue
+            seen_stylesheets.add(href)
+            element.set('href', href)
+        elif tag == 'style' and element.text:
+            element.text = minify_css(element.text)
+        elif tag == 'img':
+            element.set('loading', 'lazy')
+            element.set('decoding', 'async')
+            if element.get('width') is None and element.get('height') is None and element.get('src'):
+                size = image_size(element.get('src'))
+                if size:
+                    element.set('width', str(size[0]))
+                    element.set('height', str(size[1]))
+
+    for duplicate in root.xpath('//*[@data-duplicate]'):
+        _remove(duplicate)
+
+    _collapse_spaces(root)
+    etree.cleanup_namespaces(root)
+    return serialize_chapter(root, html_output)
+
+def serialize_chapter(root, html_output: bool = False) -> bytes:
+    """Serializa un capítulo sin declaración XML ni pretty print."""
+    return b'<!DOCTYPE html>\n' + etree.tostring(root, encoding='utf-8', method='html' if html_output else 'xml')
@@ -0,0 +1,134 @@
+"""Resúmenes map-reduce: un texto largo se divide en partes que entran en el contexto del
+modelo, se resume cada parte y los resúmenes se combinan (de a grupos, si hace falta) hasta
+quedar uno solo.
+
+El modelo es intercambiable: ``GeminiSummaryModel`` en producción y ``FakeSummaryModel``
+(determinista, sin red) para desarrollo y pruebas (SUMMARY_MODEL=fake).
+"""
+import re
+import time
+from typing import Callable, Optional, Protocol
+
+from lxml import etree, html
+
+# Cambiarlo invalida los resúmenes cacheados (forma parte de la clave de caché).
+PROMPT_VERSION = 1
+_WHITESPACE_RE = re.compile(r'[ \t\r\f\v]+')
+_BLANK_LINES_RE = re.compile(r'\n\s*\n+')
+_SENTENCE_END_RE = re.compile(r'(?<=[.!?…])\s+')
+
+PROMPTS = {
+    'chapter': 'Resume el siguiente capítulo de un libro en un párrafo, sin spoilers innecesarios. Responde en el idioma del texto.',
+    'partial': 'Resume la siguiente parte de un capítulo de un libro en pocas oraciones. Responde en el idioma del texto.',
+    'combine': 'Combina los siguientes resúmenes de partes consecutivas de un libro en un único resumen coherente. Responde en el idioma del texto.',
+    'book': 'A partir de los siguientes resúmenes de los capítulos, escribe un resumen del libro completo en pocos párrafos. Responde en el idioma del texto.',
+}
+
+class SummaryModel(Protocol):
+    name: str
+
+    def summarize(self, text: str, kind: str) -> str:
+        ...
+
+class FakeSummaryModel:
+    """Modelo local determinista: devuelve las primeras oraciones del texto."""
+
+    def __init__(self, sentences: int = 2, delay: float = 0.0) -> None:
+        self.name = 'fake'
+        self.sentences = sentences
+        self.delay = delay
+
+    def summarize(self, text: str, kind: str) -> str:
+        if self.delay:
+            time.sleep(self.delay)
+        sentences = _SENTENCE_END_RE.split(' '.join(text.split()))
+        return f'[{kind}] ' + ' '.join(sentences[:self.sentences])
+
+class GeminiSummaryModel:
+    def __init__(self, client_factory: Callable[[], object], model: str) -> None:
+        self.name = model
+        self._client_factory = client_factory
+        self._client = None
+
+    def summarize(self, text: str, kind: str) -> str:
+        if self._client is None:
+            self._client = self._client_factory()
+        response = self._client.models.generate_content(model=self.name, contents=[f'{PROMPTS[kind]}\n\n{text}'])
+        return (response.text or '').strip()
+
+def html_to_text(data: bytes) -> str:
+    """Texto de un capítulo (X)HTML, sin scripts ni estilos y con los párrafos separados por
+    una línea en blanco.
+    """
+    try:
+        root = html.fromstring(data)
+    except (etree.ParserError, ValueError):
+        return ''
+    etree.strip_elements(root, 'head', 'script', 'style', etree.Comment, with_tail=False)
+    for element in root.iter('p', 'div', 'br', 'li', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'blockquote', 'tr'):
+        element.tail = '\n\n' + (element.tail or '')
+    text = _WHITESPACE_RE.sub(' ', root.text_content())
+    return _BLANK_LINES_RE.sub('\n\n', text).strip()
+
+def split_text(text: str, max_chars: int) -> list[str]:
+    """Divide el texto en partes de hasta max_chars, cortando entre párrafos (o entre
+    oraciones, si un párrafo no entra solo).
+    """
+    if len(text) <= max_chars:
+        return [text] if text else []
+    pieces = []
+    for paragraph in text.split('\n\n'):
+        if len(paragraph) <= max_chars:
+            pieces.append(paragraph)
+            continue
+        for sentence in _SENTENCE_END_RE.split(paragraph):
+            pieces.extend(sentence[i:i + max_chars] for i in range(0, len(sentence), max_chars))
+
+    parts, current, size = [], [], 0
+    for piece in pieces:
+        if current and size + len(piece) + 2 > max_chars:
+            parts.append('\n\n'.join(current))
+            current, size = [], 0
+        current.append(piece)
+        size += len(piece) + 2
+    if current:
+        parts.append('\n\n'.join(current))
+    return parts
+
+def reduce_summaries(model: SummaryModel, summaries: list[str], max_chars: int, kind: str = 'book') -> Optional[str]:
+    """Combina resúmenes en uno solo. Si juntos no entran en max_chars, se combinan de a
+    grupos consecutivos y se repite con los resultados.
+
+    Args:
+        model (SummaryModel): Modelo a usar.
+        summaries (list[str]): Resúmenes en orden.
+        max_chars (int): Tamaño máximo de cada pedido al modelo.
+        kind (str, optional): Prompt del paso final ('book' o 'chapter'). Defaults to 'book'.
+
+    Returns:
+        Optional[str]: Devuelve el resumen combinado (None si no hay resúmenes).
+    """
+    summaries = [summary for summary in summaries if summary]
+    while summaries:
+        joined = '\n\n'.join(summaries)
+        if len(joined) <= max_chars or len(summaries) == 1:
+            return model.summarize(joined, kind)
+        combined = [model.summarize(group, 'combine') for group in split_text(joined, max_chars)]
+        if len(combined) >= len(summaries):
+            # El modelo no achica los resúmenes: cortamos en vez de iterar para siempre.
+            return model.summarize(joined[:max_chars], kind)
+        summaries = combined
+    return None
+
+def summarize_text(model: SummaryModel, text: str, max_chars: int) -> Optional[str]:
+    """Resume un capítulo: de una vez si entra en max_chars, o por partes (map-reduce).
+
+    Returns:
+        Optional[str]: Devuelve el resumen (None si el capítulo no tiene texto).
+    """
+    parts = split_text(text, max_chars)
+    if not parts:
+        return None
+    if len(parts) == 1:
+        return model.summarize(parts[0], 'chapter')
+    return reduce_summaries(model, [model.summarize(part, 'partial') for part in parts], max_chars, kind='chapter')
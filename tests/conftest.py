@@ -0,0 +1,149 @@
+"""Fixtures compartidos por los tests que usan la API o la base de datos.
+
+Necesitan un Postgres configurado con las mismas variables que la API (DB_NAME, DB_USER,
+DB_PASSWORD, DB_HOST, DB_PORT); si no hay uno, esos tests se saltean. Los archivos de los
+libros se guardan en una carpeta temporal, y cada test usa usuarios nuevos.
+"""
+import os
+import uuid
+import zipfile
+from pathlib import Path
+
+import pytest
+
+# Entorno de la API durante los tests: sin rate limits y con el modelo de resúmenes local.
+TEST_ENV = {
+    'RATE_LIMITS': '',
+    'SUMMARY_MODEL': 'fake',
+    'SUMMARY_FAKE_DELAY': '0',
+    'PASSWORD_HASH_ROUNDS': '1000',
+}
+
+def make_epub(path: Path, chapters: int = 3, paragraphs: int = 3) -> Path:
+    """EPUB mínimo válido, con un capítulo por archivo. El texto es distinto en cada EPUB (los
+    resúmenes se cachean por el hash del contenido).
+    """
+    marker = uuid.uuid4().hex
+    items, spine, nav_points = [], [], []
+    with zipfile.ZipFile(path, 'w') as epub:
+        epub.writestr('mimetype', 'application/epub+zip')
+        epub.writestr('META-INF/container.xml', (
+            '<?xml version="1.0"?><container version="1.0" xmlns="urn:oasis:names:tc:opendocument:xmlns:container">'
+            '<rootfiles><rootfile full-path="OEBPS/content.opf" media-type="application/oebps-package+xml"/></rootfiles></container>'
+        ))
+        for number in range(chapters):
+            body = ''.join(
+                f'<p>Chapter {number} paragraph {paragraph} of {marker}. It has a second sentence. And a third one.</p>'
+                for paragraph in range(paragraphs)
+            )
+            epub.writestr(f'OEBPS/ch{number}.xhtml', (
+                '<?xml version="1.0" encoding="utf-8"?><html xmlns="http://www.w3.org/1999/xhtml">'
+                f'<head><title>C{number}</title></head><body><h1>Chapter {number}</h1>{body}</body></html>'
+            ))
+            items.append(f'<item id="ch{number}" href="ch{number}.xhtml" media-type="application/xhtml+xml"/>')
+            spine.append(f'<itemref idref="ch{number}"/>')
+            nav_points.append(
+                f'<navPoint id="n{number}" playOrder="{number + 1}"><navLabel><text>Chapter {number}</text></navLabel>'
+                f'<content src="ch{number}.xhtml"/></navPoint>'
+            )
+        items.append('<item id="ncx" href="toc.ncx" media-type="application/x-dtbncx+xml"/>')
+        epub.writestr('OEBPS/toc.ncx', (
+            '<?xml version="1.0"?><ncx xmlns="http://www.daisy.org/z3986/2005/ncx/" version="2005-1">'
+            f'<navMap>{"".join(nav_points)}</navMap></ncx>'
+        ))
+        epub.writestr('OEBPS/content.opf', (
+            '<?xml version="1.0"?><package xmlns="http://www.idpf.org/2007/opf" version="2.0">'
+            '<metadata xmlns:dc="http://purl.org/dc/elements/1.1/"><dc:title>Test</dc:title><dc:language>en</dc:language></metadata>'
+            f'<manifest>{"".join(items)}</manifest><spine toc="ncx">{"".join(spine)}</spine></package>'
+        ))
+    return path
+
+@pytest.fixture(scope='session')
+def test_env():
+    with pytest.MonkeyPatch.context() as patch:
+        for name, value in TEST_ENV.items():
+            patch.setenv(name, value)
+        yield patch
+
+@pytest.fixture(scope='session')
+def workdir(tmp_path_factory, test_env):
+    """Los paths de los libros son relativos a la carpeta actual: los tests usan una temporal."""
+    path = tmp_path_factory.mktemp('skoob')
+    previous = os.getcwd()
+    os.chdir(path)
+    yield path
+    os.chdir(previous)
+
+@pytest.fixture(scope='session')
+def db(workdir):
+    from sqlalchemy import text
+    from sqlalchemy.exc import OperationalError
+    from src.db.db_connection import DbConnection
+    from src.db.migrate import migrate
+
+    db = DbConnection()
+    try:
+        with db.engine.connect() as connection:
+            connection.execute(text('SELECT 1'))
+    except OperationalError:
+        db.engine.dispose()
+        pytest.skip('Postgres is not available (set DB_HOST, DB_NAME, ...)')
+    migrate(db)
+    yield db
+    db.engine.dispose()
+
+@pytest.fixture(scope='session')
+def services(db):
+    from src.services.core_services import CoreServices
+    return CoreServices(db.engine)
+
+@pytest.fixture(scope='session')
+def app(services):
+    from src.api.api import FastApi
+    return FastApi(services).app
+
+@pytest.fixture(scope='session')
+def client(app):
+    """Cliente sin sesión; entrar en él corre el lifespan de la API (una vez por sesión)."""
+    from fastapi.testclient import TestClient
+
+    with TestClient(app) as client:
+        yield client
+
+@pytest.fixture
+def login(app, client, services):
+    """Registra un usuario nuevo y devuelve un cliente con su sesión iniciada. Los usuarios se
+    borran al terminar el test.
+    """
+    from fastapi.testclient import TestClient
+
+    emails = []
+
+    def login(password: str = 'password'):
+        email = f'{uuid.uuid4().hex}@example.com'
+        emails.append(email)
+        assert client.post('/users/register', params={'email': email, 'password': password, 'name': 'Test'}).status_code == 200
+        user_client = TestClient(app)
+        assert user_client.post('/users/auth', data={'username': email, 'password': password}).status_code == 200
+        user_client.user = services.get_user(email)
+        return user_client
+
+    yield login
+    for email in emails:
+        services.delete_user(email)
+
+@pytest.fixture
+def epub_file(tmp_path):
+    def epub_file(chapters: int = 3, paragraphs: int = 3) -> Path:
+        return make_epub(tmp_path / f'{uuid.uuid4().hex}.epub', chapters, paragraphs)
+    return epub_file
+
+@pytest.fixture
+def upload_book(epub_file):
+    """Sube un EPUB con el cliente dado y devuelve el libro (el dict de la respuesta)."""
+    def upload_book(user_client, chapters: int = 3, paragraphs: int = 3) -> dict:
+        with open(epub_file(chapters, paragraphs), 'rb') as file:
+            response = user_client.post('/books/upload', files={'file': ('book.epub', file, 'application/epub+zip')})
+        assert response.status_code == 200, response.text
+        return response.json()['content']['content']
+    return upload_book
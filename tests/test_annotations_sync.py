@@ -0,0 +1,101 @@
+"""Sincronización incremental de anotaciones (contador de versiones por usuario)."""
+import threading
+import uuid
+
+import pytest
+
+def change(book_id: int, uid: str = None, **values) -> dict:
+    return {'uid': uid or uuid.uuid4().hex, 'book_id': book_id, 'chapter_number': 1, 'cfi_range': '/4/2', **values}
+
+def sync(user_client, since: int = 0, changes: list = ()) -> dict:
+    response = user_client.post('/annotations/sync', json={'since': since, 'changes': list(changes)})
+    assert response.status_code == 200, response.text
+    return response.json()['content']['content']
+
+@pytest.fixture
+def reader(login, upload_book):
+    user_client = login()
+    return user_client, upload_book(user_client)['id']
+
+def test_since_version_round_trip(reader):
+    user_client, book_id = reader
+    first = change(book_id, note='one')
+    pushed = sync(user_client, 0, [first, change(book_id, note='two')])
+    assert pushed['version'] == 2
+    assert [item['version'] for item in pushed['changes']] == [1, 2]
+
+    assert sync(user_client, 2) == {'version': 2, 'changes': [], 'has_more': False, 'conflicts': [], 'rejected': []}
+    edited = sync(user_client, 2, [{**first, 'note': 'edited', 'base_version': 1}])
+    assert edited['version'] == 3
+    assert [(item['uid'], item['note']) for item in edited['changes']] == [(first['uid'], 'edited')]
+    # Otro dispositivo que se quedó en la versión 2 sólo recibe la edición.
+    assert [item['version'] for item in sync(user_client, 2)['changes']] == [3]
+
+def test_deleted_tombstones(reader):
+    user_client, book_id = reader
+    kept, removed = change(book_id), change(book_id)
+    version = sync(user_client, 0, [kept, removed])['version']
+    pulled = sync(user_client, version, [{**removed, 'deleted': True, 'base_version': version}])
+    assert [(item['uid'], item['deleted']) for item in pulled['changes']] == [(removed['uid'], True)]
+    # Un cliente nuevo no recibe tombstones, y la lista del libro no los incluye.
+    assert [item['uid'] for item in sync(user_client, 0)['changes']] == [kept['uid']]
+    listed = user_client.get(f'/annotations/book/{book_id}').json()['content']['content']
+    assert [item['uid'] for item in listed] == [kept['uid']]
+    # Crear y borrar sin haber sincronizado no deja nada.
+    assert sync(user_client, pulled['version'], [change(book_id, deleted=True)])['changes'] == []
+
+def test_stale_version_conflict(reader):
+    user_client, book_id = reader
+    original = change(book_id, note='original')
+    version = sync(user_client, 0, [original])['version']
+    sync(user_client, version, [{**original, 'note': 'device A', 'base_version': version}])
+    # El dispositivo B editó la misma anotación sobre la versión vieja: gana el servidor.
+    stale = sync(user_client, version, [{**original, 'note': 'device B', 'base_version': version}])
+    assert [(item['uid'], item['note']) for item in stale['conflicts']] == [(original['uid'], 'device A')]
+    assert [item['note'] for item in sync(user_client, 0)['changes']] == ['device A']
+
+def test_changes_to_foreign_books_are_rejected(reader, login):
+    user_client, book_id = reader
+    other = login()
+    result = sync(other, 0, [change(book_id)])
+    assert result['rejected'][0]['reason'] == 'BookNotFound'
+    assert result['changes'] == []
+
+def test_concurrent_pushes_never_reuse_a_version(reader, services):
+    user_client, book_id = reader
+    user = user_client.user
+    versions, errors = [], []
+
+    def push() -> None:
+        try:
+            for _ in range(5):
+                result = services.sync_annotations(user, 0, [change(book_id), change(book_id)])
+                versions.append(result['version'])
+        except Exception as error:
+            errors.append(error)
+
+    threads = [threading.Thread(target=push) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    assert len(set(versions)) == len(versions)
+
+    everything = services.sync_annotations(user, 0)
+    assert sorted(item['version'] for item in everything['changes']) == list(range(1, 41))
+
+def test_has_more_pages_through_the_changes(reader, services, monkeypatch):
+    user_client, book_id = reader
+    sync(user_client, 0, [change(book_id) for _ in range(5)])
+    monkeypatch.setattr(services, 'annotations_sync_page_size', 2)
+    since, seen, pages = 0, [], 0
+    while True:
+        page = sync(user_client, since)
+        seen += [item['version'] for item in page['changes']]
+        since, pages = page['version'], pages + 1
+        if not page['has_more']:
+            break
+    assert seen == [1, 2, 3, 4, 5]
+    assert pages == 3
+    assert since == 5
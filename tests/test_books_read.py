@@ -0,0 +1,30 @@
+"""Lectura de capítulos: variantes y fragmentos."""
+import pytest
+
+@pytest.fixture
+def fragmented_book(login, upload_book, services, monkeypatch):
+    # Capítulos chicos divididos en varios fragmentos.
+    monkeypatch.setattr(services, 'chapter_fragment_bytes', 400)
+    user_client = login()
+    return user_client, upload_book(user_client, chapters=2, paragraphs=30)
+
+def read(user_client, book_id: int, **params):
+    return user_client.get('/books/read', params={'book_id': book_id, 'chapter_number': 1, **params})
+
+def test_reader_fragments(fragmented_book):
+    user_client, book = fragmented_book
+    whole = read(user_client, book['id'])
+    assert whole.status_code == 200
+    fragments = int(whole.headers['X-Chapter-Fragments'])
+    assert fragments > 1
+    parts = [read(user_client, book['id'], fragment=index) for index in range(fragments)]
+    assert all(part.status_code == 200 for part in parts)
+    assert read(user_client, book['id'], fragment=fragments).status_code == 400
+
+def test_original_variant_is_never_served_as_reader_fragments(fragmented_book):
+    user_client, book = fragmented_book
+    original = read(user_client, book['id'], variant='original')
+    assert original.status_code == 200
+    assert original.headers['X-Chapter-Fragments'] == '1'
+    assert b'<?xml' in original.content  # El XHTML del EPUB, no el HTML minificado.
+    assert read(user_client, book['id'], variant='original', fragment=0).status_code == 400
@@ -0,0 +1,103 @@
+"""Login con Google contra un endpoint de tokens y un servidor de certificados locales."""
+import asyncio
+import time
+
+import pytest
+
+pytest.importorskip('cryptography')
+
+from benchmarks.google_auth_benchmark import CLIENT_ID, StandInGoogle
+from src.services.microservices.google_auth_services import GoogleAuthServices, cache_seconds, token_key_id
+
+@pytest.fixture
+def anyio_backend():
+    return 'asyncio'
+
+@pytest.fixture
+def stand_in():
+    server = StandInGoogle()
+    yield server
+    server.close()
+
+@pytest.fixture
+async def services(stand_in, monkeypatch):
+    monkeypatch.setenv('GOOGLE_CLIENT_ID', CLIENT_ID)
+    monkeypatch.setenv('GOOGLE_SECRET_KEY', 'secret')
+    monkeypatch.setenv('GOOGLE_TOKEN_URL', f'{stand_in.url}/token')
+    monkeypatch.setenv('GOOGLE_CERTS_URL', f'{stand_in.url}/certs')
+    monkeypatch.setenv('GOOGLE_CERTS_DEFAULT_TTL', '300')
+    google = GoogleAuthServices()
+    yield google
+    await google.close_google_http_client()
+
+async def login(services: GoogleAuthServices, email: str) -> dict:
+    token = (await services.exchange_google_code(email))['id_token']
+    return await services.verify_google_id_token(token)
+
+pytestmark = pytest.mark.anyio
+
+async def test_logins_reuse_one_connection(services, stand_in):
+    for i in range(10):
+        assert (await login(services, f'user{i}@example.com'))['email'] == f'user{i}@example.com'
+    assert stand_in.token_requests == 10
+    assert len(stand_in.connections) == 1
+
+async def test_concurrent_logins_fetch_certs_once(services, stand_in):
+    infos = await asyncio.gather(*[login(services, f'user{i}@example.com') for i in range(50)])
+    assert {info['email'] for info in infos} == {f'user{i}@example.com' for i in range(50)}
+    assert stand_in.cert_requests == 1
+
+async def test_certs_refreshed_after_max_age(services, stand_in):
+    stand_in.max_age = 1
+    await login(services, 'a@example.com')
+    await login(services, 'b@example.com')
+    assert stand_in.cert_requests == 1
+    await asyncio.sleep(1.1)
+    await login(services, 'c@example.com')
+    assert stand_in.cert_requests == 2
+
+async def test_missing_max_age_uses_default_ttl(services, stand_in):
+    stand_in.max_age = None
+    await login(services, 'a@example.com')
+    assert services._google_certs_expires_at - time.monotonic() > 250
+
+async def test_unknown_key_id_refreshes_certs(services, stand_in):
+    await login(services, 'a@example.com')
+    stand_in.rotate()
+    # Recién descargados: un kid desconocido no vuelve a pedirlos antes de un minuto.
+    with pytest.raises(ValueError):
+        await login(services, 'b@example.com')
+    assert stand_in.cert_requests == 1
+    services._google_certs_fetched_at -= 60
+    assert (await login(services, 'b@example.com'))['email'] == 'b@example.com'
+    assert stand_in.cert_requests == 2
+
+async def test_stale_certs_used_when_endpoint_fails(services, stand_in):
+    await login(services, 'a@example.com')
+    stand_in.fail_certs = True
+    services._google_certs_expires_at = 0.0
+    assert (await login(services, 'b@example.com'))['email'] == 'b@example.com'
+    assert stand_in.cert_requests == 2
+
+async def test_certs_endpoint_failure_without_cache_raises(services, stand_in):
+    stand_in.fail_certs = True
+    with pytest.raises(Exception):
+        await login(services, 'a@example.com')
+
+async def test_rejects_bad_signature_and_audience(services, stand_in, monkeypatch):
+    token = stand_in.id_token('a@example.com')
+    with pytest.raises(ValueError):
+        await services.verify_google_id_token(token[:-4] + 'AAAA')
+    services.google_client_id = 'someone-else.apps.googleusercontent.com'
+    with pytest.raises(ValueError):
+        await services.verify_google_id_token(token)
+
+def test_cache_seconds():
+    assert cache_seconds({'cache-control': 'public, max-age=600, must-revalidate'}) == 600
+    assert cache_seconds({'cache-control': 'max-age=600', 'age': '100'}) == 500
+    assert cache_seconds({'cache-control': 'no-store, max-age=600'}) is None
+    assert cache_seconds({}) is None
+
+def test_token_key_id(stand_in):
+    assert token_key_id(stand_in.id_token('a@example.com')) == stand_in.active_kid
+    assert token_key_id('not a token') is None
@@ -0,0 +1,67 @@
+"""Presupuestos de queries por endpoint, con la contabilidad en modo estricto
+(SQL_QUERY_BUDGET_STRICT=1): pasarse del presupuesto, o repetir un statement (N+1), hace
+fallar la petición con QueryBudgetExceeded.
+"""
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from src.api.middlewares.query_accounting_middleware import QueryBudgetExceeded
+from src.models.users_model import UsersModel
+
+# El refresco de las revocaciones (una query cada TOKEN_REVOCATION_REFRESH_SECONDS) se
+# desactiva durante estos tests para que los conteos sean exactos.
+BUDGETS = {
+    'GET /books/read': 2,
+    'GET /books/all': 2,
+    'GET /users/me': 1,
+    'GET /users/all': 3,
+}
+
+def strict_app(services, monkeypatch, budgets: dict[str, int]):
+    from src.api.api import FastApi
+
+    monkeypatch.setenv('SQL_QUERY_BUDGET_STRICT', '1')
+    monkeypatch.setenv('SQL_QUERY_BUDGET', '0')
+    monkeypatch.setenv('SQL_QUERY_BUDGETS', ','.join(f'{route}={budget}' for route, budget in budgets.items()))
+    return FastApi(services).app
+
+@pytest.fixture
+def strict_client(app, client, services, monkeypatch, login, upload_book):
+    """Cliente de un admin con dos libros, contra una API en modo estricto."""
+    user_client = login()
+    for chapters in (2, 4):
+        upload_book(user_client, chapters=chapters)
+    with Session(services.engine) as session, session.begin():
+        session.execute(update(UsersModel).where(UsersModel.id == user_client.user.id).values(role='admin'))
+    services.refresh_revocations(force=True)
+    monkeypatch.setattr(services, 'revocation_refresh_seconds', 3600.0)
+
+    def strict_client(budgets: dict[str, int] = BUDGETS) -> TestClient:
+        strict = TestClient(strict_app(services, monkeypatch, budgets))
+        strict.cookies = user_client.cookies
+        strict.user = user_client.user
+        return strict
+    return strict_client
+
+def test_endpoints_stay_within_their_budgets(strict_client, login, upload_book):
+    strict = strict_client()
+    books = strict.get('/books/all').json()['content']['content']
+    assert len(books) == 2
+    assert strict.get('/books/read', params={'book_id': books[0]['id'], 'chapter_number': 2}).status_code == 200
+    me = strict.get('/users/me').json()['content']['content']
+    # UsersModel.serialize usa los libros: tienen que venir con el usuario, no en una query aparte.
+    assert sorted(me['books']) == sorted(book['id'] for book in books)
+
+    # Más usuarios con libros no suman queries a /users/all (los libros se cargan de una vez).
+    for _ in range(3):
+        upload_book(login())
+    users = strict.get('/users/all')
+    assert users.status_code == 200
+    assert len(users.json()['content']['content']) >= 4
+
+def test_strict_mode_fails_over_budget(strict_client):
+    strict = strict_client({**BUDGETS, 'GET /users/me': 0})
+    with pytest.raises(QueryBudgetExceeded, match='GET /users/me'):
+        strict.get('/users/me')
@@ -0,0 +1,27 @@
+"""Pool de hashing de passwords: saturación y lotes."""
+import pytest
+
+from src.services.microservices import security_services
+from src.services.microservices.security_services import PasswordPoolBusy, SecurityServices
+
+@pytest.fixture
+def small_pool(monkeypatch):
+    monkeypatch.setenv('PASSWORD_HASH_WORKERS', '1')
+    monkeypatch.setenv('PASSWORD_HASH_MAX_PENDING', '2')
+    monkeypatch.setenv('PASSWORD_HASH_ROUNDS', '1000')
+    SecurityServices.shutdown_password_pool()
+    yield
+    SecurityServices.shutdown_password_pool()
+
+def test_saturated_pool_raises_domain_exception(small_pool, monkeypatch):
+    monkeypatch.setenv('PASSWORD_HASH_ROUNDS', '2000000')
+    futures = [security_services._submit(security_services._hash, 'x', 2_000_000) for _ in range(2)]
+    with pytest.raises(PasswordPoolBusy):
+        SecurityServices.hash_password('x')
+    for future in futures:
+        future.cancel()
+
+def test_hash_passwords_waits_for_free_slots(small_pool):
+    hashes = SecurityServices.hash_passwords([f'password{i}' for i in range(6)])
+    assert len(hashes) == 6
+    assert SecurityServices.verify_password('password3', hashes[3])
@@ -0,0 +1,47 @@
+"""Caché local del almacén: desalojo e invalidación sin romper archivos que se están por servir."""
+import pytest
+
+from src.storage.storage_cache import StorageCache
+
+def write(data: bytes):
+    return lambda target: target.write_bytes(data)
+
+@pytest.fixture
+def cache(tmp_path):
+    return StorageCache(str(tmp_path), max_bytes=10, max_object_bytes=10, delete_delay=60.0)
+
+def test_evicted_file_stays_readable_until_the_delay(cache):
+    served = cache.fetch('a', 6, write(b'aaaaaa'))
+    cache.fetch('b', 6, write(b'bbbbbb'))  # Desaloja a 'a'.
+    assert cache.get('a') is None
+    # Un FileResponse que ya tenía el path todavía puede abrirlo.
+    assert served.read_bytes() == b'aaaaaa'
+
+def test_invalidated_file_stays_readable_until_the_delay(cache):
+    served = cache.fetch('books/1/a', 3, write(b'old'))
+    cache.invalidate_prefix('books/1/')
+    assert cache.get('books/1/a') is None
+    assert served.read_bytes() == b'old'
+
+def test_refetch_does_not_overwrite_the_old_version(cache):
+    old = cache.fetch('a', 3, write(b'old'))
+    cache.invalidate_prefix('a')
+    new = cache.fetch('a', 3, write(b'new'))
+    assert new != old
+    assert old.read_bytes() == b'old'
+    assert new.read_bytes() == b'new'
+
+def test_pending_delete_does_not_remove_the_new_version(cache):
+    cache.delete_delay = 0
+    old = cache.fetch('a', 3, write(b'old'))
+    cache.invalidate_prefix('a')
+    new = cache.fetch('a', 3, write(b'new'))  # Corre el borrado pendiente de la versión vieja.
+    assert not old.exists()
+    assert new.read_bytes() == b'new'
+
+def test_pending_deletes_run_after_the_delay(cache):
+    cache.delete_delay = 0
+    served = cache.fetch('a', 6, write(b'aaaaaa'))
+    cache.fetch('b', 6, write(b'bbbbbb'))
+    assert not served.exists()
+    assert cache.get('b').read_bytes() == b'bbbbbb'
@@ -0,0 +1,141 @@
+"""Resúmenes map-reduce con el modelo local (SUMMARY_MODEL=fake)."""
+import datetime
+import threading
+import time
+import uuid
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from src.models.summaries_model import SummaryJobsModel
+from src.utils.summary.summarizer import FakeSummaryModel, reduce_summaries, split_text, summarize_text
+
+class CountingModel(FakeSummaryModel):
+    def __init__(self, shrink: bool = True) -> None:
+        super().__init__(sentences=1)
+        self.shrink = shrink
+        self.calls = 0
+
+    def summarize(self, text: str, kind: str) -> str:
+        self.calls += 1
+        # Un modelo que no achica el texto no debe dejar a reduce_summaries iterando para siempre.
+        return super().summarize(text, kind) if self.shrink else text
+
+def wait_for_job(services, job_id: str, timeout: float = 30.0) -> SummaryJobsModel:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = services.get_summary_job(job_id)
+        if job.status in ('done', 'failed'):
+            return job
+        time.sleep(0.05)
+    raise AssertionError(f'summary job {job_id} did not finish')
+
+def active_jobs(services, book_id: int) -> list[SummaryJobsModel]:
+    with Session(services.engine) as session:
+        return session.scalars(
+            select(SummaryJobsModel)
+            .where(SummaryJobsModel.book_id == book_id, SummaryJobsModel.status.in_(('queued', 'running')))
+        ).all()
+
+def add_job(services, book_id: int, user_id: int, updated_at: datetime.datetime) -> str:
+    job_id = uuid.uuid4().hex
+    with Session(services.engine) as session, session.begin():
+        session.add(SummaryJobsModel(
+            id=job_id, book_id=book_id, user_id=user_id, status='running', total=1, done=0, cached=0, updated_at=updated_at,
+        ))
+    return job_id
+
+def test_split_text_respects_max_chars():
+    text = '\n\n'.join(f'Paragraph {i}. ' + 'word ' * 40 for i in range(20))
+    parts = split_text(text, 300)
+    assert len(parts) > 1
+    assert all(len(part) <= 300 for part in parts)
+    assert split_text('', 300) == []
+    # Una "oración" más larga que el máximo se corta igual.
+    assert all(len(part) <= 50 for part in split_text('x' * 500, 50))
+
+def test_reduce_summaries_terminates():
+    summaries = [f'Summary {i}. ' + 'detail ' * 30 for i in range(40)]
+    model = CountingModel()
+    assert reduce_summaries(model, summaries, 500).startswith('[book]')
+    stubborn = CountingModel(shrink=False)
+    assert reduce_summaries(stubborn, summaries, 500) is not None
+    assert stubborn.calls < 100
+    assert reduce_summaries(model, ['', ''], 500) is None
+
+def test_summarize_text_map_reduce():
+    model = CountingModel()
+    text = '\n\n'.join(f'Part {i} starts here. ' + 'text ' * 50 for i in range(10))
+    assert summarize_text(model, text, 400).startswith('[chapter]')
+    assert model.calls > 2
+    assert summarize_text(model, '', 400) is None
+
+def test_rerun_comes_from_the_cache(services, login, upload_book):
+    user_client = login()
+    book = upload_book(user_client, chapters=4)
+    first = user_client.post(f"/summaries/book/{book['id']}").json()['content']['content']
+    first = wait_for_job(services, first['id'])
+    assert first.status == 'done', first.error
+    assert first.total == 4
+
+    second = user_client.post(f"/summaries/book/{book['id']}").json()['content']['content']
+    assert second['id'] != first.id
+    second = wait_for_job(services, second['id'])
+    assert second.status == 'done'
+    assert second.cached == second.total == 4
+
+    summary = user_client.get(f"/summaries/book/{book['id']}").json()['content']['content']
+    assert summary['summary'].startswith('[book]')
+
+def test_cached_chapter_does_not_wait_for_the_model_pool(services, login, upload_book):
+    user_client = login()
+    book = upload_book(user_client)
+    first = user_client.get(f"/summaries/book/{book['id']}/chapter/2").json()['content']['content']
+    assert first['cached'] is False
+
+    # Con el pool del modelo ocupado, un capítulo cacheado responde igual.
+    _, map_pool = services.summary_pools()
+    release = threading.Event()
+    blockers = [map_pool.submit(release.wait, 10) for _ in range(services.summary_max_concurrent)]
+    try:
+        started = time.monotonic()
+        again = user_client.get(f"/summaries/book/{book['id']}/chapter/2").json()['content']['content']
+        assert again['cached'] is True
+        assert again['summary'] == first['summary']
+        assert time.monotonic() - started < 5
+    finally:
+        release.set()
+        for blocker in blockers:
+            blocker.result()
+
+    assert user_client.get(f"/summaries/book/{book['id']}/chapter/99").status_code == 400
+
+def test_start_returns_the_active_job(services, login, upload_book):
+    user_client = login()
+    book = upload_book(user_client)
+    active_id = add_job(services, book['id'], user_client.user.id, datetime.datetime.now(datetime.UTC))
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(services.start_book_summary(services.get_book(book['id']), user_client.user.id)))
+        for _ in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert {job.id for job in results} == {active_id}
+    assert [job.id for job in active_jobs(services, book['id'])] == [active_id]
+
+def test_stale_job_is_taken_over(services, login, upload_book):
+    user_client = login()
+    book = upload_book(user_client)
+    stale_before = datetime.timedelta(seconds=services.summary_job_stale_seconds + 60)
+    stale_id = add_job(services, book['id'], user_client.user.id, datetime.datetime.now(datetime.UTC) - stale_before)
+
+    job = services.start_book_summary(services.get_book(book['id']), user_client.user.id)
+    assert job.id != stale_id
+    stale = services.get_summary_job(stale_id)
+    assert (stale.status, stale.error) == ('failed', 'Stale')
+    assert wait_for_job(services, job.id).status == 'done'
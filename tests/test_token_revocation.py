@@ -0,0 +1,51 @@
+"""Revocación de tokens: logout, cambio de password y limpieza de las revocaciones vencidas."""
+import datetime
+import time
+import uuid
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from src.models.token_revocations_model import TokenRevocationsModel
+from src.services.microservices.token_revocation_services import TOKEN_TTL
+
+def me(client, token: str) -> int:
+    return client.get('/users/me', headers={'Cookie': f'access_token={token}'}).status_code
+
+def test_logout_revokes_the_token(client, login):
+    user_client = login()
+    token = user_client.cookies['access_token']
+    assert me(client, token) == 200
+    assert user_client.post('/users/logout').status_code == 200
+    assert me(client, token) == 401
+
+def test_password_change_reissues_an_accepted_token(client, login):
+    user_client = login()
+    old_token = user_client.cookies['access_token']
+    response = user_client.put('/users/edit', params={'email': user_client.user.email, 'password': 'new-password'})
+    assert response.status_code == 200, response.text
+    new_token = response.cookies['access_token']
+    # El token nuevo se emite en el mismo segundo que la revocación: el iat fraccionario lo ordena.
+    assert new_token != old_token
+    assert me(client, old_token) == 401
+    assert me(client, new_token) == 200
+
+def test_prune_deletes_expired_revocations(services):
+    expired_at = datetime.datetime.now(datetime.UTC) - TOKEN_TTL - datetime.timedelta(hours=1)
+    subject, jti = f'{uuid.uuid4().hex}@example.com', uuid.uuid4().hex
+    with Session(services.engine) as session, session.begin():
+        session.add(TokenRevocationsModel(subject=subject, jti=jti, revoked_at=expired_at.timestamp(), created_at=expired_at))
+        session.add(TokenRevocationsModel(subject=subject, jti=None, revoked_at=expired_at.timestamp(), created_at=expired_at))
+    services._apply_revocation(subject, jti, expired_at.timestamp())
+    services._apply_revocation(subject, None, expired_at.timestamp())
+    services.revoke_user_tokens(f'recent-{subject}')
+
+    assert services.prune_revocations() >= 2
+    with Session(services.engine) as session:
+        remaining = session.scalar(
+            select(func.count()).select_from(TokenRevocationsModel).where(TokenRevocationsModel.subject.in_((subject, f'recent-{subject}')))
+        )
+    assert remaining == 1
+    assert jti not in services._revoked_jtis
+    assert subject not in services._revoked_before
+    assert services.token_is_revoked({'sub': f'recent-{subject}', 'iat': time.time() - 60})
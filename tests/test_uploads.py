@@ -0,0 +1,150 @@
+"""Subidas reanudables (/books/uploads, estilo tus)."""
+import base64
+import hashlib
+import os
+import time
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from src.models.books_model import BooksModel
+
+OCTET_STREAM = 'application/offset+octet-stream'
+
+@pytest.fixture
+def anyio_backend():
+    return 'asyncio'
+
+def metadata(**values: str) -> str:
+    return ','.join(f'{key} {base64.b64encode(value.encode()).decode()}' for key, value in values.items())
+
+def create_upload(user_client, data: bytes, **headers: str):
+    sha256 = headers.pop('sha256', None)
+    values = {'filename': 'book.epub', **({'sha256': sha256} if sha256 else {})}
+    return user_client.post('/books/uploads', headers={'Upload-Length': str(len(data)), 'Upload-Metadata': metadata(**values), **headers})
+
+def patch(user_client, upload_id: str, offset: int, chunk: bytes):
+    return user_client.patch(f'/books/uploads/{upload_id}', content=chunk, headers={'Upload-Offset': str(offset), 'Content-Type': OCTET_STREAM})
+
+def wait_for_upload(services, upload_id: str, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        upload = services.get_upload(upload_id)
+        if upload.status in ('done', 'failed'):
+            return upload
+        time.sleep(0.05)
+    raise AssertionError(f'upload {upload_id} did not finish')
+
+def book_count(services, user_id: int) -> int:
+    with Session(services.engine) as session:
+        return session.scalar(select(func.count()).select_from(BooksModel).where(BooksModel.owner_id == user_id))
+
+def test_idempotency_key_returns_the_same_upload(login, epub_file):
+    user_client = login()
+    data = epub_file().read_bytes()
+    first = create_upload(user_client, data, **{'Idempotency-Key': 'retry-me'})
+    second = create_upload(user_client, data, **{'Idempotency-Key': 'retry-me'})
+    other = create_upload(user_client, data, **{'Idempotency-Key': 'another'})
+    assert (first.status_code, second.status_code) == (201, 200)
+    assert first.json()['content']['content']['id'] == second.json()['content']['content']['id']
+    assert other.json()['content']['content']['id'] != first.json()['content']['content']['id']
+    assert first.headers['Location'].endswith(first.json()['content']['content']['id'])
+
+def test_wrong_offset_gets_409_with_the_current_offset(login, epub_file):
+    user_client = login()
+    data = epub_file().read_bytes()
+    upload_id = create_upload(user_client, data).json()['content']['content']['id']
+    assert patch(user_client, upload_id, 0, data[:100]).status_code == 204
+    conflict = patch(user_client, upload_id, 50, data[50:150])
+    assert conflict.status_code == 409
+    assert conflict.headers['Upload-Offset'] == '100'
+    assert user_client.head(f'/books/uploads/{upload_id}').headers['Upload-Offset'] == '100'
+
+@pytest.mark.anyio
+async def test_disconnect_keeps_the_received_bytes(app, client, login, epub_file, services):
+    user_client = login()
+    data = epub_file().read_bytes()
+    upload_id = create_upload(user_client, data).json()['content']['content']['id']
+
+    # El cliente manda dos partes del cuerpo y se corta antes de terminar.
+    messages = [
+        {'type': 'http.request', 'body': data[:60], 'more_body': True},
+        {'type': 'http.request', 'body': data[60:130], 'more_body': True},
+        {'type': 'http.disconnect'},
+    ]
+    async def receive():
+        return messages.pop(0) if messages else {'type': 'http.disconnect'}
+    async def send(message):
+        pass
+    cookie = f"access_token={user_client.cookies['access_token']}"
+    await app({
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'PATCH', 'scheme': 'http',
+        'path': f'/books/uploads/{upload_id}', 'raw_path': f'/books/uploads/{upload_id}'.encode(), 'root_path': '',
+        'query_string': b'', 'server': ('testserver', 80), 'client': ('testclient', 50000),
+        'headers': [
+            (b'host', b'testserver'), (b'cookie', cookie.encode()), (b'content-type', OCTET_STREAM.encode()),
+            (b'upload-offset', b'0'), (b'content-length', str(len(data)).encode()),
+        ],
+    }, receive, send)
+
+    head = user_client.head(f'/books/uploads/{upload_id}')
+    assert head.headers['Upload-Offset'] == '130'
+    # Se reanuda desde ahí y la subida se completa con el hash correcto.
+    assert patch(user_client, upload_id, 130, data[130:]).status_code == 204
+    upload = wait_for_upload(services, upload_id)
+    assert upload.status == 'done', upload.error
+    assert upload.sha256 == hashlib.sha256(data).hexdigest()
+
+def test_retried_completing_patch_does_not_ingest_twice(login, epub_file, services):
+    user_client = login()
+    data = epub_file().read_bytes()
+    upload_id = create_upload(user_client, data).json()['content']['content']['id']
+    half = len(data) // 2
+    assert patch(user_client, upload_id, 0, data[:half]).status_code == 204
+    assert patch(user_client, upload_id, half, data[half:]).status_code == 204
+    # El cliente no recibió la respuesta y reintenta el último chunk.
+    retry = patch(user_client, upload_id, half, data[half:])
+    assert retry.status_code == 204
+    assert retry.headers['Upload-Offset'] == str(len(data))
+
+    upload = wait_for_upload(services, upload_id)
+    assert upload.status == 'done', upload.error
+    assert patch(user_client, upload_id, half, data[half:]).status_code == 204
+    assert book_count(services, user_client.user.id) == 1
+
+def test_checksum_mismatch_fails_the_upload(login, epub_file, services):
+    user_client = login()
+    data = epub_file().read_bytes()
+    upload_id = create_upload(user_client, data, sha256='0' * 64).json()['content']['content']['id']
+    assert patch(user_client, upload_id, 0, data).status_code == 204
+    upload = wait_for_upload(services, upload_id)
+    assert (upload.status, upload.error) == ('failed', 'ChecksumMismatch')
+    assert not os.path.exists(upload.saving_folder)
+    assert book_count(services, user_client.user.id) == 0
+
+def test_checksum_without_the_worker_hasher(login, epub_file, services):
+    """Cada chunk en un worker distinto: el hash se calcula una vez, al completar."""
+    user_client = login()
+    data = epub_file().read_bytes()
+    good = create_upload(user_client, data, sha256=hashlib.sha256(data).hexdigest()).json()['content']['content']['id']
+    bad = create_upload(user_client, data, sha256=hashlib.sha256(b'other').hexdigest()).json()['content']['content']['id']
+    for upload_id in (good, bad):
+        for offset in range(0, len(data), 200):
+            services._upload_hashers.clear()
+            assert patch(user_client, upload_id, offset, data[offset:offset + 200]).status_code == 204
+    assert wait_for_upload(services, good).status == 'done'
+    assert wait_for_upload(services, bad).error == 'ChecksumMismatch'
+
+def test_abort_keeps_the_folder_of_an_existing_book(login, upload_book, services):
+    user_client = login()
+    book = upload_book(user_client)
+    upload, _ = services.create_upload(user_client.user.id, 'book.epub', 10)
+    # Como si la ingesta hubiera fallado después de crear el libro en la carpeta de la subida.
+    folder = services.get_book(book['id']).main_folder_path
+    with Session(services.engine) as session, session.begin():
+        session.get(type(upload), upload.id).saving_folder = folder
+        session.get(type(upload), upload.id).status = 'failed'
+    assert user_client.delete(f'/books/uploads/{upload.id}').status_code == 204
+    assert os.path.isdir(folder)
+    assert services.get_upload(upload.id) is None